@@ -1,13 +1,21 @@
 import duckdb
-from datetime import datetime
+import pyarrow as pa
+from datetime import date, datetime, timedelta
+
+from common.config import load_asset_registry
+from lake import LAKE_ROOT, latest_fact_date
 
 DB_PATH = "analytics.duckdb"
 
-def build_dim_datetime(con):
-    con.execute("""
-    CREATE TABLE IF NOT EXISTS dim_datetime AS
+DIM_DATETIME_START = datetime(2025, 1, 1)
+
+DATETIME_SELECT = """
     SELECT
-        CAST(strftime(ts, '%Y%m%d%H') AS BIGINT) AS datetime_key,
+        -- same YYYYMMDDHH integer as the pipeline's hour_key
+        CAST(
+            year(ts) * 1000000 + month(ts) * 10000 + day(ts) * 100 + hour(ts)
+            AS BIGINT
+        ) AS datetime_key,
         ts AS datetime_utc,
         EXTRACT(hour FROM ts) AS hour,
         EXTRACT(day FROM ts) AS day,
@@ -19,20 +27,51 @@ def build_dim_datetime(con):
             ELSE FALSE
         END AS is_weekend
     FROM generate_series(
-        TIMESTAMP '2025-01-01 00:00:00',
-        now(),
+        CAST(? AS TIMESTAMP),
+        CAST(? AS TIMESTAMP),
         INTERVAL '1 hour'
-    ) AS t(ts);
-    """)
+    ) AS t(ts)
+"""
+
+
+def build_dim_datetime(con, until=None, lake_root=LAKE_ROOT):
+    """
+    Extend dim_datetime hour by hour up to `until` (a date covers its
+    last hour). Defaults to the later of the current hour and the end of
+    the latest fact partition in the lake. Existing rows are kept.
+
+    Returns the number of hours added.
+    """
+    con.execute(
+        f"CREATE TABLE IF NOT EXISTS dim_datetime AS {DATETIME_SELECT} LIMIT 0",
+        [DIM_DATETIME_START, DIM_DATETIME_START],
+    )
 
-def build_dim_asset(con):
-    assets = [
-        ("BTC-USD", "crypto"),
-        ("ETH-USD", "crypto"),
-        ("LTC-USD", "crypto"),
-        ("SOL-USD", "crypto"),
-        ("XRP-USD", "crypto"),
-    ]
+    if until is None:
+        until = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        latest = latest_fact_date(lake_root)
+        if latest is not None:
+            until = max(until, _last_hour(latest))
+    elif not isinstance(until, datetime):
+        until = _last_hour(until)
+
+    last = con.execute("SELECT max(datetime_utc) FROM dim_datetime").fetchone()[0]
+    first = DIM_DATETIME_START if last is None else last + timedelta(hours=1)
+    if first > until:
+        return 0
+
+    con.execute(f"INSERT INTO dim_datetime {DATETIME_SELECT}", [first, until])
+    return int((until - first) / timedelta(hours=1)) + 1
+
+
+def build_dim_asset(con, registry=None):
+    """
+    Merge the asset registry (config/assets.yaml) into dim_asset in one
+    set-based pass. Existing symbols keep their asset_key; new symbols get
+    the next keys in registry order; symbols dropped from the registry
+    stay (their facts still join) with is_active = FALSE.
+    """
+    registry = load_asset_registry() if registry is None else registry
 
     con.execute("""
     CREATE TABLE IF NOT EXISTS dim_asset (
@@ -41,14 +80,57 @@ def build_dim_asset(con):
         asset_type VARCHAR
     );
     """)
+    con.execute(
+        "ALTER TABLE dim_asset ADD COLUMN IF NOT EXISTS is_active BOOLEAN DEFAULT TRUE"
+    )
+
+    assets = pa.table({
+        "position": pa.array(range(len(registry)), pa.int64()),
+        "asset_symbol": pa.array([a["symbol"] for a in registry], pa.string()),
+        "asset_type": pa.array([a["type"] for a in registry], pa.string()),
+        "is_active": pa.array(
+            [a.get("active", True) for a in registry], pa.bool_()
+        ),
+    })
+    con.register("asset_registry", assets)
+
+    try:
+        con.execute("BEGIN TRANSACTION")
+        con.execute("""
+        UPDATE dim_asset
+        SET asset_type = r.asset_type,
+            is_active = r.is_active
+        FROM asset_registry r
+        WHERE dim_asset.asset_symbol = r.asset_symbol;
+        """)
+        con.execute("""
+        UPDATE dim_asset
+        SET is_active = FALSE
+        WHERE asset_symbol NOT IN (SELECT asset_symbol FROM asset_registry);
+        """)
+        con.execute("""
+        INSERT INTO dim_asset (asset_key, asset_symbol, asset_type, is_active)
+        SELECT
+            (SELECT coalesce(max(asset_key), 0) FROM dim_asset)
+                + row_number() OVER (ORDER BY r.position),
+            r.asset_symbol,
+            r.asset_type,
+            r.is_active
+        FROM asset_registry r
+        ANTI JOIN dim_asset d
+          ON d.asset_symbol = r.asset_symbol;
+        """)
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        con.unregister("asset_registry")
+
 
-    con.execute("DELETE FROM dim_asset")
+def _last_hour(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time()) + timedelta(hours=23)
 
-    for i, (symbol, asset_type) in enumerate(assets, start=1):
-        con.execute(
-            "INSERT INTO dim_asset VALUES (?, ?, ?)",
-            [i, symbol, asset_type]
-        )
 
 if __name__ == "__main__":
     con = duckdb.connect(DB_PATH)
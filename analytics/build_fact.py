@@ -1,14 +1,24 @@
+import argparse
+from datetime import date
+
 import duckdb
 
+from build_dimensions import build_dim_datetime
+from build_rollups import build_rollups
+from lake import (
+    LAKE_ROOT,
+    fact_files,
+    partition_in_scope,
+    read_fact_files,
+)
+
 DB_PATH = "analytics.duckdb"
 
-DATA_LAKE_PATH = "data/lake_snapshot/**/*.parquet"
+# Lake files already loaded into fact_market_hourly, one row per file and
+# partition date (a compacted monthly file has a row for each of its days)
+MANIFEST_TABLE = "fact_market_hourly_manifest"
 
-def build_fact(con):
-    con.execute("DROP TABLE IF EXISTS fact_market_hourly")
-
-    con.execute(f"""
-    CREATE TABLE fact_market_hourly AS
+FACT_SELECT = """
     SELECT
         a.asset_key,
         d.datetime_key,
@@ -16,15 +26,226 @@ def build_fact(con):
         f.high_price,
         f.low_price,
         f.close_price,
-        f.volume
-    FROM read_parquet('{DATA_LAKE_PATH}') f
+        f.volume,
+        coalesce(f.data_gap_flag, FALSE) AS data_gap_flag
+    FROM {source} f
     JOIN dim_asset a
       ON f.asset = a.asset_symbol
     JOIN dim_datetime d
-      ON f.timestamp = d.datetime_utc;
+      -- hour_key is BIGINT in new partitions, VARCHAR in older ones
+      ON CAST(f.hour_key AS BIGINT) = d.datetime_key
+"""
+
+
+def build_fact(
+    con,
+    lake_root=LAKE_ROOT,
+    full=False,
+    start_date=None,
+    end_date=None,
+    assets=None,
+):
+    """
+    Load fact_market_hourly from the fact_market_hourly subtree of the
+    lake snapshot.
+
+    By default only (asset, date) partitions whose files are new, changed
+    (mtime or size) or removed since the last build are touched: their
+    rows are deleted and the partition's current files re-inserted, in
+    one transaction. full=True reloads every partition in scope; without
+    filters (or with no fact table yet) the table is rebuilt from scratch.
+
+    start_date / end_date (inclusive) and assets restrict the build to
+    those partitions; nothing outside them is listed, read or deleted.
+
+    Returns the (asset, 'YYYY-MM-DD') partitions (re)loaded or removed,
+    e.g. for build_rollups; None when the table was rebuilt from scratch,
+    since partitions removed from the lake are then in no list and every
+    rollup has to be recomputed.
+    """
+    scope = (start_date, end_date, assets)
+    scoped = any(f is not None for f in scope)
+    files = fact_files(lake_root, *scope)
+
+    if files:
+        # Hours past the end of dim_datetime would drop out of the join
+        latest = max(day for _, day in files)
+        build_dim_datetime(con, until=date.fromisoformat(latest))
+
+    if not _table_exists(con, "fact_market_hourly") or (full and not scoped):
+        return _rebuild(con, files)
+
+    # Tables built before data_gap_flag was carried into the fact
+    con.execute(
+        "ALTER TABLE fact_market_hourly "
+        "ADD COLUMN IF NOT EXISTS data_gap_flag BOOLEAN"
+    )
+    _create_manifest(con)
+    loaded = {
+        (path, day): (asset, day, mtime, size)
+        for path, asset, day, mtime, size in con.execute(
+            f"SELECT path, asset, CAST(date AS VARCHAR), mtime, size_bytes "
+            f"FROM {MANIFEST_TABLE}"
+        ).fetchall()
+        if partition_in_scope(asset, day, *scope)
+    }
+
+    if full:
+        changed = {meta[:2] for meta in files.values()}
+    else:
+        changed = {
+            meta[:2] for key, meta in files.items() if loaded.get(key) != meta
+        }
+    # Partitions whose files disappeared from the lake (or were compacted)
+    changed |= {
+        meta[:2] for key, meta in loaded.items()
+        if full or key not in files
+    }
+
+    if not changed:
+        return set()
+
+    reload = {
+        key: meta for key, meta in files.items() if meta[:2] in changed
+    }
+
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute(
+            "CREATE OR REPLACE TEMP TABLE changed_partitions "
+            "(asset VARCHAR, date DATE)"
+        )
+        con.executemany(
+            "INSERT INTO changed_partitions VALUES (?, ?)", sorted(changed)
+        )
+
+        con.execute("""
+        DELETE FROM fact_market_hourly f
+        USING dim_asset a, changed_partitions c
+        WHERE f.asset_key = a.asset_key
+          AND a.asset_symbol = c.asset
+          AND f.datetime_key // 100 = CAST(strftime(c.date, '%Y%m%d') AS BIGINT);
+        """)
+        con.execute(f"""
+        DELETE FROM {MANIFEST_TABLE} m
+        USING changed_partitions c
+        WHERE m.asset = c.asset AND m.date = c.date;
+        """)
+
+        if reload:
+            source, params = read_fact_files({path for path, _ in reload})
+            # A compacted file also holds days that did not change
+            source = f"""(
+                SELECT s.* FROM {source} s
+                SEMI JOIN changed_partitions c
+                  ON s.asset = c.asset AND s.date = c.date
+            )"""
+            con.execute(
+                "INSERT INTO fact_market_hourly "
+                + FACT_SELECT.format(source=source),
+                params,
+            )
+            _record_files(con, reload)
+
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+
+    return changed
+
+
+def _rebuild(con, files):
+    con.execute("DROP TABLE IF EXISTS fact_market_hourly")
+    con.execute(f"DROP TABLE IF EXISTS {MANIFEST_TABLE}")
+    _create_manifest(con)
+
+    if files:
+        source, params = read_fact_files({path for path, _ in files})
+        con.execute(
+            "CREATE TABLE fact_market_hourly AS "
+            + FACT_SELECT.format(source=source),
+            params,
+        )
+        _record_files(con, files)
+    else:
+        con.execute("""
+        CREATE TABLE fact_market_hourly (
+            asset_key INTEGER,
+            datetime_key BIGINT,
+            open_price DOUBLE,
+            high_price DOUBLE,
+            low_price DOUBLE,
+            close_price DOUBLE,
+            volume DOUBLE,
+            data_gap_flag BOOLEAN
+        );
+        """)
+
+    return None
+
+
+def _create_manifest(con):
+    con.execute(f"""
+    CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+        path VARCHAR,
+        asset VARCHAR,
+        date DATE,
+        mtime DOUBLE,
+        size_bytes BIGINT,
+        loaded_at TIMESTAMP
+    );
     """)
 
+
+def _record_files(con, files):
+    # The dim_asset join drops rows of unknown assets: leave their files
+    # unrecorded so they load once build_dim_asset adds the asset
+    known = {
+        symbol
+        for (symbol,) in con.execute("SELECT asset_symbol FROM dim_asset").fetchall()
+    }
+    rows = [
+        [path, asset, day, mtime, size]
+        for (path, _), (asset, day, mtime, size) in sorted(files.items())
+        if asset in known
+    ]
+    if rows:
+        con.executemany(
+            f"INSERT INTO {MANIFEST_TABLE} VALUES (?, ?, ?, ?, ?, now())", rows
+        )
+
+
+def _table_exists(con, name):
+    return con.execute(
+        "SELECT count(*) FROM information_schema.tables WHERE table_name = ?",
+        [name],
+    ).fetchone()[0] > 0
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="reload every partition in scope, not only changed ones",
+    )
+    parser.add_argument("--start-date", help="first date to load (YYYY-MM-DD)")
+    parser.add_argument("--end-date", help="last date to load (YYYY-MM-DD)")
+    parser.add_argument(
+        "--assets",
+        type=lambda value: value.split(","),
+        help="comma-separated asset symbols to load",
+    )
+    args = parser.parse_args()
+
     con = duckdb.connect(DB_PATH)
-    build_fact(con)
+    partitions = build_fact(
+        con,
+        full=args.full,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        assets=args.assets,
+    )
+    build_rollups(con, partitions)
     con.close()
@@ -0,0 +1,151 @@
+import duckdb
+
+DB_PATH = "analytics.duckdb"
+
+DAILY_TABLE = "agg_market_daily"
+WEEKLY_TABLE = "agg_market_weekly"
+
+# Typical price weighted by volume; NULL for a period with no volume
+VWAP = """
+        sum((f.high_price + f.low_price + f.close_price) / 3 * f.volume)
+            / nullif(sum(f.volume), 0)"""
+
+DAILY_SELECT = f"""
+    SELECT
+        f.asset_key,
+        make_date(
+            CAST(f.datetime_key // 1000000 AS INTEGER),
+            CAST(f.datetime_key // 10000 % 100 AS INTEGER),
+            CAST(f.datetime_key // 100 % 100 AS INTEGER)
+        ) AS trade_date,
+        arg_min(f.open_price, f.datetime_key) AS open_price,
+        max(f.high_price) AS high_price,
+        min(f.low_price) AS low_price,
+        arg_max(f.close_price, f.datetime_key) AS close_price,
+        sum(f.volume) AS volume,{VWAP} AS vwap,
+        count_if(f.data_gap_flag) AS gap_hours,
+        count(*) AS hours
+    FROM fact_market_hourly f
+    {{filter}}
+    GROUP BY 1, 2
+"""
+
+# Weekly bars roll up the daily ones; weeks start on Monday
+WEEKLY_SELECT = """
+    SELECT
+        d.asset_key,
+        CAST(date_trunc('week', d.trade_date) AS DATE) AS week_start,
+        arg_min(d.open_price, d.trade_date) AS open_price,
+        max(d.high_price) AS high_price,
+        min(d.low_price) AS low_price,
+        arg_max(d.close_price, d.trade_date) AS close_price,
+        sum(d.volume) AS volume,
+        sum(d.vwap * d.volume) / nullif(sum(d.volume), 0) AS vwap,
+        sum(d.gap_hours) AS gap_hours,
+        sum(d.hours) AS hours
+    FROM agg_market_daily d
+    {filter}
+    GROUP BY 1, 2
+"""
+
+
+def build_rollups(con, partitions=None):
+    """
+    Maintain agg_market_daily and agg_market_weekly from
+    fact_market_hourly.
+
+    partitions: (asset, 'YYYY-MM-DD') pairs reloaded by the latest
+                build_fact; only those days and the weeks containing
+                them are deleted and recomputed. None (or missing rollup
+                tables) recomputes both tables from the whole fact.
+
+    Returns the number of daily rows written.
+    """
+    if partitions is None or not _rollups_exist(con):
+        return _rebuild(con)
+
+    if not partitions:
+        return 0
+
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute("""
+        CREATE OR REPLACE TEMP TABLE rollup_partitions
+        (asset VARCHAR, trade_date DATE)
+        """)
+        con.executemany(
+            "INSERT INTO rollup_partitions VALUES (?, ?)", sorted(partitions)
+        )
+        con.execute("""
+        CREATE OR REPLACE TEMP TABLE rollup_days AS
+        SELECT DISTINCT
+            a.asset_key,
+            p.trade_date,
+            CAST(strftime(p.trade_date, '%Y%m%d') AS BIGINT) AS date_key,
+            CAST(date_trunc('week', p.trade_date) AS DATE) AS week_start
+        FROM rollup_partitions p
+        JOIN dim_asset a
+          ON a.asset_symbol = p.asset
+        """)
+        first_key, last_key = con.execute(
+            "SELECT min(date_key) * 100, max(date_key) * 100 + 23 FROM rollup_days"
+        ).fetchone()
+
+        con.execute(f"""
+        DELETE FROM {DAILY_TABLE} t
+        USING rollup_days r
+        WHERE t.asset_key = r.asset_key AND t.trade_date = r.trade_date
+        """)
+        written = con.execute(
+            f"INSERT INTO {DAILY_TABLE} " + DAILY_SELECT.format(filter="""
+    JOIN rollup_days r
+      ON f.asset_key = r.asset_key
+     AND f.datetime_key // 100 = r.date_key
+    -- lets the scan skip row groups outside the touched range
+    WHERE f.datetime_key BETWEEN ? AND ?"""),
+            [first_key, last_key],
+        ).fetchone()[0]
+
+        con.execute(f"""
+        DELETE FROM {WEEKLY_TABLE} t
+        USING (SELECT DISTINCT asset_key, week_start FROM rollup_days) r
+        WHERE t.asset_key = r.asset_key AND t.week_start = r.week_start
+        """)
+        con.execute(
+            f"INSERT INTO {WEEKLY_TABLE} " + WEEKLY_SELECT.format(filter="""
+    SEMI JOIN (SELECT DISTINCT asset_key, week_start FROM rollup_days) r
+      ON d.asset_key = r.asset_key
+     AND CAST(date_trunc('week', d.trade_date) AS DATE) = r.week_start""")
+        )
+
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+
+    return written
+
+
+def _rebuild(con):
+    con.execute(
+        f"CREATE OR REPLACE TABLE {DAILY_TABLE} AS "
+        + DAILY_SELECT.format(filter="")
+    )
+    con.execute(
+        f"CREATE OR REPLACE TABLE {WEEKLY_TABLE} AS "
+        + WEEKLY_SELECT.format(filter="")
+    )
+    return con.execute(f"SELECT count(*) FROM {DAILY_TABLE}").fetchone()[0]
+
+
+def _rollups_exist(con):
+    return con.execute(
+        "SELECT count(*) FROM information_schema.tables WHERE table_name IN (?, ?)",
+        [DAILY_TABLE, WEEKLY_TABLE],
+    ).fetchone()[0] == 2
+
+
+if __name__ == "__main__":
+    con = duckdb.connect(DB_PATH)
+    build_rollups(con)
+    con.close()
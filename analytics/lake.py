@@ -0,0 +1,168 @@
+import os
+from datetime import date
+
+import fsspec
+
+from storage.compaction import FACT_TABLE, compacted_partitions, load_manifest
+
+LAKE_ROOT = "data/lake_snapshot"
+
+# Partition date of a fact row; older files carry neither a `date` column
+# nor a BIGINT hour_key
+FACT_DATE = (
+    "CAST(strptime(CAST(CAST(hour_key AS BIGINT) // 100 AS VARCHAR), '%Y%m%d') "
+    "AS DATE)"
+)
+
+
+def fact_files(root=LAKE_ROOT, start_date=None, end_date=None, assets=None):
+    """
+    {(path, date): (asset, date, mtime, size)} for every fact partition,
+    pruned on the asset=/date= directory names and on the compaction
+    manifest before any parquet file is opened.
+
+    Days written by storage.compaction map to their monthly file (which
+    then appears once per day it holds); daily files of those days are
+    ignored even if they have not been deleted yet.
+
+    start_date / end_date are inclusive; assets limits the symbols read.
+    """
+    table_dir = os.path.join(root, FACT_TABLE)
+    files = {}
+
+    if not os.path.isdir(table_dir):
+        return files
+
+    for asset_dir in sorted(os.listdir(table_dir)):
+        asset = _partition_value(asset_dir, "asset")
+        if asset is None or (assets is not None and asset not in assets):
+            continue
+
+        asset_path = os.path.join(table_dir, asset_dir)
+        for date_dir in sorted(os.listdir(asset_path)):
+            day = _partition_value(date_dir, "date")
+            if day is None or not _in_range(day, start_date, end_date):
+                continue
+
+            date_path = os.path.join(asset_path, date_dir)
+            for name in sorted(os.listdir(date_path)):
+                if not name.endswith(".parquet"):
+                    continue
+                path = os.path.join(date_path, name)
+                stat = os.stat(path)
+                files[(path, day)] = (asset, day, stat.st_mtime, stat.st_size)
+
+    # Read after listing: daily files deleted by a compaction in between
+    # are already covered by the manifest it swapped in
+    compacted = compacted_partitions(_load_manifest(table_dir))
+    files = {
+        key: meta for key, meta in files.items() if meta[:2] not in compacted
+    }
+
+    for (asset, day), relative in sorted(compacted.items()):
+        if not partition_in_scope(asset, day, start_date, end_date, assets):
+            continue
+        path = os.path.join(table_dir, relative)
+        stat = os.stat(path)
+        files[(path, day)] = (asset, day, stat.st_mtime, stat.st_size)
+
+    return files
+
+
+def latest_fact_date(root=LAKE_ROOT):
+    """Latest fact partition date across all assets (None for an empty lake)."""
+    table_dir = os.path.join(root, FACT_TABLE)
+    if not os.path.isdir(table_dir):
+        return None
+
+    days = [
+        _partition_value(date_dir, "date")
+        for asset_dir in os.listdir(table_dir)
+        if _partition_value(asset_dir, "asset") is not None
+        for date_dir in os.listdir(os.path.join(table_dir, asset_dir))
+    ]
+    days = [day for day in days if day is not None]
+    days.extend(day for _, day in compacted_partitions(_load_manifest(table_dir)))
+
+    return date.fromisoformat(max(days)) if days else None
+
+
+def fact_scan(root=LAKE_ROOT, start_date=None, end_date=None, assets=None):
+    """
+    DuckDB FROM-clause over the fact partitions matching the filters.
+    Non-matching daily files are never opened; compacted monthly files
+    are read only for months in range and trimmed to it by the same
+    predicates (their row-group statistics let DuckDB skip most rows).
+
+    Returns (sql, params); the relation exposes `asset` and `date`.
+    """
+    paths = {path for path, _ in fact_files(root, start_date, end_date, assets)}
+    if not paths:
+        return "(SELECT NULL::VARCHAR AS asset, NULL::DATE AS date WHERE FALSE)", []
+
+    sql, params = read_fact_files(paths)
+    conditions, filter_params = _partition_filters(start_date, end_date, assets)
+
+    if conditions:
+        sql = f"(SELECT * FROM {sql} WHERE {' AND '.join(conditions)})"
+
+    return sql, params + filter_params
+
+
+def read_fact_files(paths):
+    """
+    DuckDB FROM-clause over an explicit list of fact files (e.g. from
+    fact_files), with the same columns as fact_scan.
+
+    Returns (sql, params).
+    """
+    return (
+        f"(SELECT COLUMNS(c -> c <> 'date'), {FACT_DATE} AS date "
+        "FROM read_parquet(?, union_by_name = true))",
+        [sorted(paths)],
+    )
+
+
+def partition_in_scope(asset, day, start_date=None, end_date=None, assets=None):
+    """Whether partition (asset, 'YYYY-MM-DD') falls inside the filters."""
+    if assets is not None and asset not in assets:
+        return False
+    return _in_range(day, start_date, end_date)
+
+
+def _partition_filters(start_date, end_date, assets):
+    conditions, params = [], []
+
+    if start_date is not None:
+        conditions.append("date >= ?")
+        params.append(_as_date(start_date))
+    if end_date is not None:
+        conditions.append("date <= ?")
+        params.append(_as_date(end_date))
+    if assets is not None:
+        conditions.append("list_contains(?, asset)")
+        params.append(sorted(assets))
+
+    return conditions, params
+
+
+def _load_manifest(table_dir):
+    return load_manifest(table_dir, fsspec.filesystem("file"))
+
+
+def _partition_value(name, key):
+    prefix = f"{key}="
+    return name[len(prefix):] if name.startswith(prefix) else None
+
+
+def _in_range(day, start_date, end_date):
+    # ISO dates compare correctly as strings
+    if start_date is not None and day < str(_as_date(start_date)):
+        return False
+    if end_date is not None and day > str(_as_date(end_date)):
+        return False
+    return True
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
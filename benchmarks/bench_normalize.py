@@ -0,0 +1,74 @@
+"""
+Compare the per-asset and vectorized normalize_to_hourly engines.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_normalize.py
+"""
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from processing.normalisasi import normalize_to_hourly
+
+
+EXECUTION_DATE = date(2025, 2, 1)
+ASSET_COUNTS = [10, 100, 1000]
+REPEATS = 3
+
+
+def make_cleaned_data(n_assets: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(EXECUTION_DATE, tz="UTC")
+    timestamps = pd.date_range(start=start, periods=24, freq="h")
+
+    cleaned_data = {}
+    for i in range(n_assets):
+        # drop a few hours (but never the first) to exercise gap handling
+        keep = rng.random(24) > 0.1
+        keep[0] = True
+        close = 100 + rng.standard_normal(24).cumsum()
+
+        cleaned_data[f"ASSET-{i:04d}"] = pd.DataFrame({
+            "timestamp": timestamps[keep],
+            "open_price": close[keep],
+            "high_price": close[keep] + 1,
+            "low_price": close[keep] - 1,
+            "close_price": close[keep],
+            "volume": rng.uniform(0, 1000, 24)[keep],
+        })
+
+    return cleaned_data
+
+
+def best_of(func, repeats: int = REPEATS) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print(f"{'assets':>8} {'per_asset (s)':>14} {'vectorized (s)':>15} {'speed-up':>9}")
+
+    for n_assets in ASSET_COUNTS:
+        cleaned_data = make_cleaned_data(n_assets)
+
+        per_asset = best_of(lambda: normalize_to_hourly(
+            cleaned_data, EXECUTION_DATE, engine="per_asset"
+        ))
+        vectorized = best_of(lambda: normalize_to_hourly(
+            cleaned_data, EXECUTION_DATE, engine="vectorized"
+        ))
+
+        print(
+            f"{n_assets:>8} {per_asset:>14.4f} {vectorized:>15.4f} "
+            f"{per_asset / vectorized:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
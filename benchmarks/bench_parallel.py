@@ -0,0 +1,93 @@
+"""
+Compare serial and process-pool clean -> normalize -> validate.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_parallel.py [workers]
+
+workers defaults to CPU_MAX_WORKERS (all cores). The pool is warmed up
+before timing, as it is reused across pipeline calls.
+"""
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from common.config import get_cpu_max_workers
+from processing.clean import clean_market_data
+from processing.normalisasi import normalize_to_hourly
+from processing.validate import check_hourly_data
+
+
+START_DATE = date(2025, 1, 1)
+DAYS = 30
+ASSET_COUNTS = [50, 200, 500]
+REPEATS = 3
+
+
+def make_raw_data(n_assets: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(
+        start=pd.Timestamp(START_DATE, tz="UTC"), periods=24 * DAYS, freq="h"
+    )
+    n = len(timestamps)
+
+    raw_data = {}
+    for i in range(n_assets):
+        keep = rng.random(n) > 0.1
+        keep[0] = True
+        close = 100 + rng.standard_normal(n).cumsum() * 0.1
+
+        raw_data[f"ASSET-{i:04d}"] = pd.DataFrame({
+            "Timestamp": timestamps[keep],
+            "Open": close[keep],
+            "High": close[keep] + 1,
+            "Low": close[keep] - 1,
+            "Close": close[keep],
+            "Volume": rng.integers(0, 1000, n)[keep],
+        })
+
+    return raw_data
+
+
+def run_stages(raw_data, workers):
+    end_date = START_DATE + timedelta(days=DAYS - 1)
+    cleaned = clean_market_data(raw_data, workers=workers)
+    hourly = normalize_to_hourly(
+        cleaned, START_DATE, engine="vectorized",
+        end_date=end_date, workers=workers,
+    )
+    check_hourly_data(hourly, START_DATE, end_date, workers=workers)
+
+
+def best_of(func, repeats: int = REPEATS) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else get_cpu_max_workers()
+    print(f"{DAYS} days per asset, {workers} workers")
+    print(f"{'assets':>8} {'serial (s)':>11} {'parallel (s)':>13} {'speed-up':>9}")
+
+    run_stages(make_raw_data(workers * 2), workers)  # warm up the pool
+
+    for n_assets in ASSET_COUNTS:
+        raw_data = make_raw_data(n_assets)
+
+        serial = best_of(lambda: run_stages(raw_data, None))
+        parallel = best_of(lambda: run_stages(raw_data, workers))
+
+        print(
+            f"{n_assets:>8} {serial:>11.4f} {parallel:>13.4f} "
+            f"{serial / parallel:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+DuckDB scan time of the fact lake before and after monthly compaction.
+
+Usage:
+    PYTHONPATH=src:analytics python benchmarks/bench_scan.py [assets] [days]
+
+Writes a local lake under a temporary directory (removed afterwards),
+times listing plus a full and a one-week scan, compacts every closed
+month with storage.compaction and times the same scans again.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import duckdb
+
+from bench_write import make_hourly_data
+from lake import fact_files, fact_scan
+from storage.backend import reset_filesystems
+from storage.compaction import compact_fact_partitions
+from storage.market_repository import write_fact_market_hourly
+
+
+ASSETS = 50
+DAYS = 120
+REPEATS = 3
+
+WEEK = (date(2025, 2, 3), date(2025, 2, 9))
+
+
+def time_scans(con, root):
+    """Best-of-REPEATS seconds for listing, full scan and one-week scan."""
+    timings = {"files": len({path for path, _ in fact_files(root)})}
+
+    queries = {
+        "list": lambda: fact_files(root),
+        "full_scan": lambda: _scan(con, root),
+        "week_scan": lambda: _scan(con, root, *WEEK),
+    }
+    for name, query in queries.items():
+        best = float("inf")
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            query()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+
+    return timings
+
+
+def _scan(con, root, start_date=None, end_date=None):
+    source, params = fact_scan(root, start_date, end_date)
+    return con.execute(
+        f"SELECT count(*), avg(close_price) FROM {source}", params
+    ).fetchone()
+
+
+def main():
+    assets = int(sys.argv[1]) if len(sys.argv) > 1 else ASSETS
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else DAYS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["STORAGE_BACKEND"] = "local"
+        os.environ["STORAGE_BASE_PATH"] = tmp
+        reset_filesystems()
+
+        write_fact_market_hourly(make_hourly_data(assets, days), "bench")
+        con = duckdb.connect()
+
+        before = time_scans(con, tmp)
+        last_day = date(2025, 1, 1) + timedelta(days=days)
+        stats = compact_fact_partitions(before=last_day)
+        after = time_scans(con, tmp)
+
+        print(f"{assets} assets x {days} days, compaction: {stats}")
+        print(f"{'':>10} {'files':>7} {'list s':>8} {'full s':>8} {'week s':>8}")
+        for label, t in (("daily", before), ("compacted", after)):
+            print(
+                f"{label:>10} {t['files']:>7} {t['list']:>8.3f} "
+                f"{t['full_scan']:>8.3f} {t['week_scan']:>8.3f}"
+            )
+
+    reset_filesystems()
+
+
+if __name__ == "__main__":
+    main()
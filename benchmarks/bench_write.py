@@ -0,0 +1,78 @@
+"""
+Write throughput of write_fact_market_hourly per storage backend.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_write.py [memory|local]
+
+The local backend writes under a temporary directory that is removed
+afterwards.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from storage.backend import reset_filesystems
+from storage.market_repository import write_fact_market_hourly
+
+
+ASSETS = 50
+DAYS = 30
+WORKER_COUNTS = [1, 4, 16]
+
+
+def make_hourly_data(n_assets: int, days: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(
+        start=pd.Timestamp("2025-01-01", tz="UTC"), periods=24 * days, freq="h"
+    )
+    n = len(timestamps)
+
+    hourly_data = {}
+    for i in range(n_assets):
+        asset = f"ASSET-{i:04d}"
+        close = 100 + rng.standard_normal(n).cumsum()
+        hourly_data[asset] = pd.DataFrame({
+            "asset": asset,
+            "hour_key": timestamps.strftime("%Y%m%d%H").astype("int64"),
+            "timestamp": timestamps,
+            "open_price": close,
+            "high_price": close + 1,
+            "low_price": close - 1,
+            "close_price": close,
+            "volume": rng.uniform(0, 1000, n),
+            "data_gap_flag": rng.random(n) < 0.05,
+        })
+
+    return hourly_data
+
+
+def main():
+    backend = sys.argv[1] if len(sys.argv) > 1 else "memory"
+    hourly_data = make_hourly_data(ASSETS, DAYS)
+    partitions = ASSETS * DAYS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["STORAGE_BACKEND"] = backend
+        os.environ["STORAGE_BASE_PATH"] = (
+            f"{tmp}/lake" if backend == "local" else "/lake"
+        )
+
+        print(f"backend={backend}, {partitions} partitions")
+        print(f"{'workers':>8} {'seconds':>9} {'partitions/s':>13}")
+
+        for workers in WORKER_COUNTS:
+            reset_filesystems()
+            start = time.perf_counter()
+            write_fact_market_hourly(hourly_data, "bench", max_workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>8} {elapsed:>9.3f} {partitions / elapsed:>13.0f}")
+
+    reset_filesystems()
+
+
+if __name__ == "__main__":
+    main()
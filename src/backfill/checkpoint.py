@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import date, datetime
+from typing import Dict, Optional, Set, Tuple
+
+import pandas as pd
+
+from common.config import get_checkpoint_sync_every
+
+
+Partition = Tuple[str, date]
+
+STATUS_SUCCESS = "SUCCESS"
+STATUS_EMPTY = "EMPTY"
+STATUS_FAILED = "FAILED"
+
+
+class BackfillCheckpoint:
+    """
+    Durable manifest of (asset, date) partitions handled by backfills.
+
+    Stored as append-only JSON lines; the latest record per partition
+    wins. Every record is flushed to the OS before returning, so a killed
+    backfill loses nothing; the file is fsync'ed every `sync_every`
+    records (BACKFILL_CHECKPOINT_SYNC_EVERY) and on sync(), so a host
+    crash loses at most the records since the last sync. Those partitions
+    are simply redone on resume.
+    """
+
+    def __init__(self, path: str, sync_every: Optional[int] = None):
+        self.path = path
+        self.sync_every = sync_every or get_checkpoint_sync_every()
+        self._lock = threading.Lock()
+        self._unsynced = 0
+
+    def load(self) -> Dict[Partition, Dict]:
+        records: Dict[Partition, Dict] = {}
+
+        if not os.path.exists(self.path):
+            return records
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # torn last line from a killed run
+                    continue
+                key = (record["asset"], date.fromisoformat(record["date"]))
+                records[key] = record
+
+        return records
+
+    def completed_partitions(self) -> Set[Partition]:
+        """
+        Partitions that need no further work. Only SUCCESS is final: the
+        batch source silently drops symbols it failed to fetch, so an
+        EMPTY partition is retried on resume.
+        """
+        return {
+            key for key, record in self.load().items()
+            if record["status"] == STATUS_SUCCESS
+        }
+
+    def record(
+        self,
+        asset: str,
+        partition_date: date,
+        status: str,
+        pipeline_run_id: str,
+        row_count: int = 0,
+        content_hash: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        line = json.dumps({
+            "asset": asset,
+            "date": str(partition_date),
+            "status": status,
+            "row_count": row_count,
+            "content_hash": content_hash,
+            "pipeline_run_id": pipeline_run_id,
+            "error": error,
+            "recorded_at": datetime.utcnow().isoformat(),
+        })
+
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                self._unsynced += 1
+                if self._unsynced >= self.sync_every:
+                    os.fsync(f.fileno())
+                    self._unsynced = 0
+
+    def sync(self) -> None:
+        """fsync records appended since the last sync."""
+        with self._lock:
+            if not self._unsynced or not os.path.exists(self.path):
+                return
+            with open(self.path, "a", encoding="utf-8") as f:
+                os.fsync(f.fileno())
+            self._unsynced = 0
+
+
+def content_hash(df: pd.DataFrame) -> str:
+    """Stable hash of a partition's content (row order sensitive)."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
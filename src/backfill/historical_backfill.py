@@ -1,9 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 import time
 
+import numpy as np
+import pandas as pd
+
+from backfill.checkpoint import (
+    BackfillCheckpoint,
+    Partition,
+    STATUS_EMPTY,
+    STATUS_FAILED,
+    STATUS_SUCCESS,
+    content_hash,
+)
 from pipeline.market_pipeline import run_market_pipeline
-from common.logging import log_pipeline_start, log_pipeline_end
-from common.errors import PipelineError
+from common.logging import log_pipeline_start, log_pipeline_end, log_error
+from common.config import (
+    load_active_assets,
+    get_backfill_asset_batch_size,
+    get_backfill_max_concurrency,
+    get_backfill_checkpoint_path,
+)
+from common.errors import (
+    DataValidationError,
+    PartitionWriteError,
+    PipelineError,
+    SourceError,
+)
+from common.pipeline_run import (
+    generate_run_id,
+    start_pipeline_run,
+    complete_pipeline_run,
+    finalize_pipeline_run,
+)
+from common.instrumentation import (
+    RunInstrumentation,
+    count_rows,
+    emit_run_summary,
+)
+from common.retry import retry
+from ingestion.yfinance import extract_market_data_batch
+from processing.clean import clean_market_data
+from processing.normalisasi import SEED_MAX_AGE, normalize_isolating_failures
+from processing.validate import check_hourly_data
+from storage.last_bar_repository import load_last_bars, update_last_bars
+from storage.market_repository import (
+    list_existing_partitions,
+    write_fact_market_hourly,
+)
+
+
+PIPELINE_NAME = "market_backfill"
+
+# Days fetched before each batch so its first hours can be seeded from
+# the previous bar even when the preceding chunk has not been written
+# yet; covers a weekend plus a holiday Monday for stocks
+SEED_LOOKBACK_DAYS = 4
 
 
 def daterange(start_date: date, end_date: date):
@@ -14,19 +67,139 @@ def daterange(start_date: date, end_date: date):
         current += timedelta(days=1)
 
 
+def date_chunks(
+    start_date: date,
+    end_date: date,
+    chunk_days: int,
+) -> List[Tuple[date, date]]:
+    """Split [start_date, end_date] into inclusive windows of chunk_days."""
+    chunks = []
+    current = start_date
+    while current <= end_date:
+        chunk_end = min(current + timedelta(days=chunk_days - 1), end_date)
+        chunks.append((current, chunk_end))
+        current = chunk_end + timedelta(days=1)
+    return chunks
+
+
 def run_historical_backfill(
     start_date: date,
     end_date: date,
     sleep_seconds: int = 2,
+    mode: str = "range",
+    chunk_days: int = 30,
+    max_concurrency: Optional[int] = None,
+    resume: bool = True,
+    checkpoint_path: Optional[str] = None,
+    asset_batch_size: Optional[int] = None,
 ):
     """
     Backfill market data from start_date to end_date (UTC).
 
-    - Reuses the same pipeline as scheduled runs
-    - Idempotent per date
-    - Safe to re-run
+    mode='range' (default):
+    - One batched source call per date chunk for all assets
+    - Clean once per asset over the whole chunk
+    - Up to max_concurrency chunks in flight, no fixed sleeps; each
+      chunk also fetches SEED_LOOKBACK_DAYS before it, so it is seeded
+      from its own data rather than from a chunk still in flight
+    - Within a chunk, assets are processed asset_batch_size at a time,
+      so memory is bounded by batch size x chunk_days, not the universe
+    - With resume=True, partitions already in the checkpoint manifest
+      or in the lake are not re-fetched or rewritten
+
+    mode='daily':
+    - Reuses the scheduled pipeline once per date, sleeping in between
+
+    Both modes are idempotent per date and safe to re-run.
+    """
+
+    if mode == "daily":
+        _run_daily_backfill(start_date, end_date, sleep_seconds)
+        return
+
+    max_concurrency = max_concurrency or get_backfill_max_concurrency()
+    asset_batch_size = asset_batch_size or get_backfill_asset_batch_size()
+    checkpoint = BackfillCheckpoint(
+        checkpoint_path or get_backfill_checkpoint_path()
+    )
+
+    assets = load_active_assets()
+
+    completed: Set[Partition] = set()
+    if resume:
+        completed = checkpoint.completed_partitions() | {
+            (asset, date.fromisoformat(date_value))
+            for asset, date_value in list_existing_partitions()
+        }
+
+    pending = plan_partitions(assets, start_date, end_date, completed)
+    seed_bars = load_last_bars(assets=[a["symbol"] for a in assets])
+
+    chunks = []
+    for chunk_start, chunk_end in date_chunks(start_date, end_date, chunk_days):
+        chunk_pending = {
+            (asset, d) for asset, d in pending if chunk_start <= d <= chunk_end
+        }
+        if chunk_pending:
+            chunks.append((chunk_start, chunk_end, chunk_pending))
+
+    print({
+        "event": "BACKFILL_PLANNED",
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        "pending_partitions": len(pending),
+        "skipped_partitions": len(completed),
+        "chunks": len(chunks),
+    })
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = [
+            executor.submit(
+                _backfill_chunk, assets, chunk_pending, checkpoint,
+                seed_bars, asset_batch_size,
+            )
+            for _, _, chunk_pending in chunks
+        ]
+
+        for (chunk_start, chunk_end, _), future in zip(chunks, futures):
+            try:
+                future.result()
+            except PipelineError as err:
+                # Do NOT stop entire backfill; other chunks still complete
+                print({
+                    "event": "BACKFILL_CHUNK_FAILED",
+                    "start_date": str(chunk_start),
+                    "end_date": str(chunk_end),
+                    "error": str(err),
+                })
+
+
+def plan_partitions(
+    assets: List[Dict[str, str]],
+    start_date: date,
+    end_date: date,
+    completed: Set[Partition],
+) -> Set[Partition]:
+    """
+    (asset, date) partitions in range that still need to be backfilled.
+    Stock partitions on weekends are never scheduled.
     """
+    pending = set()
+    for execution_date in daterange(start_date, end_date):
+        for asset in assets:
+            if asset["type"] == "stock" and execution_date.weekday() >= 5:
+                continue
+            key = (asset["symbol"], execution_date)
+            if key not in completed:
+                pending.add(key)
+    return pending
+
 
+def _run_daily_backfill(
+    start_date: date,
+    end_date: date,
+    sleep_seconds: int,
+):
     for execution_date in daterange(start_date, end_date):
         try:
             run_market_pipeline(
@@ -47,10 +220,385 @@ def run_historical_backfill(
             continue
 
 
+def _backfill_chunk(
+    assets: List[Dict[str, str]],
+    pending: Set[Partition],
+    checkpoint: BackfillCheckpoint,
+    seed_bars: Dict[str, Dict],
+    asset_batch_size: int,
+) -> None:
+    pipeline_run_id = generate_run_id()
+    instr = RunInstrumentation(PIPELINE_NAME, pipeline_run_id)
+    chunk_start = min(d for _, d in pending)
+
+    start_pipeline_run(
+        pipeline_run_id=pipeline_run_id,
+        pipeline_name=PIPELINE_NAME,
+        run_type="backfill",
+        execution_date=chunk_start,
+    )
+    log_pipeline_start(
+        pipeline_name=PIPELINE_NAME,
+        run_id=pipeline_run_id,
+        execution_date=chunk_start,
+    )
+
+    status = "SUCCESS"
+
+    try:
+        # Only one asset batch of the chunk is held in memory at a time
+        for batch_pending in _asset_batches(pending, asset_batch_size):
+            if not _backfill_asset_batch(
+                assets, batch_pending, pipeline_run_id, checkpoint,
+                seed_bars, instr,
+            ):
+                status = "PARTIAL_SUCCESS"
+
+    except PipelineError:
+        status = "FAILED"
+        raise
+
+    finally:
+        checkpoint.sync()
+        complete_pipeline_run(
+            pipeline_run_id=pipeline_run_id,
+            status=status,
+        )
+        finalize_pipeline_run(
+            pipeline_run_id,
+            summary=emit_run_summary(instr),
+            asset_count=len({asset for asset, _ in pending}),
+        )
+        log_pipeline_end(
+            pipeline_name=PIPELINE_NAME,
+            run_id=pipeline_run_id,
+        )
+
+
+def _asset_batches(
+    pending: Set[Partition],
+    asset_batch_size: int,
+) -> Iterator[Set[Partition]]:
+    """Yield the pending partitions of asset_batch_size assets at a time."""
+    pending_assets = sorted({asset for asset, _ in pending})
+
+    for i in range(0, len(pending_assets), asset_batch_size):
+        batch = set(pending_assets[i:i + asset_batch_size])
+        yield {key for key in pending if key[0] in batch}
+
+
+def _backfill_asset_batch(
+    assets: List[Dict[str, str]],
+    pending: Set[Partition],
+    pipeline_run_id: str,
+    checkpoint: BackfillCheckpoint,
+    seed_bars: Dict[str, Dict],
+    instr: RunInstrumentation,
+) -> bool:
+    """
+    Extract, process and write one asset batch; returns False if any of
+    its assets failed validation or any write failed.
+    """
+    pending_assets = {asset for asset, _ in pending}
+    batch_start = min(d for _, d in pending)
+    batch_end = max(d for _, d in pending)
+    all_ok = True
+
+    # 1. One wide extraction for the batch over the chunk, plus the
+    #    lookback days that seed it
+    with instr.stage("extract") as metrics:
+        raw_by_date = retry(
+            func=extract_market_data_batch,
+            retries=3,
+            retry_on=SourceError,
+            assets=[a for a in assets if a["symbol"] in pending_assets],
+            start_date=batch_start - timedelta(days=SEED_LOOKBACK_DAYS),
+            end_date=batch_end,
+            pipeline_run_id=pipeline_run_id,
+        )
+        raw_range = _concat_by_asset(raw_by_date)
+        metrics.rows_out = count_rows(raw_range)
+
+    # 2. Clean each asset once over the full range
+    with instr.stage("clean", rows_in=metrics.rows_out) as metrics:
+        cleaned_range = clean_market_data(raw_range)
+        metrics.rows_out = count_rows(cleaned_range)
+    del raw_range
+
+    # Dates the source had no bars for are not written
+    bar_dates: Dict[str, List[date]] = {}
+    for asset, execution_date in sorted(pending):
+        if asset in raw_by_date.get(execution_date, {}):
+            bar_dates.setdefault(asset, []).append(execution_date)
+        else:
+            checkpoint.record(
+                asset, execution_date, STATUS_EMPTY, pipeline_run_id
+            )
+    del raw_by_date
+
+    # 3. Normalize & validate each asset over its own dates, one
+    #    vectorized call per distinct grid
+    with instr.stage("normalize", rows_in=metrics.rows_out) as metrics:
+        hourly_range, grid_starts, failures = _normalize_range(
+            cleaned_range, bar_dates, seed_bars
+        )
+        metrics.rows_out = count_rows(hourly_range)
+    del cleaned_range
+
+    logged: Set[str] = set()
+    for (asset, execution_date), err in sorted(failures.items()):
+        all_ok = False
+        if asset not in logged:
+            logged.add(asset)
+            log_error(
+                pipeline_run_id=pipeline_run_id,
+                step="VALIDATION",
+                error_type="DATA_ERROR",
+                error=err,
+            )
+        checkpoint.record(
+            asset, execution_date, STATUS_FAILED,
+            pipeline_run_id, error=str(err),
+        )
+
+    pending_rows = _select_pending_rows(
+        hourly_range,
+        grid_starts,
+        {
+            (asset, d) for asset, dates in bar_dates.items() for d in dates
+            if (asset, d) not in failures
+        },
+    )
+    del hourly_range
+
+    # 4. Bulk-write every pending partition of the batch
+    if not _write_partitions(pending_rows, pipeline_run_id, checkpoint, instr):
+        all_ok = False
+
+    return all_ok
+
+
+def _concat_by_asset(
+    raw_by_date: Dict[date, Dict[str, pd.DataFrame]],
+) -> Dict[str, pd.DataFrame]:
+    frames: Dict[str, List[pd.DataFrame]] = {}
+    for execution_date in sorted(raw_by_date):
+        for asset, df in raw_by_date[execution_date].items():
+            frames.setdefault(asset, []).append(df)
+
+    return {
+        asset: pd.concat(asset_frames, ignore_index=True)
+        for asset, asset_frames in frames.items()
+    }
+
+
+def _normalize_range(
+    cleaned_range: Dict[str, pd.DataFrame],
+    bar_dates: Dict[str, List[date]],
+    seed_bars: Dict[str, Dict],
+) -> Tuple[
+    Dict[str, pd.DataFrame],
+    Dict[str, date],
+    Dict[Partition, PipelineError],
+]:
+    """
+    Normalize and validate each asset over its own grid, from the first
+    to the last date it has bars for, so a later-starting asset (a stock
+    next to weekend crypto, a new listing) is not held to the batch's
+    earliest date. Assets sharing a grid go through one vectorized pass.
+
+    Leading dates whose first hours cannot be filled (no bar at midnight
+    and no earlier bar within SEED_MAX_AGE) fail on their own; the grid
+    then starts after them, seeded from the bars before it.
+
+    Returns (hourly frames, {asset: grid start}, {(asset, date): error}).
+    """
+    hourly_range: Dict[str, pd.DataFrame] = {}
+    grid_starts: Dict[str, date] = {}
+    failures: Dict[Partition, PipelineError] = {}
+    grids: Dict[Tuple[date, date], Dict[str, Dict]] = {}
+
+    for asset, dates in bar_dates.items():
+        if asset not in cleaned_range:
+            continue
+
+        start, seed = _first_fillable_date(
+            cleaned_range[asset], dates, seed_bars.get(asset)
+        )
+        for execution_date in dates:
+            if start is not None and execution_date >= start:
+                break
+            failures[(asset, execution_date)] = DataValidationError(
+                f"Unfillable leading gap for asset={asset} on "
+                f"{execution_date}: no bar at midnight and no seed bar"
+            )
+        if start is not None:
+            grid_starts[asset] = start
+            grids.setdefault((start, dates[-1]), {})[asset] = seed
+
+    for (start_date, end_date), seeds in sorted(grids.items()):
+        grid_hourly, grid_failures = normalize_isolating_failures(
+            cleaned_data={asset: cleaned_range[asset] for asset in seeds},
+            execution_date=start_date,
+            end_date=end_date,
+            engine="vectorized",
+            seed_bars={a: seed for a, seed in seeds.items() if seed},
+        )
+
+        if grid_hourly:
+            report = check_hourly_data(
+                hourly_data=grid_hourly,
+                execution_date=start_date,
+                end_date=end_date,
+            )
+            for asset in report.failed_assets:
+                grid_failures[asset] = DataValidationError(
+                    "; ".join(v.message for v in report.for_asset(asset))
+                )
+                del grid_hourly[asset]
+
+        hourly_range.update(grid_hourly)
+        for asset, err in grid_failures.items():
+            for execution_date in bar_dates[asset]:
+                if execution_date >= start_date:
+                    failures[(asset, execution_date)] = err
+
+    return hourly_range, grid_starts, failures
+
+
+def _first_fillable_date(
+    df: pd.DataFrame,
+    dates: List[date],
+    seed_bar: Optional[Dict],
+) -> Tuple[Optional[date], Optional[Dict]]:
+    """
+    First of dates (sorted) whose hourly grid can be filled from its
+    first hour, and the seed bar for a grid starting there: the asset's
+    last bar before that midnight, else the stored seed_bar.
+    """
+    bars = df.sort_values("timestamp", kind="stable")
+    timestamps = bars["timestamp"]
+
+    for execution_date in dates:
+        grid_start = pd.Timestamp(execution_date, tz="UTC")
+        position = timestamps.searchsorted(grid_start, side="left")
+
+        seed = seed_bar
+        if position > 0:
+            row = bars.iloc[position - 1]
+            seed = {
+                "timestamp": row["timestamp"],
+                "close_price": row["close_price"],
+            }
+
+        seeded = (
+            seed is not None
+            and grid_start - SEED_MAX_AGE <= seed["timestamp"] < grid_start
+        )
+        at_midnight = (
+            position < len(timestamps)
+            and timestamps.iloc[position] < grid_start + pd.Timedelta(hours=1)
+        )
+        if seeded or at_midnight:
+            return execution_date, seed
+
+    return None, None
+
+
+def _select_pending_rows(
+    hourly_range: Dict[str, pd.DataFrame],
+    grid_starts: Dict[str, date],
+    pending: Set[Partition],
+) -> Dict[str, Tuple[List[date], pd.DataFrame]]:
+    """
+    Take the 24-hour blocks of each asset's pending dates out of its
+    24 x N-hour frame (starting at grid_starts[asset]) in one copy:
+    {asset: (dates, rows)}.
+    """
+    dates_by_asset: Dict[str, List[date]] = {}
+    for asset, execution_date in sorted(pending):
+        if asset in hourly_range:
+            dates_by_asset.setdefault(asset, []).append(execution_date)
+
+    selected = {}
+    for asset, dates in dates_by_asset.items():
+        start_date = grid_starts[asset]
+        offsets = np.array([(d - start_date).days * 24 for d in dates])
+        positions = (offsets[:, None] + np.arange(24)).reshape(-1)
+        selected[asset] = (
+            dates,
+            hourly_range[asset].iloc[positions].reset_index(drop=True),
+        )
+
+    return selected
+
+
+def _write_partitions(
+    pending_rows: Dict[str, Tuple[List[date], pd.DataFrame]],
+    pipeline_run_id: str,
+    checkpoint: BackfillCheckpoint,
+    instr: RunInstrumentation,
+) -> bool:
+    """
+    Write every pending partition in one bulk call (the writer splits
+    each asset's frame by date); returns False if any write failed.
+    """
+    if not pending_rows:
+        return True
+
+    failed: Dict[Partition, Exception] = {}
+
+    hourly_data = {asset: df for asset, (_, df) in pending_rows.items()}
+
+    try:
+        with instr.stage("write", rows_in=count_rows(hourly_data)) as metrics:
+            metrics.bytes_written = write_fact_market_hourly(
+                hourly_data=hourly_data,
+                pipeline_run_id=pipeline_run_id,
+            )
+            metrics.rows_out = metrics.rows_in
+    except PartitionWriteError as err:
+        for (asset, date_value), partition_err in err.failures.items():
+            dates = (
+                pending_rows[asset][0] if date_value is None
+                else [date.fromisoformat(date_value)]
+            )
+            for execution_date in dates:
+                failed[(asset, execution_date)] = partition_err
+    except PipelineError as err:
+        for asset, (dates, _) in pending_rows.items():
+            for execution_date in dates:
+                failed[(asset, execution_date)] = err
+
+    last_written: Dict[str, pd.DataFrame] = {}
+
+    for asset, (dates, df) in pending_rows.items():
+        for i, execution_date in enumerate(dates):
+            err = failed.get((asset, execution_date))
+            if err is not None:
+                checkpoint.record(
+                    asset, execution_date, STATUS_FAILED,
+                    pipeline_run_id, error=str(err),
+                )
+                continue
+
+            day = df.iloc[i * 24:(i + 1) * 24].reset_index(drop=True)
+            checkpoint.record(
+                asset, execution_date, STATUS_SUCCESS, pipeline_run_id,
+                row_count=len(day),
+                content_hash=content_hash(day),
+            )
+            last_written[asset] = day
+
+    if last_written:
+        update_last_bars(hourly_data=last_written, pipeline_run_id=pipeline_run_id)
+
+    return not failed
+
+
 if __name__ == "__main__":
     # buat tes pakai range dikit aja dulu
     run_historical_backfill(
         start_date=date(2025, 1, 1),
         end_date=date.today(),
-        sleep_seconds=2,
     )
@@ -1,27 +1,222 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 import os
 
+import yaml
+
+from common.errors import SystemError
+
+
+ASSETS_FILE = "assets.yaml"
+
+
+def load_asset_registry() -> List[Dict]:
+    """
+    Every asset in config/assets.yaml, active or not, in file order.
+    """
+    path = os.path.join(get_config_dir(), ASSETS_FILE)
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = (yaml.safe_load(f) or {}).get("assets") or []
+    except (OSError, yaml.YAMLError) as err:
+        raise SystemError(f"Failed to load asset registry from {path}: {err}")
+
+    registry = []
+    for entry in entries:
+        if not entry.get("symbol") or not entry.get("type"):
+            raise SystemError(f"Asset entry {entry} in {path} needs symbol and type")
+        registry.append({**entry, "active": bool(entry.get("active", True))})
+
+    return registry
+
 
 def load_active_assets() -> List[Dict[str, str]]:
-     return [
-        # Crypto
-        {"symbol": "BTC-USD", "type": "crypto"},
-        {"symbol": "ETH-USD", "type": "crypto"},
-        {"symbol": "LTC-USD", "type": "crypto"},
-        {"symbol": "XRP-USD", "type": "crypto"},
-        {"symbol": "SOL-USD", "type": "crypto"},
-
-        # Stock
-        {"symbol": "AAPL", "type": "stock"},
-        {"symbol": "MSFT", "type": "stock"},
-        {"symbol": "GOOGL", "type": "stock"},
-        {"symbol": "AMZN", "type": "stock"},
-        {"symbol": "NVDA", "type": "stock"},
+    return [
+        {k: v for k, v in asset.items() if k != "active"}
+        for asset in load_asset_registry()
+        if asset["active"]
     ]
 
 
+def get_environment() -> str:
+    """
+    Deployment environment; selects config/<env>.yaml.
+    """
+    return os.getenv("PIPELINE_ENV", "local")
+
+
+def load_environment_config() -> Dict:
+    """
+    Settings from config/<env>.yaml ({} if the file is missing or empty).
+    """
+    path = os.path.join(get_config_dir(), f"{get_environment()}.yaml")
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _storage_setting(key: str, env_var: str, default: str) -> str:
+    value = os.getenv(env_var)
+    if value:
+        return value
+    return str(load_environment_config().get("storage", {}).get(key, default))
+
+
+def get_storage_backend() -> str:
+    """
+    Storage backend: 'local' | 'memory' | 'azure'.
+
+    Only the local environment defaults to 'local'; any other
+    PIPELINE_ENV must set the backend, so a deployment whose config is
+    missing fails instead of quietly writing to local disk.
+    """
+    backend = os.getenv("STORAGE_BACKEND") or (
+        load_environment_config().get("storage", {}).get("backend")
+    )
+    if backend:
+        return str(backend)
+
+    environment = get_environment()
+    if environment != "local":
+        raise SystemError(
+            f"No storage backend configured for PIPELINE_ENV={environment}; "
+            f"set STORAGE_BACKEND or storage.backend in {environment}.yaml"
+        )
+    return "local"
+
+
 def get_storage_base_path() -> str:
     """
     Base path for analytics storage.
     """
-    return os.getenv("STORAGE_BASE_PATH", "./data/analytics")
+    return _storage_setting("base_path", "STORAGE_BASE_PATH", "./data/analytics")
+
+
+def get_azure_storage_account() -> str:
+    """
+    Azure storage account used by the 'azure' backend.
+    """
+    return _storage_setting("account_name", "AZURE_STORAGE_ACCOUNT", "marketpipeline")
+
+
+def get_extract_max_workers() -> int:
+    """
+    Upper bound on concurrent extraction calls across all sources.
+    """
+    return int(os.getenv("EXTRACT_MAX_WORKERS", "16"))
+
+
+def get_source_concurrency_limit() -> int:
+    """
+    Upper bound on concurrent calls against a single data source.
+    """
+    return int(os.getenv("EXTRACT_SOURCE_CONCURRENCY", "8"))
+
+
+def get_cpu_max_workers() -> int:
+    """
+    Worker processes for CPU-bound stages (normalize).
+    """
+    return int(os.getenv("CPU_MAX_WORKERS", str(os.cpu_count() or 1)))
+
+
+def get_upload_max_workers() -> int:
+    """
+    Concurrent partition writes against the analytics store.
+    """
+    return int(os.getenv("UPLOAD_MAX_WORKERS", "8"))
+
+
+def get_compaction_grace_days() -> int:
+    """
+    Days after a month ends before its daily fact partitions are
+    compacted (late data and backfills land in daily files first).
+    """
+    return int(os.getenv("COMPACTION_GRACE_DAYS", "7"))
+
+
+def get_compaction_retention_minutes() -> int:
+    """
+    Minutes files replaced by a compaction are kept before a later
+    compaction deletes them, so readers holding the previous manifest
+    can still open them.
+    """
+    return int(os.getenv("COMPACTION_RETENTION_MINUTES", "60"))
+
+
+def get_event_buffer_size() -> int:
+    """
+    Pipeline events buffered before the event sink flushes a file.
+    """
+    return int(os.getenv("EVENT_BUFFER_SIZE", "1000"))
+
+
+def get_event_flush_interval() -> float:
+    """
+    Seconds after which buffered pipeline events are flushed anyway.
+    """
+    return float(os.getenv("EVENT_FLUSH_INTERVAL_SECONDS", "30"))
+
+
+def get_backfill_max_concurrency() -> int:
+    """
+    Number of backfill date chunks processed in parallel.
+    """
+    return int(os.getenv("BACKFILL_MAX_CONCURRENCY", "4"))
+
+
+def get_backfill_asset_batch_size() -> int:
+    """
+    Assets extracted and processed together within one backfill chunk.
+    """
+    return int(os.getenv("BACKFILL_ASSET_BATCH_SIZE", "50"))
+
+
+def get_stream_max_in_flight() -> int:
+    """
+    Raw frames extracted ahead of the rest of a streaming pipeline run.
+    """
+    return int(os.getenv("STREAM_MAX_IN_FLIGHT", "4"))
+
+
+def get_backfill_checkpoint_path() -> str:
+    """
+    Local path of the backfill checkpoint manifest (JSON lines).
+    """
+    return os.getenv(
+        "BACKFILL_CHECKPOINT_PATH",
+        f"{get_storage_base_path()}/_checkpoints/backfill_manifest.jsonl",
+    )
+
+
+def get_checkpoint_sync_every() -> int:
+    """
+    Backfill checkpoint records appended between two fsyncs.
+    """
+    return int(os.getenv("BACKFILL_CHECKPOINT_SYNC_EVERY", "100"))
+
+
+def get_last_bar_store_path() -> str:
+    """
+    Local SQLite file holding the latest known bar per asset.
+    """
+    return os.getenv("LAST_BAR_STORE_PATH", "./data/state/last_bar.sqlite")
+
+
+def get_metrics_textfile_dir() -> Optional[str]:
+    """
+    Directory for Prometheus textfile metrics; unset disables the export.
+    """
+    return os.getenv("METRICS_TEXTFILE_DIR") or None
+
+
+def get_config_dir() -> str:
+    """
+    Directory holding the YAML config files (assets, contracts,
+    environments).
+    """
+    default = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "..", "config"
+    )
+    return os.getenv("CONFIG_DIR", os.path.normpath(default))
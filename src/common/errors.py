@@ -12,3 +12,11 @@ class DataValidationError(PipelineError):
 
 class SystemError(PipelineError):
     """Internal pipeline/system error."""
+
+
+class PartitionWriteError(SystemError):
+    """One or more partitions failed to write; the rest were written."""
+
+    def __init__(self, message: str, failures: dict):
+        super().__init__(message)
+        self.failures = failures
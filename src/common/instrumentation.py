@@ -0,0 +1,262 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Mapping, Optional
+
+import pandas as pd
+
+from common.config import get_metrics_textfile_dir
+from common.logging import log_run_summary
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+@dataclass
+class StageMetrics:
+    stage: str
+    asset: Optional[str] = None
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    started_at: float = 0.0  # Unix time, comparable across processes
+    rows_in: int = 0
+    rows_out: int = 0
+    bytes_written: int = 0
+    peak_rss_bytes: Optional[int] = None
+    failed: bool = False
+
+
+class RunInstrumentation:
+    """
+    Collects per-stage (and optionally per-asset) metrics for one run.
+
+        instr = RunInstrumentation("market_pipeline", run_id)
+        with instr.stage("normalize", rows_in=count_rows(cleaned)) as m:
+            hourly = normalize_to_hourly(...)
+            m.rows_out = count_rows(hourly)
+
+    CPU time is that of the thread running the stage; peak RSS is the
+    process high-water mark when the stage ends. Safe to use from
+    several threads at once.
+    """
+
+    def __init__(self, pipeline_name: str, run_id: str):
+        self.pipeline_name = pipeline_name
+        self.run_id = run_id
+        self.records: List[StageMetrics] = []
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(
+        self,
+        name: str,
+        asset: Optional[str] = None,
+        rows_in: int = 0,
+    ) -> Iterator[StageMetrics]:
+        try:
+            with measure(name, asset, rows_in) as metrics:
+                yield metrics
+        finally:
+            self.add(metrics)
+
+    def add(self, metrics: StageMetrics) -> None:
+        with self._lock:
+            self.records.append(metrics)
+
+    def summary(self) -> Dict:
+        """
+        One structured summary: totals per stage, in first-seen order.
+        wall_seconds sums the calls (so concurrent per-asset calls add
+        up); span_seconds is the stage's elapsed time, from its first
+        call starting to its last call ending.
+        """
+        with self._lock:
+            records = list(self.records)
+
+        stages: Dict[str, Dict] = {}
+        for m in records:
+            totals = stages.setdefault(m.stage, {
+                "calls": 0,
+                "assets": set(),
+                "failed": 0,
+                "wall_seconds": 0.0,
+                "cpu_seconds": 0.0,
+                "rows_in": 0,
+                "rows_out": 0,
+                "bytes_written": 0,
+                "max_asset_wall_seconds": 0.0,
+                "slowest_asset": None,
+                "first_start": m.started_at,
+                "last_end": m.started_at,
+            })
+            totals["calls"] += 1
+            totals["failed"] += int(m.failed)
+            totals["wall_seconds"] += m.wall_seconds
+            totals["cpu_seconds"] += m.cpu_seconds
+            totals["rows_in"] += m.rows_in
+            totals["rows_out"] += m.rows_out
+            totals["bytes_written"] += m.bytes_written or 0
+            totals["first_start"] = min(totals["first_start"], m.started_at)
+            totals["last_end"] = max(
+                totals["last_end"], m.started_at + m.wall_seconds
+            )
+            if m.asset is not None:
+                totals["assets"].add(m.asset)
+                if m.wall_seconds > totals["max_asset_wall_seconds"]:
+                    totals["max_asset_wall_seconds"] = m.wall_seconds
+                    totals["slowest_asset"] = m.asset
+
+        for totals in stages.values():
+            totals["assets"] = len(totals["assets"])
+            totals["span_seconds"] = (
+                totals.pop("last_end") - totals.pop("first_start")
+            )
+            for key in (
+                "wall_seconds",
+                "span_seconds",
+                "cpu_seconds",
+                "max_asset_wall_seconds",
+            ):
+                totals[key] = round(totals[key], 6)
+
+        return {
+            "event": "PIPELINE_RUN_SUMMARY",
+            "pipeline": self.pipeline_name,
+            "run_id": self.run_id,
+            "wall_seconds": round(time.perf_counter() - self._started, 6),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": stages,
+        }
+
+    def stage_records(self) -> List[Dict]:
+        with self._lock:
+            return [asdict(m) for m in self.records]
+
+    def to_prometheus(self, summary: Optional[Dict] = None) -> str:
+        """
+        Prometheus text exposition (also valid OpenMetrics gauges).
+        Labelled by pipeline and stage only; per-asset detail stays in
+        the run summary to keep label cardinality bounded.
+        """
+        summary = summary or self.summary()
+        prefix = "market_pipeline"
+        labels = f'pipeline="{self.pipeline_name}"'
+
+        lines: List[str] = []
+
+        def gauge(name: str, help_text: str, samples: Mapping[str, float]):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            for label_set, value in samples.items():
+                lines.append(f"{prefix}_{name}{{{label_set}}} {value}")
+
+        gauge("run_wall_seconds", "Wall time of the last run.",
+              {labels: summary["wall_seconds"]})
+        if summary["peak_rss_bytes"] is not None:
+            gauge("run_peak_rss_bytes", "Peak RSS of the last run.",
+                  {labels: summary["peak_rss_bytes"]})
+        gauge("run_timestamp_seconds", "Unix time the last run finished.",
+              {labels: round(time.time(), 3)})
+
+        for field, help_text in (
+            ("wall_seconds", "Wall time per stage, summed over calls."),
+            ("span_seconds", "Elapsed time per stage, first call to last."),
+            ("cpu_seconds", "CPU time per stage, summed over calls."),
+            ("rows_in", "Rows entering each stage."),
+            ("rows_out", "Rows leaving each stage."),
+            ("bytes_written", "Bytes written by each stage."),
+            ("calls", "Stage invocations (per asset where applicable)."),
+            ("failed", "Stage invocations that raised."),
+        ):
+            gauge(f"stage_{field}", help_text, {
+                f'{labels},stage="{stage}"': totals[field]
+                for stage, totals in summary["stages"].items()
+            })
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus_textfile(
+        self,
+        directory: str,
+        summary: Optional[Dict] = None,
+    ) -> str:
+        """
+        Atomically replace <directory>/<pipeline>.prom, for the
+        node_exporter textfile collector.
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.pipeline_name}.prom")
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".prom.tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus(summary))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return path
+
+
+def emit_run_summary(instr: RunInstrumentation) -> Dict:
+    """
+    Log the run summary and, if METRICS_TEXTFILE_DIR is set, export it
+    as a Prometheus textfile.
+    """
+    summary = instr.summary()
+    log_run_summary(summary)
+
+    directory = get_metrics_textfile_dir()
+    if directory:
+        instr.write_prometheus_textfile(directory, summary)
+
+    return summary
+
+
+@contextmanager
+def measure(
+    name: str,
+    asset: Optional[str] = None,
+    rows_in: int = 0,
+) -> Iterator[StageMetrics]:
+    """Measure a block without recording it (e.g. inside a worker process)."""
+    metrics = StageMetrics(
+        stage=name, asset=asset, rows_in=rows_in, started_at=time.time()
+    )
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield metrics
+    except BaseException:
+        metrics.failed = True
+        raise
+    finally:
+        metrics.wall_seconds = time.perf_counter() - wall_start
+        metrics.cpu_seconds = time.thread_time() - cpu_start
+        metrics.peak_rss_bytes = peak_rss_bytes()
+
+
+def count_rows(frames) -> int:
+    """Rows in a frame or in a {asset: frame} dict."""
+    if frames is None:
+        return 0
+    if isinstance(frames, pd.DataFrame):
+        return len(frames)
+    return sum(len(df) for df in frames.values() if df is not None)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
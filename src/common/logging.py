@@ -39,5 +39,40 @@ def log_error(
     })
 
 
+def log_storage_backend(backend: str, environment: str, base_path: str):
+    logging.info({
+        "event": "STORAGE_BACKEND",
+        "backend": backend,
+        "environment": environment,
+        "base_path": base_path,
+        "timestamp": _now(),
+    })
+
+
+def log_run_summary(summary: dict):
+    logging.info({
+        **summary,
+        "timestamp": _now(),
+    })
+
+
 def _now():
     return datetime.utcnow().isoformat()
+
+
+def log_stage_profile(
+    step: str,
+    stage: str,
+    asset: str,
+    seconds: float,
+    peak_bytes: int,
+):
+    logging.info({
+        "event": "STAGE_PROFILE",
+        "step": step,
+        "stage": stage,
+        "asset": asset,
+        "seconds": round(seconds, 6),
+        "peak_bytes": peak_bytes,
+        "timestamp": _now(),
+    })
@@ -1,5 +1,16 @@
+import threading
 import uuid
 from datetime import datetime
+from typing import Dict, Optional
+
+from common.errors import SystemError
+from common.logging import log_error
+from storage.run_registry_repository import write_pipeline_run
+
+
+# Runs started in this process and not yet finalized
+_runs: Dict[str, Dict] = {}
+_lock = threading.Lock()
 
 
 def generate_run_id() -> str:
@@ -12,14 +23,24 @@ def start_pipeline_run(
     run_type: str,
     execution_date,
 ):
-    # In real production this could be a DB insert
+    start_time = datetime.utcnow()
+
+    with _lock:
+        _runs[pipeline_run_id] = {
+            "pipeline_run_id": pipeline_run_id,
+            "pipeline_name": pipeline_name,
+            "run_type": run_type,
+            "execution_date": execution_date,
+            "start_time": start_time,
+        }
+
     print({
         "event": "PIPELINE_RUN_START",
         "run_id": pipeline_run_id,
         "pipeline": pipeline_name,
         "run_type": run_type,
         "execution_date": str(execution_date),
-        "start_time": _now(),
+        "start_time": start_time.isoformat(),
     })
 
 
@@ -27,13 +48,67 @@ def complete_pipeline_run(
     pipeline_run_id: str,
     status: str,
 ):
+    end_time = datetime.utcnow()
+
+    with _lock:
+        if pipeline_run_id in _runs:
+            _runs[pipeline_run_id].update(status=status, end_time=end_time)
+
     print({
         "event": "PIPELINE_RUN_COMPLETE",
         "run_id": pipeline_run_id,
         "status": status,
-        "end_time": _now(),
+        "end_time": end_time.isoformat(),
     })
 
 
-def _now():
-    return datetime.utcnow().isoformat()
+def finalize_pipeline_run(
+    pipeline_run_id: str,
+    summary: Optional[Dict] = None,
+    asset_count: Optional[int] = None,
+    quarantined_count: Optional[int] = None,
+) -> Optional[Dict]:
+    """
+    Persist a started run to the run registry (ops_pipeline_runs) with
+    its stage timings from the instrumentation summary. Call once per
+    run, after complete_pipeline_run. A registry write failure is logged
+    and never fails the run itself.
+    """
+    with _lock:
+        run = _runs.pop(pipeline_run_id, None)
+    if run is None:
+        return None
+
+    end_time = run.get("end_time") or datetime.utcnow()
+    stages = (summary or {}).get("stages", {})
+    write = stages.get("write", {})
+
+    record = {
+        **run,
+        "status": run.get("status", "UNKNOWN"),
+        "end_time": end_time,
+        "duration_seconds": (end_time - run["start_time"]).total_seconds(),
+        "asset_count": asset_count,
+        "quarantined_count": quarantined_count,
+        "rows_written": write.get("rows_out"),
+        "bytes_written": write.get("bytes_written"),
+        "peak_rss_bytes": (summary or {}).get("peak_rss_bytes"),
+        # Elapsed time per stage; wall_seconds would add up the
+        # per-asset calls of concurrent workers
+        "stage_seconds": {
+            stage: totals["span_seconds"] for stage, totals in stages.items()
+        },
+    }
+
+    try:
+        write_pipeline_run(record)
+    except SystemError as err:
+        log_error(
+            pipeline_run_id=pipeline_run_id,
+            step="RUN_REGISTRY",
+            error_type="SYSTEM_ERROR",
+            error=err,
+        )
+        return None
+
+    return record
@@ -1,5 +1,39 @@
+import threading
 import time
-from typing import Callable, Type
+from typing import Callable, Optional, Type
+
+
+class RetryBudget:
+    """
+    Shared retry allowance for a whole pipeline run.
+
+    Every retried call consumes one unit, so a flaky source cannot
+    multiply run time across hundreds of assets.
+    """
+
+    def __init__(self, max_retries: int):
+        self._remaining = max_retries
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        return self._remaining
+
+    def consume(self) -> bool:
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+
+
+def backoff_delay(
+    attempt: int,
+    delay_seconds: float = 2,
+    backoff_factor: float = 2,
+) -> float:
+    """Delay before retry number `attempt` (1-based)."""
+    return delay_seconds * backoff_factor ** (attempt - 1)
 
 
 def retry(
@@ -8,11 +42,12 @@ def retry(
     retry_on: Type[Exception],
     delay_seconds: int = 2,
     backoff_factor: int = 2,
+    budget: Optional[RetryBudget] = None,
+    sleep: Callable[[float], None] = time.sleep,
     **kwargs,
 ):
 
     attempt = 0
-    delay = delay_seconds
 
     while attempt <= retries:
         try:
@@ -24,5 +59,7 @@ def retry(
             if attempt > retries:
                 raise
 
-            time.sleep(delay)
-            delay *= backoff_factor
+            if budget is not None and not budget.consume():
+                raise
+
+            sleep(backoff_delay(attempt, delay_seconds, backoff_factor))
@@ -0,0 +1,45 @@
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+def hour_key_from_timestamps(timestamps) -> np.ndarray:
+    """
+    Integer YYYYMMDDHH keys (UTC) computed arithmetically from
+    datetime64 values, e.g. 2025-02-01 13:00 -> 2025020113.
+
+    Same value as CAST(strftime(ts, '%Y%m%d%H') AS BIGINT) without
+    formatting a string per row.
+    """
+    index = pd.DatetimeIndex(timestamps)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+
+    hours = index.to_numpy().astype("datetime64[h]")
+    days = hours.astype("datetime64[D]")
+    months = days.astype("datetime64[M]")
+
+    year = months.astype("int64") // 12 + 1970
+    month = months.astype("int64") % 12 + 1
+    day = (days - months).astype("int64") + 1
+    hour = (hours - days).astype("int64")
+
+    return year * 1_000_000 + month * 10_000 + day * 100 + hour
+
+
+def format_hour_key(hour_keys: np.ndarray, hour_key_format: str) -> np.ndarray:
+    """
+    hour_key_format: 'int' (int64) | 'str' (legacy 'YYYYMMDDHH' strings)
+    """
+    if hour_key_format == "str":
+        return hour_keys.astype(str).astype(object)
+    return hour_keys
+
+
+def date_label(execution_date: date, end_date: Optional[date] = None) -> str:
+    """Human readable date scope for log and error messages."""
+    if end_date is None or end_date == execution_date:
+        return f"execution_date={execution_date}"
+    return f"date_range={execution_date}..{end_date}"
@@ -0,0 +1,141 @@
+import heapq
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from common.config import (
+    get_extract_max_workers,
+    get_source_concurrency_limit,
+)
+from common.errors import SourceError
+from common.retry import RetryBudget, backoff_delay
+from ingestion.yfinance import extract_market_data
+
+
+DEFAULT_SOURCE = "yfinance"
+
+
+def extract_assets_concurrently(
+    assets: List[Dict[str, str]],
+    execution_date: date,
+    pipeline_run_id: str,
+    max_workers: Optional[int] = None,
+    max_per_source: Optional[int] = None,
+    retries: int = 3,
+    delay_seconds: float = 2,
+    backoff_factor: float = 2,
+    budget: Optional[RetryBudget] = None,
+    extract_func: Callable[..., pd.DataFrame] = extract_market_data,
+    on_failure: Optional[Callable[[str, Exception], None]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Extract raw market data for many assets on a bounded thread pool.
+
+    - At most `max_workers` calls in flight overall
+    - At most `max_per_source` calls in flight per data source
+    - A failed asset is re-queued after its backoff delay instead of
+      sleeping on a worker, so other assets keep flowing
+    - Result order follows `assets`, not completion order
+    - With on_failure(symbol, error), assets that exhausted their retries
+      are reported through it and left out of the result
+
+    Raises:
+        SourceError listing every asset that exhausted its retries
+        (only without on_failure).
+    """
+
+    max_workers = max_workers or get_extract_max_workers()
+    max_per_source = max_per_source or get_source_concurrency_limit()
+
+    # (asset index, attempt number)
+    ready: deque = deque((i, 0) for i in range(len(assets)))
+    delayed: List[Tuple[float, int, int]] = []
+    in_flight: Dict[Future, Tuple[int, int]] = {}
+    per_source: Dict[str, int] = {}
+
+    results: Dict[int, pd.DataFrame] = {}
+    failures: Dict[int, Exception] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while ready or delayed or in_flight:
+            now = time.monotonic()
+            while delayed and delayed[0][0] <= now:
+                _, idx, attempt = heapq.heappop(delayed)
+                ready.append((idx, attempt))
+
+            # Submit whatever fits under the global and per-source limits
+            skipped = deque()
+            while ready and len(in_flight) < max_workers:
+                idx, attempt = ready.popleft()
+                source = _source_of(assets[idx])
+
+                if per_source.get(source, 0) >= max_per_source:
+                    skipped.append((idx, attempt))
+                    continue
+
+                asset = assets[idx]
+                future = executor.submit(
+                    extract_func,
+                    symbol=asset["symbol"],
+                    asset_type=asset["type"],
+                    execution_date=execution_date,
+                    pipeline_run_id=pipeline_run_id,
+                )
+                in_flight[future] = (idx, attempt)
+                per_source[source] = per_source.get(source, 0) + 1
+            ready.extendleft(reversed(skipped))
+
+            timeout = None
+            if delayed:
+                timeout = max(delayed[0][0] - time.monotonic(), 0)
+
+            if not in_flight:
+                time.sleep(timeout or 0)
+                continue
+
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                idx, attempt = in_flight.pop(future)
+                per_source[_source_of(assets[idx])] -= 1
+
+                try:
+                    results[idx] = future.result()
+                except SourceError as err:
+                    attempt += 1
+                    can_retry = attempt <= retries and (
+                        budget is None or budget.consume()
+                    )
+                    if not can_retry:
+                        failures[idx] = err
+                        continue
+
+                    ready_at = time.monotonic() + backoff_delay(
+                        attempt, delay_seconds, backoff_factor
+                    )
+                    heapq.heappush(delayed, (ready_at, idx, attempt))
+
+    if failures and on_failure is not None:
+        for i in sorted(failures):
+            on_failure(assets[i]["symbol"], failures[i])
+    elif failures:
+        failed = [assets[i]["symbol"] for i in sorted(failures)]
+        first_error = failures[min(failures)]
+        raise SourceError(
+            f"Extraction failed for assets={failed} "
+            f"on execution_date={execution_date}: {first_error}"
+        )
+
+    return {
+        assets[i]["symbol"]: results[i]
+        for i in range(len(assets))
+        if i in results
+    }
+
+
+def _source_of(asset: Dict[str, str]) -> str:
+    return asset.get("source", DEFAULT_SOURCE)
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 from datetime import date, datetime, timedelta
 import pandas as pd
 import yfinance as yf
@@ -36,6 +36,135 @@ def extract_market_data(
     return df
 
 
+def extract_market_data_batch(
+    assets: List[Dict[str, str]],
+    start_date: date,
+    end_date: date,
+    pipeline_run_id: str,
+    batch_size: int = 100,
+    download_func: Optional[Callable[..., pd.DataFrame]] = None,
+) -> Dict[date, Dict[str, pd.DataFrame]]:
+    """
+    Extract raw market data for many assets over a date window
+    (inclusive) with one source call per `batch_size` symbols.
+
+    Returns:
+        {execution_date: {asset: pd.DataFrame}} carrying the same columns
+        and metadata as extract_market_data. (asset, date) pairs without
+        any bars are absent; no assets yields {}.
+    """
+
+    if not assets:
+        return {}
+
+    download_func = download_func or _download_batch
+    asset_types = {a["symbol"]: a["type"] for a in assets}
+    symbols = list(asset_types)
+
+    frames = []
+    for i in range(0, len(symbols), batch_size):
+        chunk = symbols[i:i + batch_size]
+        try:
+            frames.append(_fetch_batch(chunk, start_date, end_date, download_func))
+        except Exception as err:
+            raise SourceError(
+                f"Failed to fetch batch from yfinance for assets={chunk} "
+                f"from {start_date} to {end_date}: {err}"
+            )
+
+    long_df = pd.concat(frames, ignore_index=True)
+
+    if long_df.empty:
+        raise SourceError(
+            f"Empty batch response from yfinance for assets={symbols} "
+            f"from {start_date} to {end_date}"
+        )
+
+    return _split_by_asset_and_date(long_df, asset_types, pipeline_run_id)
+
+
+def _fetch_batch(
+    symbols: List[str],
+    start_date: date,
+    end_date: date,
+    download_func: Callable[..., pd.DataFrame],
+) -> pd.DataFrame:
+    start_dt = datetime.combine(start_date, datetime.min.time())
+    end_dt = datetime.combine(end_date, datetime.min.time()) + timedelta(days=1)
+
+    wide = download_func(symbols, start_dt, end_dt)
+
+    if wide is None or wide.empty:
+        return pd.DataFrame()
+
+    if not isinstance(wide.columns, pd.MultiIndex):
+        wide = pd.concat({symbols[0]: wide}, axis=1)
+
+    # (timestamp) x (asset, field) -> (timestamp, asset) x (field)
+    long_df = wide.stack(level=0, future_stack=True)
+    long_df.index = long_df.index.set_names(["timestamp", "asset"])
+    long_df = long_df.dropna(how="all").reset_index()
+
+    long_df = long_df.rename(
+        columns={
+            "Open": "open",
+            "High": "high",
+            "Low": "low",
+            "Close": "close",
+            "Volume": "volume",
+        }
+    )
+    long_df.columns.name = None
+
+    long_df["timestamp"] = pd.to_datetime(long_df["timestamp"], utc=True)
+
+    in_window = (
+        (long_df["timestamp"] >= pd.Timestamp(start_date, tz="UTC"))
+        & (long_df["timestamp"] < pd.Timestamp(end_dt, tz="UTC"))
+    )
+
+    return long_df[in_window]
+
+
+def _split_by_asset_and_date(
+    long_df: pd.DataFrame,
+    asset_types: Dict[str, str],
+    pipeline_run_id: str,
+) -> Dict[date, Dict[str, pd.DataFrame]]:
+    long_df = long_df.sort_values(["asset", "timestamp"], kind="stable")
+    long_df["execution_date"] = long_df["timestamp"].dt.date
+    long_df["asset_type"] = long_df["asset"].map(asset_types)
+    long_df["pipeline_run_id"] = pipeline_run_id
+
+    raw_data: Dict[date, Dict[str, pd.DataFrame]] = {}
+
+    groups = long_df.groupby(["execution_date", "asset"], sort=True).indices
+    for (execution_date, asset), positions in groups.items():
+        raw_data.setdefault(execution_date, {})[asset] = (
+            long_df.iloc[positions].reset_index(drop=True)
+        )
+
+    return raw_data
+
+
+def _download_batch(
+    symbols: List[str],
+    start_dt: datetime,
+    end_dt: datetime,
+) -> pd.DataFrame:
+    return yf.download(
+        tickers=symbols,
+        start=start_dt,
+        end=end_dt,
+        interval="1h",
+        group_by="ticker",
+        auto_adjust=False,
+        actions=False,
+        progress=False,
+        threads=True,
+    )
+
+
 def _fetch_single_asset(
     symbol: str,
     execution_date: date,
@@ -0,0 +1,213 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from common.errors import SystemError
+from common.instrumentation import (
+    RunInstrumentation,
+    StageMetrics,
+    count_rows,
+    measure,
+)
+
+
+# Pool name for stages executed on the driver thread
+INLINE = "inline"
+
+# on_failure(key, stage name, error); the key is dropped from every stage
+FailureHandler = Callable[[str, str, Exception], None]
+
+
+@dataclass
+class Stage:
+    """
+    One step of a per-key DAG.
+
+    func is called as func(key, **{input: upstream result}). Returning
+    None drops the key without an error (e.g. quarantined by the stage
+    itself). Stages on a process pool need a picklable func.
+
+    instrument=False leaves timing to the stage itself (e.g. to report
+    bytes written).
+    """
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    pool: str = INLINE
+    max_in_flight: Optional[int] = None
+    instrument: bool = True
+
+
+class StageExecutor:
+    """
+    Run every key through a DAG of stages, each stage on its own pool
+    with a queue in front of it. Different keys overlap across stages,
+    so downloads, CPU work and uploads run at the same time.
+
+    Stages must be listed in dependency order. Downstream queues are
+    drained first and upstream results are released as soon as every
+    consumer has run, so only in-flight keys are held in memory.
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        pools: Dict[str, Executor],
+        instrumentation: Optional[RunInstrumentation] = None,
+    ):
+        self.stages = {stage.name: stage for stage in stages}
+        self.pools = pools
+        self.instrumentation = instrumentation
+
+        if len(self.stages) != len(stages):
+            raise SystemError("Duplicate stage names in DAG")
+
+        seen: Set[str] = set()
+        for stage in stages:
+            unknown = [i for i in stage.inputs if i not in seen]
+            if unknown:
+                raise SystemError(
+                    f"Stage={stage.name} depends on {unknown}, which must "
+                    f"be declared before it"
+                )
+            if stage.pool != INLINE and stage.pool not in pools:
+                raise SystemError(f"Unknown pool={stage.pool} for stage={stage.name}")
+            seen.add(stage.name)
+
+        self.consumers: Dict[str, List[Stage]] = {name: [] for name in self.stages}
+        for stage in stages:
+            for name in stage.inputs:
+                self.consumers[name].append(stage)
+
+        self.sinks = [s.name for s in stages if not self.consumers[s.name]]
+
+    def run(
+        self,
+        keys: Iterable[str],
+        on_failure: FailureHandler,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns {key: {sink stage: result}} for keys that completed every
+        stage, in completion order.
+        """
+        order = list(self.stages.values())
+        queues: Dict[str, deque] = {name: deque() for name in self.stages}
+        running: Dict[str, int] = {name: 0 for name in self.stages}
+        in_flight: Dict[Future, Tuple[str, str]] = {}
+
+        results: Dict[str, Dict[str, Any]] = {}
+        outputs: Dict[str, Dict[str, Any]] = {}
+        dropped: Set[str] = set()
+
+        for key in keys:
+            results[key] = {}
+            for stage in order:
+                if not stage.inputs:
+                    queues[stage.name].append(key)
+
+        def finish(stage: Stage, key: str, outcome: Tuple) -> None:
+            value, metrics, error = outcome
+            if metrics is not None:
+                self.instrumentation.add(metrics)
+            complete(stage, key, value, error)
+
+        def complete(stage: Stage, key: str, value: Any, error: Optional[Exception]):
+            if key in dropped:
+                return
+            if error is not None or value is None:
+                dropped.add(key)
+                results.pop(key, None)
+                outputs.pop(key, None)
+                if error is not None:
+                    on_failure(key, stage.name, error)
+                return
+
+            produced = results[key]
+            produced[stage.name] = value
+            if stage.name in self.sinks:
+                outputs.setdefault(key, {})[stage.name] = value
+
+            for consumer in self.consumers[stage.name]:
+                if all(i in produced for i in consumer.inputs):
+                    queues[consumer.name].append(key)
+
+            # Release upstream results nobody is waiting on any more
+            for name in stage.inputs:
+                if all(c.name in produced for c in self.consumers[name]):
+                    produced.pop(name, None)
+
+            if len(outputs.get(key, {})) == len(self.sinks):
+                del results[key]
+
+        while in_flight or any(queues.values()):
+            for stage in reversed(order):
+                queue = queues[stage.name]
+                limit = stage.max_in_flight
+                while queue and (limit is None or running[stage.name] < limit):
+                    key = queue.popleft()
+                    if key in dropped:
+                        continue
+                    kwargs = {i: results[key][i] for i in stage.inputs}
+
+                    timed = self.instrumentation is not None and stage.instrument
+
+                    if stage.pool == INLINE:
+                        finish(stage, key, _call_stage(
+                            timed, stage.name, stage.func, key, kwargs
+                        ))
+                        continue
+
+                    future = self.pools[stage.pool].submit(
+                        _call_stage, timed, stage.name, stage.func, key, kwargs
+                    )
+                    in_flight[future] = (stage.name, key)
+                    running[stage.name] += 1
+
+            if not in_flight:
+                continue
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, key = in_flight.pop(future)
+                running[name] -= 1
+                try:
+                    outcome = future.result()
+                except Exception as err:
+                    outcome = (None, None, err)
+                finish(self.stages[name], key, outcome)
+
+        return outputs
+
+
+def _call_stage(
+    timed: bool,
+    name: str,
+    func: Callable[..., Any],
+    key: str,
+    kwargs: Dict[str, Any],
+) -> Tuple[Any, Optional[StageMetrics], Optional[Exception]]:
+    """
+    Run one stage call where it is scheduled (driver, thread or process),
+    returning (value, metrics, error) so errors and timings travel back.
+    """
+    if not timed:
+        try:
+            return func(key, **kwargs), None, None
+        except Exception as err:
+            return None, None, err
+
+    rows_in = sum(
+        count_rows(v) for v in kwargs.values() if isinstance(v, pd.DataFrame)
+    )
+    try:
+        with measure(name, key, rows_in) as metrics:
+            value = func(key, **kwargs)
+            if isinstance(value, pd.DataFrame):
+                metrics.rows_out = len(value)
+    except Exception as err:
+        return None, metrics, err
+
+    return value, metrics, None
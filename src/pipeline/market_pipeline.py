@@ -1,32 +1,64 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import date
-from typing import List
+from functools import partial
+from typing import Callable, Dict, List, Set
+
+import pandas as pd
 
 from common.logging import (
     log_pipeline_start,
     log_pipeline_end,
     log_error,
 )
-from common.config import load_active_assets
+from common.config import (
+    load_active_assets,
+    get_cpu_max_workers,
+    get_extract_max_workers,
+    get_stream_max_in_flight,
+    get_upload_max_workers,
+)
 from common.errors import (
     SourceError,
     DataValidationError,
+    PartitionWriteError,
 )
 
-from ingestion.yfinance import extract_market_data
+from ingestion.concurrent_extract import extract_assets_concurrently
+from ingestion.yfinance import extract_market_data, extract_market_data_batch
 from processing.clean import clean_market_data
-from processing.normalisasi import normalize_to_hourly
+from processing.normalisasi import (
+    normalize_isolating_failures,
+    normalize_to_hourly,
+)
 from processing.validate import (
     validate_raw_data,
-    validate_hourly_data,
+    check_hourly_data,
+)
+from pipeline.dag import Stage, StageExecutor
+from pipeline.streaming import (
+    stream_clean,
+    stream_extract,
+    stream_normalize,
+    stream_validate,
 )
 from storage.market_repository import write_fact_market_hourly
-from storage.pipeline_event_repository import write_pipeline_event
+from storage.pipeline_event_repository import (
+    flush_pipeline_events,
+    write_pipeline_event,
+)
+from storage.last_bar_repository import load_last_bars, update_last_bars
 from common.pipeline_run import (
     generate_run_id,
     start_pipeline_run,
     complete_pipeline_run,
+    finalize_pipeline_run,
+)
+from common.instrumentation import (
+    RunInstrumentation,
+    count_rows,
+    emit_run_summary,
 )
-from common.retry import retry
+from common.retry import RetryBudget, retry
 
 
 PIPELINE_NAME = "market_pipeline"
@@ -35,15 +67,25 @@ PIPELINE_NAME = "market_pipeline"
 def run_market_pipeline(
     run_type: str,
     execution_date: date,
+    extract_mode: str = "per_asset",
+    execution_mode: str = "batch",
 ) -> None:
     """
     Orchestrates end-to-end market data pipeline.
 
     run_type: 'scheduled' | 'backfill'
     execution_date: logical date being processed (UTC)
+    extract_mode: 'per_asset' (one request per asset, concurrent)
+                  | 'batch' (one multi-ticker request per batch)
+    execution_mode: 'batch' (each step over all assets, then the next)
+                    | 'streaming' (assets flow through the steps one by
+                      one with bounded buffers; extract_mode is ignored)
+                    | 'staged' (DAG of stages on io / cpu / upload pools,
+                      assets overlap across stages; extract_mode is ignored)
     """
 
     pipeline_run_id = generate_run_id()
+    instr = RunInstrumentation(PIPELINE_NAME, pipeline_run_id)
 
     start_pipeline_run(
         pipeline_run_id=pipeline_run_id,
@@ -58,15 +100,16 @@ def run_market_pipeline(
         execution_date=execution_date,
     )
 
+    scheduled_assets: List[Dict[str, str]] = []
+    quarantined: Set[str] = set()
+
     try:
         # 1. Load asset scope
         assets = load_active_assets()
         if not assets:
             raise DataValidationError("Asset list is empty")
 
-        # 2. Extract raw data (with retry for source failure)
-        raw_data = []
-
+        # 2. Schedule assets for the day
         for asset in assets:
             if asset["type"] == "stock" and execution_date.weekday() >= 5:
                 write_pipeline_event({
@@ -81,59 +124,35 @@ def run_market_pipeline(
                 })
                 continue
 
-            asset_raw = retry(
-                func=extract_market_data,
-                retries=3,
-                retry_on=SourceError,
-                symbol=asset["symbol"],
-                asset_type=asset["type"],
-                execution_date=execution_date,
-                pipeline_run_id=pipeline_run_id,
-            )
-            raw_data.append(asset_raw)
-
-        # 3. Validate raw ingestion
-        expected_symbols = [a["symbol"] for a in assets]
-
-        validate_raw_data(
-            raw_data=raw_data,
-            expected_assets=expected_symbols,
-            execution_date=execution_date,
-        )
-
-        # 4. Clean & standardize
-        cleaned_data = clean_market_data(raw_data)
-
-        # 5. Normalize to hourly granularity
-        hourly_data = []
+            scheduled_assets.append(asset)
 
-        for asset, df in cleaned_data.items():
-            asset_meta = next(a for a in assets if a["symbol"] == asset)
+        asset_types = {a["symbol"]: a["type"] for a in scheduled_assets}
 
-            hourly = normalize_to_hourly(
-                cleaned_data=df,
-                asset_type=asset_meta["type"],
-                execution_date=execution_date,
+        def quarantine(asset, step, reason, err):
+            _quarantine_asset(
+                pipeline_run_id, execution_date, asset,
+                asset_types[asset], step, reason, err,
             )
-            hourly_data.append(hourly)
 
-        # 6. Validate analytics contract
-        for asset_hourly in hourly_data:
-            validate_hourly_data(
-                hourly_data=asset_hourly,
-                execution_date=execution_date,
+        if execution_mode == "streaming":
+            quarantined = _run_streaming(
+                pipeline_run_id, execution_date, scheduled_assets,
+                quarantine, instr,
+            )
+        elif execution_mode == "staged":
+            quarantined = _run_staged(
+                pipeline_run_id, execution_date, scheduled_assets,
+                quarantine, instr,
+            )
+        else:
+            quarantined = _run_batch(
+                pipeline_run_id, execution_date, scheduled_assets,
+                extract_mode, quarantine, instr,
             )
-
-
-        # 7. Load analytics-ready fact table (idempotent)
-        write_fact_market_hourly(
-            hourly_data=hourly_data,
-            pipeline_run_id=pipeline_run_id,
-        )
 
         complete_pipeline_run(
             pipeline_run_id=pipeline_run_id,
-            status="SUCCESS",
+            status="PARTIAL_SUCCESS" if quarantined else "SUCCESS",
         )
 
     except SourceError as err:
@@ -173,7 +192,366 @@ def run_market_pipeline(
         )
 
     finally:
+        # One events file per run instead of one per event; a failed
+        # flush must not keep the run from being finalized
+        try:
+            flush_pipeline_events()
+        except Exception as err:
+            log_error(
+                pipeline_run_id=pipeline_run_id,
+                step="EVENTS",
+                error_type="SYSTEM_ERROR",
+                error=err,
+            )
+        finalize_pipeline_run(
+            pipeline_run_id,
+            summary=emit_run_summary(instr),
+            asset_count=len(scheduled_assets),
+            quarantined_count=len(quarantined),
+        )
         log_pipeline_end(
             pipeline_name=PIPELINE_NAME,
             run_id=pipeline_run_id,
         )
+
+
+def _run_batch(
+    pipeline_run_id: str,
+    execution_date: date,
+    scheduled_assets: List[Dict[str, str]],
+    extract_mode: str,
+    quarantine: Callable[[str, str, str, Exception], None],
+    instr: RunInstrumentation,
+) -> Set[str]:
+    """Each step runs over the whole universe before the next one starts."""
+    quarantined: Set[str] = set()
+
+    def on_failure(asset, step, reason, err):
+        quarantined.add(asset)
+        quarantine(asset, step, reason, err)
+
+    # 3. Extract raw data (per asset concurrently, or multi-ticker batches)
+    with instr.stage("extract") as metrics:
+        if extract_mode == "batch":
+            raw_data = retry(
+                func=extract_market_data_batch,
+                retries=3,
+                retry_on=SourceError,
+                assets=scheduled_assets,
+                start_date=execution_date,
+                end_date=execution_date,
+                pipeline_run_id=pipeline_run_id,
+            ).get(execution_date, {})
+            # Symbols the batch response had no bars for
+            for asset in scheduled_assets:
+                if asset["symbol"] not in raw_data:
+                    on_failure(
+                        asset["symbol"], "EXTRACT", "source_error",
+                        SourceError(
+                            f"No data returned for asset={asset['symbol']} "
+                            f"on execution_date={execution_date}"
+                        ),
+                    )
+        else:
+            raw_data = extract_assets_concurrently(
+                assets=scheduled_assets,
+                execution_date=execution_date,
+                pipeline_run_id=pipeline_run_id,
+                retries=3,
+                budget=RetryBudget(max_retries=len(scheduled_assets)),
+                on_failure=lambda asset, err: on_failure(
+                    asset, "EXTRACT", "source_error", err
+                ),
+            )
+        metrics.rows_out = count_rows(raw_data)
+
+    # 4. Validate raw ingestion
+    expected_symbols = [
+        a["symbol"] for a in scheduled_assets if a["symbol"] not in quarantined
+    ]
+
+    validate_raw_data(
+        raw_data=raw_data,
+        expected_assets=expected_symbols,
+        execution_date=execution_date,
+    )
+
+    # 5. Clean & standardize (per asset, so one bad frame only fails itself)
+    cleaned_data: Dict[str, pd.DataFrame] = {}
+    with instr.stage("clean", rows_in=count_rows(raw_data)) as metrics:
+        for asset, raw_df in raw_data.items():
+            try:
+                cleaned_data.update(clean_market_data({asset: raw_df}))
+            except DataValidationError as err:
+                on_failure(asset, "VALIDATION", "clean", err)
+        metrics.rows_out = count_rows(cleaned_data)
+    del raw_data
+
+    # 6. Normalize to hourly granularity
+    #    Leading gaps are seeded from the last known bar per asset
+    seed_bars = load_last_bars(assets=cleaned_data.keys())
+
+    with instr.stage("normalize", rows_in=count_rows(cleaned_data)) as metrics:
+        hourly_data, failures = normalize_isolating_failures(
+            cleaned_data=cleaned_data,
+            execution_date=execution_date,
+            engine="vectorized",
+            seed_bars=seed_bars,
+        )
+        metrics.rows_out = count_rows(hourly_data)
+    for asset, err in failures.items():
+        on_failure(asset, "VALIDATION", "normalize", err)
+
+    # 7. Validate analytics contract (all rules, all assets, one pass)
+    if hourly_data:
+        with instr.stage("validate", rows_in=count_rows(hourly_data)):
+            report = check_hourly_data(
+                hourly_data=hourly_data,
+                execution_date=execution_date,
+            )
+        for asset in report.failed_assets:
+            violations = report.for_asset(asset)
+            on_failure(
+                asset,
+                "VALIDATION",
+                ",".join(v.rule for v in violations),
+                DataValidationError("; ".join(v.message for v in violations)),
+            )
+            del hourly_data[asset]
+
+    if not hourly_data:
+        raise DataValidationError(
+            f"All assets quarantined on execution_date={execution_date}"
+        )
+
+    # 8. Load analytics-ready fact table (idempotent)
+    try:
+        with instr.stage("write", rows_in=count_rows(hourly_data)) as metrics:
+            metrics.bytes_written = write_fact_market_hourly(
+                hourly_data=hourly_data,
+                pipeline_run_id=pipeline_run_id,
+            )
+            metrics.rows_out = metrics.rows_in
+    except PartitionWriteError as err:
+        # The other partitions were written: their last bars still count
+        failed = {asset for asset, _ in err.failures}
+        written = {
+            asset: df for asset, df in hourly_data.items() if asset not in failed
+        }
+        if written:
+            update_last_bars(hourly_data=written, pipeline_run_id=pipeline_run_id)
+        raise
+
+    update_last_bars(
+        hourly_data=hourly_data,
+        pipeline_run_id=pipeline_run_id,
+    )
+
+    return quarantined
+
+
+def _run_streaming(
+    pipeline_run_id: str,
+    execution_date: date,
+    scheduled_assets: List[Dict[str, str]],
+    quarantine: Callable[[str, str, str, Exception], None],
+    instr: RunInstrumentation,
+) -> Set[str]:
+    """
+    Each asset moves through extract -> clean -> normalize -> validate ->
+    write on its own; at most STREAM_MAX_IN_FLIGHT raw frames are held
+    ahead of the write, so memory stays flat as the universe grows.
+    """
+    quarantined: Set[str] = set()
+
+    def on_failure(asset, step, reason, err):
+        quarantined.add(asset)
+        quarantine(asset, step, reason, err)
+
+    seed_bars = load_last_bars(assets=[a["symbol"] for a in scheduled_assets])
+
+    frames = stream_extract(
+        assets=scheduled_assets,
+        execution_date=execution_date,
+        pipeline_run_id=pipeline_run_id,
+        on_failure=on_failure,
+        max_in_flight=get_stream_max_in_flight(),
+        retries=3,
+        budget=RetryBudget(max_retries=len(scheduled_assets)),
+        instr=instr,
+    )
+    frames = stream_clean(frames, on_failure, instr)
+    frames = stream_normalize(frames, execution_date, seed_bars, on_failure, instr)
+    frames = stream_validate(frames, execution_date, on_failure, instr)
+
+    written = 0
+    for asset, hourly_df in frames:
+        with instr.stage("write", asset, rows_in=len(hourly_df)) as metrics:
+            metrics.bytes_written = write_fact_market_hourly(
+                hourly_data={asset: hourly_df},
+                pipeline_run_id=pipeline_run_id,
+            )
+            metrics.rows_out = metrics.rows_in
+        update_last_bars(
+            hourly_data={asset: hourly_df},
+            pipeline_run_id=pipeline_run_id,
+        )
+        written += 1
+
+    if not written:
+        raise DataValidationError(
+            f"All assets quarantined on execution_date={execution_date}"
+        )
+
+    return quarantined
+
+
+def _run_staged(
+    pipeline_run_id: str,
+    execution_date: date,
+    scheduled_assets: List[Dict[str, str]],
+    quarantine: Callable[[str, str, str, Exception], None],
+    instr: RunInstrumentation,
+) -> Set[str]:
+    """
+    Run the per-asset steps as a stage DAG: extract on an I/O thread
+    pool, normalize on a process pool, writes on an upload pool, so
+    downloads, normalization and uploads of different assets overlap.
+    """
+    quarantined: Set[str] = set()
+    asset_types = {a["symbol"]: a["type"] for a in scheduled_assets}
+    seed_bars = load_last_bars(assets=list(asset_types))
+    extract_workers = get_extract_max_workers()
+
+    budget = RetryBudget(max_retries=len(scheduled_assets))
+
+    def extract(asset):
+        return retry(
+            func=extract_market_data,
+            retries=3,
+            retry_on=SourceError,
+            budget=budget,
+            symbol=asset,
+            asset_type=asset_types[asset],
+            execution_date=execution_date,
+            pipeline_run_id=pipeline_run_id,
+        )
+
+    def clean(asset, extract):
+        return clean_market_data({asset: extract})[asset]
+
+    def validate(asset, normalize):
+        report = check_hourly_data({asset: normalize}, execution_date)
+        if report.ok:
+            return normalize
+        violations = report.for_asset(asset)
+        quarantined.add(asset)
+        quarantine(
+            asset,
+            "VALIDATION",
+            ",".join(v.rule for v in violations),
+            DataValidationError("; ".join(v.message for v in violations)),
+        )
+        return None
+
+    def write(asset, validate):
+        with instr.stage("write", asset, rows_in=len(validate)) as metrics:
+            metrics.bytes_written = write_fact_market_hourly(
+                hourly_data={asset: validate},
+                pipeline_run_id=pipeline_run_id,
+            )
+            metrics.rows_out = metrics.rows_in
+        update_last_bars(
+            hourly_data={asset: validate},
+            pipeline_run_id=pipeline_run_id,
+        )
+        return len(validate)
+
+    def on_failure(asset, stage, err):
+        if stage == "write":
+            raise err
+        quarantined.add(asset)
+        quarantine(
+            asset,
+            "EXTRACT" if stage == "extract" else "VALIDATION",
+            "source_error" if stage == "extract" else stage,
+            err,
+        )
+
+    stages = [
+        Stage("extract", extract, pool="io", max_in_flight=extract_workers),
+        Stage("clean", clean, inputs=("extract",)),
+        Stage(
+            "normalize",
+            partial(
+                _normalize_asset,
+                execution_date=execution_date,
+                seed_bars=seed_bars,
+            ),
+            inputs=("clean",),
+            pool="cpu",
+        ),
+        Stage("validate", validate, inputs=("normalize",)),
+        Stage(
+            "write", write, inputs=("validate",), pool="upload", instrument=False
+        ),
+    ]
+
+    with ThreadPoolExecutor(max_workers=extract_workers) as io_pool, \
+            ThreadPoolExecutor(max_workers=get_upload_max_workers()) as upload_pool, \
+            ProcessPoolExecutor(max_workers=get_cpu_max_workers()) as cpu_pool:
+        written = StageExecutor(
+            stages,
+            {"io": io_pool, "cpu": cpu_pool, "upload": upload_pool},
+            instrumentation=instr,
+        ).run(asset_types, on_failure)
+
+    if not written:
+        raise DataValidationError(
+            f"All assets quarantined on execution_date={execution_date}"
+        )
+
+    return quarantined
+
+
+def _normalize_asset(
+    asset: str,
+    clean: pd.DataFrame,
+    execution_date: date,
+    seed_bars: Dict[str, Dict],
+) -> pd.DataFrame:
+    """Process-pool entry point for one asset's normalize stage."""
+    seed = {asset: seed_bars[asset]} if asset in seed_bars else None
+    return normalize_to_hourly(
+        {asset: clean}, execution_date, seed_bars=seed
+    )[asset]
+
+
+def _quarantine_asset(
+    pipeline_run_id: str,
+    execution_date: date,
+    asset: str,
+    asset_type: str,
+    step: str,
+    reason: str,
+    err: Exception,
+) -> None:
+    """Quarantine a bad asset; the rest of the universe still loads."""
+    source_error = isinstance(err, SourceError)
+
+    log_error(
+        pipeline_run_id=pipeline_run_id,
+        step=step,
+        error_type="SOURCE_ERROR" if source_error else "DATA_ERROR",
+        error=err,
+    )
+    write_pipeline_event({
+        "pipeline_run_id": pipeline_run_id,
+        "pipeline_name": PIPELINE_NAME,
+        "event_type": "ASSET_QUARANTINED",
+        "step": step,
+        "asset": asset,
+        "asset_type": asset_type,
+        "reason": reason,
+        "execution_date": execution_date,
+    })
@@ -0,0 +1,152 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from common.errors import DataValidationError, SourceError
+from common.instrumentation import RunInstrumentation, measure
+from common.retry import RetryBudget, retry
+from ingestion.yfinance import extract_market_data
+from processing.clean import clean_market_data
+from processing.normalisasi import normalize_to_hourly
+from processing.validate import check_hourly_data
+
+
+# (asset, frame) flowing from one stage to the next
+AssetFrame = Tuple[str, pd.DataFrame]
+
+# on_failure(asset, step, reason, error); the asset leaves the stream
+FailureHandler = Callable[[str, str, str, Exception], None]
+
+
+def stream_extract(
+    assets: List[Dict[str, str]],
+    execution_date: date,
+    pipeline_run_id: str,
+    on_failure: FailureHandler,
+    max_in_flight: int,
+    retries: int = 3,
+    delay_seconds: float = 2,
+    budget: Optional[RetryBudget] = None,
+    extract_func: Callable[..., pd.DataFrame] = extract_market_data,
+    instr: Optional[RunInstrumentation] = None,
+) -> Iterator[AssetFrame]:
+    """
+    Yield (asset, raw frame) in asset order, extracting at most
+    max_in_flight assets ahead of the consumer.
+    """
+    remaining = iter(assets)
+    pending: deque = deque()
+
+    def extract_one(asset: Dict[str, str]) -> pd.DataFrame:
+        with _stage(instr, "extract", asset["symbol"]) as metrics:
+            raw_df = retry(
+                func=extract_func,
+                retries=retries,
+                retry_on=SourceError,
+                delay_seconds=delay_seconds,
+                budget=budget,
+                symbol=asset["symbol"],
+                asset_type=asset["type"],
+                execution_date=execution_date,
+                pipeline_run_id=pipeline_run_id,
+            )
+            metrics.rows_out = len(raw_df)
+        return raw_df
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+
+        def submit_next() -> None:
+            asset = next(remaining, None)
+            if asset is None:
+                return
+            pending.append((asset["symbol"], executor.submit(extract_one, asset)))
+
+        for _ in range(max_in_flight):
+            submit_next()
+
+        while pending:
+            symbol, future = pending.popleft()
+            try:
+                raw_df = future.result()
+            except SourceError as err:
+                on_failure(symbol, "EXTRACT", "source_error", err)
+                raw_df = None
+
+            # Refill before handing the frame downstream
+            submit_next()
+
+            if raw_df is not None:
+                yield symbol, raw_df
+
+
+def stream_clean(
+    frames: Iterable[AssetFrame],
+    on_failure: FailureHandler,
+    instr: Optional[RunInstrumentation] = None,
+) -> Iterator[AssetFrame]:
+    for asset, raw_df in frames:
+        try:
+            with _stage(instr, "clean", asset, len(raw_df)) as metrics:
+                cleaned_df = clean_market_data({asset: raw_df})[asset]
+                metrics.rows_out = len(cleaned_df)
+        except DataValidationError as err:
+            on_failure(asset, "VALIDATION", "clean", err)
+            continue
+        yield asset, cleaned_df
+
+
+def stream_normalize(
+    frames: Iterable[AssetFrame],
+    execution_date: date,
+    seed_bars: Dict[str, Dict],
+    on_failure: FailureHandler,
+    instr: Optional[RunInstrumentation] = None,
+) -> Iterator[AssetFrame]:
+    for asset, df in frames:
+        try:
+            with _stage(instr, "normalize", asset, len(df)) as metrics:
+                hourly = normalize_to_hourly(
+                    {asset: df},
+                    execution_date,
+                    seed_bars={asset: seed_bars[asset]} if asset in seed_bars else None,
+                )
+                metrics.rows_out = len(hourly[asset])
+        except DataValidationError as err:
+            on_failure(asset, "VALIDATION", "normalize", err)
+            continue
+        yield asset, hourly[asset]
+
+
+def stream_validate(
+    frames: Iterable[AssetFrame],
+    execution_date: date,
+    on_failure: FailureHandler,
+    instr: Optional[RunInstrumentation] = None,
+) -> Iterator[AssetFrame]:
+    for asset, df in frames:
+        with _stage(instr, "validate", asset, len(df)):
+            report = check_hourly_data({asset: df}, execution_date)
+        if not report.ok:
+            violations = report.for_asset(asset)
+            on_failure(
+                asset,
+                "VALIDATION",
+                ",".join(v.rule for v in violations),
+                DataValidationError("; ".join(v.message for v in violations)),
+            )
+            continue
+        yield asset, df
+
+
+def _stage(
+    instr: Optional[RunInstrumentation],
+    name: str,
+    asset: str,
+    rows_in: int = 0,
+):
+    if instr is None:
+        return measure(name, asset, rows_in)
+    return instr.stage(name, asset, rows_in)
@@ -1,43 +1,100 @@
-from typing import Dict
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Optional
 import pandas as pd
 
 from common.errors import DataValidationError
+from common.logging import log_stage_profile
+from processing.contract import load_contract
+from processing.parallel import map_frame_shards
 
 
-REQUIRED_COLUMNS = {
-    "timestamp",
-    "open",
-    "high",
-    "low",
-    "close",
-    "volume",
+REQUIRED_COLUMNS = set(load_contract("raw_market_data").required_columns)
+
+# raw (lower-cased) name -> standard internal name
+STANDARD_COLUMNS = {
+    "timestamp": "timestamp",
+    "open": "open_price",
+    "high": "high_price",
+    "low": "low_price",
+    "close": "close_price",
+    "volume": "volume",
 }
 
+# Lineage columns added at extraction, carried through when present
+METADATA_COLUMNS = [
+    "asset",
+    "asset_type",
+    "execution_date",
+    "pipeline_run_id",
+]
+
+PRICE_COLUMNS = [
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+]
+
+
+def clean_market_data(
+    raw_data: Dict[str, pd.DataFrame],
+    price_dtype: str = "float64",
+    profile: bool = False,
+    workers: Optional[int] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Standardize raw frames with as few full-frame copies as possible:
 
-def clean_market_data(raw_data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
-    cleaned_data: Dict[str, pd.DataFrame] = {}
+    1. One projection + rename onto the standard columns (the only copy
+       of the raw data; other raw columns are dropped)
+    2. One batched cast: prices to price_dtype, volume to float64
+    3. Deduplicate on timestamp
+    4. Sort by timestamp only if not already monotonic
 
-    for asset, df in raw_data.items():
-        if df is None or df.empty:
-            raise DataValidationError(f"Empty raw dataframe for asset={asset}")
+    profile=True logs wall time and peak traced memory per stage.
+    workers > 1 cleans asset shards on a process pool (opt-in).
+    """
+    if workers and workers > 1 and len(raw_data) > 1:
+        cleaned_data = {}
+        for shard in map_frame_shards(
+            clean_market_data, raw_data, workers,
+            price_dtype=price_dtype, profile=profile,
+        ):
+            cleaned_data.update(shard)
+        return cleaned_data
 
-        _validate_required_columns(df, asset)
+    cleaned_data: Dict[str, pd.DataFrame] = {}
 
-        df_clean = df.copy()
+    with _profiling(profile):
+        for asset, df in raw_data.items():
+            if df is None or df.empty:
+                raise DataValidationError(f"Empty raw dataframe for asset={asset}")
 
-        # 1. Standardize column names
-        df_clean = _standardize_columns(df_clean)
+            _validate_required_columns(df, asset)
 
-        # 2. Enforce data types
-        df_clean = _cast_types(df_clean, asset)
+            # 1. Standardize column names
+            with _stage(profile, asset, "project"):
+                df_clean = _standardize_columns(df)
 
-        # 3. Drop exact duplicate rows (raw-level safety)
-        df_clean = df_clean.drop_duplicates()
+            # 2. Enforce data types
+            with _stage(profile, asset, "cast"):
+                df_clean = _cast_types(df_clean, asset, price_dtype)
 
-        # 4. Sort by timestamp (important for downstream logic)
-        df_clean = df_clean.sort_values("timestamp").reset_index(drop=True)
+            # 3. Drop duplicate timestamps (raw-level safety)
+            with _stage(profile, asset, "dedupe"):
+                duplicated = df_clean["timestamp"].duplicated()
+                if duplicated.any():
+                    df_clean = df_clean[~duplicated.to_numpy()]
 
-        cleaned_data[asset] = df_clean
+            # 4. Sort by timestamp (important for downstream logic)
+            with _stage(profile, asset, "sort"):
+                if not df_clean["timestamp"].is_monotonic_increasing:
+                    df_clean = df_clean.sort_values("timestamp", kind="stable")
+                df_clean.index = pd.RangeIndex(len(df_clean))
+
+            cleaned_data[asset] = df_clean
 
     return cleaned_data
 
@@ -52,38 +109,41 @@ def _validate_required_columns(df: pd.DataFrame, asset: str) -> None:
 
 def _standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Rename columns to standard internal naming.
+    Project and rename to standard internal naming in a single step.
     """
-    rename_map = {
-        "open": "open_price",
-        "high": "high_price",
-        "low": "low_price",
-        "close": "close_price",
-    }
+    by_lower = {c.lower(): c for c in df.columns}
 
-    df = df.rename(columns={c: c.lower() for c in df.columns})
-    df = df.rename(columns=rename_map)
+    columns = {
+        target: df[by_lower[source]]
+        for source, target in STANDARD_COLUMNS.items()
+    }
+    columns.update({
+        c: df[by_lower[c]] for c in METADATA_COLUMNS if c in by_lower
+    })
 
-    return df
+    return pd.DataFrame(columns, copy=False)
 
 
-def _cast_types(df: pd.DataFrame, asset: str) -> pd.DataFrame:
+def _cast_types(
+    df: pd.DataFrame,
+    asset: str,
+    price_dtype: str = "float64",
+) -> pd.DataFrame:
     """
-    Cast columns to expected dtypes.
+    Cast columns to expected dtypes; columns already correct are not copied.
     """
     try:
-        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+        timestamp = df["timestamp"]
+        if not (
+            isinstance(timestamp.dtype, pd.DatetimeTZDtype)
+            and str(timestamp.dtype.tz) == "UTC"
+        ):
+            df["timestamp"] = pd.to_datetime(timestamp, utc=True)
 
-        numeric_columns = [
-            "open_price",
-            "high_price",
-            "low_price",
-            "close_price",
-            "volume",
-        ]
+        dtypes = {col: price_dtype for col in PRICE_COLUMNS}
+        dtypes["volume"] = "float64"
 
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors="raise")
+        df = df.astype(dtypes, copy=False)
 
     except Exception as err:
         raise DataValidationError(
@@ -91,3 +151,37 @@ def _cast_types(df: pd.DataFrame, asset: str) -> pd.DataFrame:
         )
 
     return df
+
+
+@contextmanager
+def _profiling(enabled: bool):
+    started_here = enabled and not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+
+@contextmanager
+def _stage(enabled: bool, asset: str, stage: str):
+    if not enabled:
+        yield
+        return
+
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        log_stage_profile(
+            step="CLEAN",
+            stage=stage,
+            asset=asset,
+            seconds=time.perf_counter() - start,
+            peak_bytes=peak - base,
+        )
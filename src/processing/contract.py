@@ -0,0 +1,354 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from common.config import get_config_dir
+from common.errors import SystemError
+
+
+CONTRACTS_FILE = "contracts.yaml"
+
+DTYPE_KINDS = {
+    "float": "f",
+    "integer": "iu",
+    "numeric": "iuf",
+    "bool": "b",
+    "datetime": "M",
+    "string": "OSU",
+}
+
+
+@dataclass
+class RuleViolation:
+    asset: str
+    rule: str
+    row_count: int
+    sample_keys: List
+    message: str
+
+
+class _FrameContext:
+    """Combined multi-asset frame plus the asset code of every row."""
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        asset_codes: np.ndarray,
+        n_assets: int,
+        expected_hours: Optional[int],
+    ):
+        self.frame = frame
+        self.asset_codes = asset_codes
+        self.n_assets = n_assets
+        self.expected_hours = expected_hours
+
+    def has(self, *columns: str) -> bool:
+        return all(c in self.frame.columns for c in columns)
+
+    def values(self, column: str) -> np.ndarray:
+        series = self.frame[column]
+        if isinstance(series.dtype, pd.DatetimeTZDtype):
+            return pd.DatetimeIndex(series).asi8
+        return series.to_numpy()
+
+
+# Row checks return a boolean mask of violating rows.
+RowCheck = Callable[[_FrameContext, Dict], np.ndarray]
+# Asset checks return {asset code: (row_count, detail message)}.
+AssetCheck = Callable[[_FrameContext, Dict], Dict[int, Tuple[int, str]]]
+
+ROW_CHECKS: Dict[str, RowCheck] = {}
+ASSET_CHECKS: Dict[str, AssetCheck] = {}
+
+
+def row_check(check_type: str):
+    def register(func: RowCheck) -> RowCheck:
+        ROW_CHECKS[check_type] = func
+        return func
+    return register
+
+
+def asset_check(check_type: str):
+    def register(func: AssetCheck) -> AssetCheck:
+        ASSET_CHECKS[check_type] = func
+        return func
+    return register
+
+
+@row_check("unique")
+def _check_unique(ctx: _FrameContext, check: Dict) -> np.ndarray:
+    keys = {"__asset": ctx.asset_codes}
+    keys.update({c: ctx.values(c) for c in check["columns"]})
+    return pd.DataFrame(keys).duplicated().to_numpy()
+
+
+@row_check("not_null")
+def _check_not_null(ctx: _FrameContext, check: Dict) -> np.ndarray:
+    return ctx.frame[check["columns"]].isna().to_numpy().any(axis=1)
+
+
+@row_check("positive")
+def _check_positive(ctx: _FrameContext, check: Dict) -> np.ndarray:
+    return (ctx.frame[check["columns"]].to_numpy() <= 0).any(axis=1)
+
+
+@row_check("non_negative")
+def _check_non_negative(ctx: _FrameContext, check: Dict) -> np.ndarray:
+    return (ctx.frame[check["columns"]].to_numpy() < 0).any(axis=1)
+
+
+@row_check("ohlc_ordering")
+def _check_ohlc_ordering(ctx: _FrameContext, check: Dict) -> np.ndarray:
+    o, h, l, c = (ctx.values(check[k]) for k in ("open", "high", "low", "close"))
+    return (l > o) | (l > c) | (o > h) | (c > h)
+
+
+@row_check("monotonic")
+def _check_monotonic(ctx: _FrameContext, check: Dict) -> np.ndarray:
+    values = ctx.values(check["column"])
+    mask = np.zeros(len(values), dtype=bool)
+    same_asset = ctx.asset_codes[1:] == ctx.asset_codes[:-1]
+    mask[1:] = same_asset & (values[1:] <= values[:-1])
+    return mask
+
+
+@asset_check("complete_hours")
+def _check_complete_hours(
+    ctx: _FrameContext,
+    check: Dict,
+) -> Dict[int, Tuple[int, str]]:
+    if ctx.expected_hours is None:
+        return {}
+
+    expected = ctx.expected_hours
+    distinct = (
+        pd.Series(ctx.values(check["column"]))
+        .groupby(ctx.asset_codes)
+        .nunique()
+    )
+    bad = distinct[distinct != expected]
+
+    return {
+        int(code): (
+            abs(expected - int(actual)),
+            f"Expected {expected} hours, got {actual}",
+        )
+        for code, actual in bad.items()
+    }
+
+
+@asset_check("max_gap_ratio")
+def _check_max_gap_ratio(
+    ctx: _FrameContext,
+    check: Dict,
+) -> Dict[int, Tuple[int, str]]:
+    flags = ctx.values(check["column"]).astype(bool)
+    gaps = np.bincount(ctx.asset_codes, weights=flags, minlength=ctx.n_assets)
+    totals = np.bincount(ctx.asset_codes, minlength=ctx.n_assets)
+    ratio = np.divide(gaps, totals, out=np.zeros_like(gaps), where=totals > 0)
+
+    return {
+        int(code): (
+            int(gaps[code]),
+            f"gap ratio {ratio[code]:.2f} exceeds {check['max_ratio']}",
+        )
+        for code in np.flatnonzero(ratio > check["max_ratio"])
+    }
+
+
+class DataContract:
+    """
+    A declarative contract from config/contracts.yaml, compiled into
+    vectorized checks evaluated over a whole multi-asset frame at once.
+    """
+
+    def __init__(self, name: str, spec: Dict):
+        self.name = name
+        self.key_column = spec.get("key_column")
+        self.required_columns = list(spec.get("required_columns", []))
+        self.dtypes = dict(spec.get("dtypes", {}))
+        self.checks = list(spec.get("checks", []))
+
+        for check in self.checks:
+            if check["type"] not in ROW_CHECKS and check["type"] not in ASSET_CHECKS:
+                raise SystemError(
+                    f"Unknown check type={check['type']} "
+                    f"in contract={name}"
+                )
+        for column, dtype in self.dtypes.items():
+            if dtype not in DTYPE_KINDS:
+                raise SystemError(
+                    f"Unknown dtype={dtype} for column={column} "
+                    f"in contract={name}"
+                )
+
+    def missing_columns(self, columns) -> set:
+        return set(self.required_columns) - set(columns)
+
+    def evaluate(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        scope: str,
+        expected_hours: Optional[int] = None,
+        sample_size: int = 5,
+    ) -> List[RuleViolation]:
+        """
+        Evaluate every check over all frames; violations are ordered by
+        asset, then by check order in the contract.
+        """
+        assets = list(frames)
+        found: List[Tuple[int, int, RuleViolation]] = []
+
+        # Frame-level checks; frames failing them skip the value checks
+        evaluable = []
+        for code, (asset, df) in enumerate(frames.items()):
+            if df.empty:
+                found.append((code, -3, RuleViolation(
+                    asset=asset,
+                    rule="empty",
+                    row_count=0,
+                    sample_keys=[],
+                    message=f"Data empty for asset={asset} on {scope}",
+                )))
+                continue
+
+            missing = self.missing_columns(df.columns)
+            if missing:
+                found.append((code, -2, RuleViolation(
+                    asset=asset,
+                    rule="missing_column",
+                    row_count=len(df),
+                    sample_keys=sorted(missing),
+                    message=(
+                        f"Missing required columns {missing} for asset={asset} "
+                        f"on {scope}"
+                    ),
+                )))
+                continue
+
+            wrong = [
+                column for column, dtype in self.dtypes.items()
+                if column in df.columns
+                and df[column].dtype.kind not in DTYPE_KINDS[dtype]
+            ]
+            if wrong:
+                found.append((code, -1, RuleViolation(
+                    asset=asset,
+                    rule="dtype",
+                    row_count=len(df),
+                    sample_keys=wrong,
+                    message=(
+                        f"Unexpected dtype in columns={wrong} for asset={asset} "
+                        f"on {scope}"
+                    ),
+                )))
+                continue
+
+            evaluable.append(code)
+
+        if evaluable:
+            found.extend(self._evaluate_checks(
+                frames, assets, evaluable, scope, expected_hours, sample_size
+            ))
+
+        found.sort(key=lambda item: item[:2])
+        return [violation for _, _, violation in found]
+
+    def _evaluate_checks(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        assets: List[str],
+        evaluable: List[int],
+        scope: str,
+        expected_hours: Optional[int],
+        sample_size: int,
+    ) -> List[Tuple[int, int, RuleViolation]]:
+        dfs = [frames[assets[code]] for code in evaluable]
+        columns = [c for c in self._referenced_columns() if all(c in df for df in dfs)]
+
+        combined = pd.concat([df[columns] for df in dfs], ignore_index=True)
+        lengths = np.array([len(df) for df in dfs])
+        asset_codes = np.repeat(np.array(evaluable), lengths)
+
+        ctx = _FrameContext(combined, asset_codes, len(assets), expected_hours)
+        keys = ctx.values(self.key_column) if ctx.has(self.key_column or "") else None
+
+        found = []
+
+        for order, check in enumerate(self.checks):
+            if not ctx.has(*self._check_columns(check)):
+                continue
+
+            if check["type"] in ROW_CHECKS:
+                mask = ROW_CHECKS[check["type"]](ctx, check)
+                bad_rows = np.flatnonzero(mask)
+                if not len(bad_rows):
+                    continue
+                bad_codes = asset_codes[bad_rows]
+                counts = np.bincount(bad_codes, minlength=len(assets))
+
+                for code in np.flatnonzero(counts):
+                    asset = assets[code]
+                    rows = bad_rows[bad_codes == code][:sample_size]
+                    found.append((code, order, RuleViolation(
+                        asset=asset,
+                        rule=check["name"],
+                        row_count=int(counts[code]),
+                        sample_keys=keys[rows].tolist() if keys is not None else [],
+                        message=(
+                            f"Contract check {check['name']} failed for "
+                            f"asset={asset} on {scope} ({counts[code]} rows)"
+                        ),
+                    )))
+            else:
+                results = ASSET_CHECKS[check["type"]](ctx, check)
+                for code, (row_count, detail) in sorted(results.items()):
+                    asset = assets[code]
+                    found.append((code, order, RuleViolation(
+                        asset=asset,
+                        rule=check["name"],
+                        row_count=row_count,
+                        sample_keys=[],
+                        message=(
+                            f"Contract check {check['name']} failed for "
+                            f"asset={asset}. {detail} on {scope}"
+                        ),
+                    )))
+
+        return found
+
+    def _referenced_columns(self) -> List[str]:
+        columns = [self.key_column] if self.key_column else []
+        for check in self.checks:
+            columns.extend(self._check_columns(check))
+        return list(dict.fromkeys(columns))
+
+    @staticmethod
+    def _check_columns(check: Dict) -> List[str]:
+        if "columns" in check:
+            return list(check["columns"])
+        if "column" in check:
+            return [check["column"]]
+        return [check[k] for k in ("open", "high", "low", "close") if k in check]
+
+
+@lru_cache(maxsize=None)
+def load_contract(name: str, path: Optional[str] = None) -> DataContract:
+    """Load and compile a contract once per process."""
+    path = path or os.path.join(get_config_dir(), CONTRACTS_FILE)
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            specs = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError) as err:
+        raise SystemError(f"Failed to load data contracts from {path}: {err}")
+
+    if name not in specs:
+        raise SystemError(f"Contract={name} not defined in {path}")
+
+    return DataContract(name, specs[name])
@@ -1,102 +1,365 @@
-from typing import Dict
+from typing import Dict, Optional, Tuple
 from datetime import date
+import numpy as np
 import pandas as pd
 
 from common.errors import DataValidationError
+from processing.parallel import map_frame_shards
+from common.time_utils import (
+    date_label,
+    format_hour_key,
+    hour_key_from_timestamps,
+)
+
+
+PRICE_COLUMNS = [
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+]
+
+OHLCV_AGG = {
+    "open_price": "first",
+    "high_price": "max",
+    "low_price": "min",
+    "close_price": "last",
+    "volume": "sum",
+}
+
+# Oldest last-known bar that may seed a leading gap
+SEED_MAX_AGE = pd.Timedelta(days=7)
+
+OUTPUT_COLUMNS = [
+    "asset",
+    "hour_key",
+    "timestamp",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+    "data_gap_flag",
+]
 
 
 def normalize_to_hourly(
     cleaned_data: Dict[str, pd.DataFrame],
     execution_date: date,
+    engine: str = "per_asset",
+    hour_key_format: str = "int",
+    end_date: Optional[date] = None,
+    seed_bars: Optional[Dict[str, Dict]] = None,
+    workers: Optional[int] = None,
 ) -> Dict[str, pd.DataFrame]:
+    """
+    Normalize each asset onto a full hourly grid covering execution_date
+    through end_date (inclusive, defaults to execution_date), i.e.
+    24 x N rows per asset. Forward-fill carries across day boundaries.
 
-    hourly_data: Dict[str, pd.DataFrame] = {}
+    engine: 'per_asset' (resample each asset separately)
+            | 'vectorized' (one grouped pass over all assets)
+    hour_key_format: 'int' (int64 YYYYMMDDHH) | 'str' (legacy string)
+    seed_bars: last known bar per asset (see storage.last_bar_repository);
+               a leading gap is filled from its close_price when the bar
+               is older than the grid start and at most SEED_MAX_AGE old
+    workers: > 1 runs the engine over asset shards on a process pool
+             (opt-in); the first failing shard's error is raised
+
+    Both engines return identical frames.
+    """
 
     for asset, df in cleaned_data.items():
         if df.empty:
             raise DataValidationError(
                 f"Cleaned data empty for asset={asset} "
-                f"on execution_date={execution_date}"
+                f"on {date_label(execution_date, end_date)}"
             )
 
-        hourly_df = _normalize_single_asset(df, asset, execution_date)
+    if workers and workers > 1 and len(cleaned_data) > 1:
+        hourly_data: Dict[str, pd.DataFrame] = {}
+        for shard in map_frame_shards(
+            normalize_to_hourly, cleaned_data, workers,
+            shard_kwargs=lambda assets: {
+                "seed_bars": {
+                    a: seed_bars[a] for a in assets if a in (seed_bars or {})
+                },
+            },
+            execution_date=execution_date,
+            engine=engine,
+            hour_key_format=hour_key_format,
+            end_date=end_date,
+        ):
+            hourly_data.update(shard)
+        return hourly_data
+
+    if engine == "vectorized":
+        return _normalize_vectorized(
+            cleaned_data, execution_date, hour_key_format, end_date, seed_bars
+        )
+
+    hourly_data: Dict[str, pd.DataFrame] = {}
+
+    for asset, df in cleaned_data.items():
+        hourly_df = _normalize_single_asset(
+            df, asset, execution_date, hour_key_format, end_date,
+            (seed_bars or {}).get(asset),
+        )
         hourly_data[asset] = hourly_df
 
     return hourly_data
 
 
-def _normalize_single_asset(
-    df: pd.DataFrame,
-    asset: str,
+def normalize_isolating_failures(
+    cleaned_data: Dict[str, pd.DataFrame],
     execution_date: date,
+    **kwargs,
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, DataValidationError]]:
+    """
+    normalize_to_hourly over all assets in one call; if that fails, retry
+    asset by asset so one bad symbol only fails itself.
+
+    Returns:
+        (hourly_data for good assets, {asset: error} for failed assets)
+    """
+    try:
+        return normalize_to_hourly(cleaned_data, execution_date, **kwargs), {}
+    except DataValidationError:
+        pass
+
+    hourly_data: Dict[str, pd.DataFrame] = {}
+    failures: Dict[str, DataValidationError] = {}
+
+    for asset, df in cleaned_data.items():
+        try:
+            hourly_data.update(
+                normalize_to_hourly({asset: df}, execution_date, **kwargs)
+            )
+        except DataValidationError as err:
+            failures[asset] = err
+
+    return hourly_data, failures
+
+
+def normalize_long_to_hourly(
+    long_df: pd.DataFrame,
+    execution_date: date,
+    hour_key_format: str = "int",
+    end_date: Optional[date] = None,
+    seed_bars: Optional[Dict[str, Dict]] = None,
 ) -> pd.DataFrame:
-    # Ensure timestamp index
-    df = df.set_index("timestamp").sort_index()
+    """
+    Normalize a long-format frame (asset x timestamp) for many assets
+    in one pass.
+
+    Rows may come in any order. Returns one frame of len(assets) * 24 * N
+    rows, grouped by asset in order of first appearance and sorted by
+    timestamp within each asset.
+    """
+    full_index = _hourly_index(execution_date, end_date)
+    assets = pd.unique(long_df["asset"])
+    n_hours = len(full_index)
+
+    # first/last below follow row order: put each asset's bars in time
+    # order, keeping the input order of equal timestamps (as the
+    # per-asset engine does)
+    long_df = long_df.sort_values(["asset", "timestamp"], kind="stable")
+
+    # Resample: one groupby over (asset, hour) for all assets
+    hour = long_df["timestamp"].dt.floor("h")
+    hourly = long_df.groupby(
+        [long_df["asset"], hour],
+        sort=False,
+    ).agg(OHLCV_AGG)
+
+    # Reindex to the full (asset x 24N-hour) grid
+    grid = pd.MultiIndex.from_product(
+        [assets, full_index],
+        names=["asset", "timestamp"],
+    )
+    hourly = hourly.reindex(grid)
+
+    # Track gaps BEFORE filling
+    data_gap_flag = hourly["close_price"].isna().to_numpy()
+
+    seed_close = np.array([
+        _seed_close((seed_bars or {}).get(asset), full_index[0])
+        for asset in assets
+    ], dtype="float64")
+
+    # Forward-fill prices within each asset block, seeding leading gaps
+    for col in PRICE_COLUMNS:
+        values = hourly[col].to_numpy()
+        values = values.astype(
+            values.dtype if values.dtype.kind == "f" else "float64",
+            copy=True,
+        ).reshape(len(assets), n_hours)
+        first = values[:, 0]
+        np.copyto(first, seed_close, where=np.isnan(first))
+        hourly[col] = _ffill_rows(values).reshape(-1)
+
+    hourly["volume"] = hourly["volume"].fillna(0)
+
+    unfilled = np.isnan(hourly[PRICE_COLUMNS].to_numpy()).any(axis=1)
+    if unfilled.any():
+        asset = assets[np.argmax(unfilled) // n_hours]
+        raise DataValidationError(
+            f"Unfillable price gap detected for asset={asset} "
+            f"on {date_label(execution_date, end_date)}"
+        )
+
+    hourly = hourly.reset_index()
+    hourly["hour_key"] = np.tile(
+        format_hour_key(hour_key_from_timestamps(full_index), hour_key_format),
+        len(assets),
+    )
+    hourly["data_gap_flag"] = data_gap_flag
+
+    return hourly[OUTPUT_COLUMNS]
+
+
+def _normalize_vectorized(
+    cleaned_data: Dict[str, pd.DataFrame],
+    execution_date: date,
+    hour_key_format: str,
+    end_date: Optional[date],
+    seed_bars: Optional[Dict[str, Dict]],
+) -> Dict[str, pd.DataFrame]:
+    # Nothing to concatenate; matches the per-asset engine
+    if not cleaned_data:
+        return {}
+
+    input_columns = ["timestamp"] + list(OHLCV_AGG)
+
+    long_df = pd.concat(
+        [df[input_columns] for df in cleaned_data.values()],
+        ignore_index=True,
+    )
+    long_df["asset"] = np.repeat(
+        list(cleaned_data),
+        [len(df) for df in cleaned_data.values()],
+    )
+
+    hourly = normalize_long_to_hourly(
+        long_df, execution_date, hour_key_format, end_date, seed_bars
+    )
+
+    n_hours = len(hourly) // len(cleaned_data)
+    grid_start = hourly["timestamp"].iloc[0]
+    grid_end = hourly["timestamp"].iloc[n_hours - 1]
 
-    # Build full hourly index for the execution date (UTC)
+    hourly_data: Dict[str, pd.DataFrame] = {}
+
+    for i, (asset, df) in enumerate(cleaned_data.items()):
+        asset_hourly = hourly.iloc[i * n_hours:(i + 1) * n_hours].reset_index(drop=True)
+
+        # Per-asset resample keeps integer volume when the grid lies inside
+        # the asset's observed range; the shared long column cannot.
+        volume_dtype = df["volume"].dtype
+        if (
+            volume_dtype.kind in "iu"
+            and asset_hourly["volume"].dtype != volume_dtype
+            and df["timestamp"].min().floor("h") <= grid_start
+            and df["timestamp"].max() >= grid_end
+        ):
+            asset_hourly["volume"] = asset_hourly["volume"].astype(volume_dtype)
+
+        hourly_data[asset] = asset_hourly
+
+    return hourly_data
+
+
+def _ffill_rows(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs along axis 1 of a 2-D array, never across rows."""
+    mask = np.isnan(values)
+    idx = np.where(mask, 0, np.arange(values.shape[1]))
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    filled = values[np.arange(values.shape[0])[:, None], idx]
+    # leading NaNs pick column 0, which is itself NaN -> stay NaN
+    return filled
+
+
+def _seed_close(seed: Optional[Dict], grid_start: pd.Timestamp) -> float:
+    """Seed close for a grid starting at grid_start, NaN if unusable."""
+    if not seed:
+        return np.nan
+    if not grid_start - SEED_MAX_AGE <= seed["timestamp"] < grid_start:
+        return np.nan
+    return float(seed["close_price"])
+
+
+def _hourly_index(
+    execution_date: date,
+    end_date: Optional[date] = None,
+) -> pd.DatetimeIndex:
+    """Full hourly index from execution_date to end_date inclusive (UTC)."""
     start_ts = pd.Timestamp(execution_date, tz="UTC")
-    end_ts = start_ts + pd.Timedelta(hours=23)
+    end_ts = (
+        pd.Timestamp(end_date or execution_date, tz="UTC")
+        + pd.Timedelta(hours=23)
+    )
 
-    full_index = pd.date_range(
+    return pd.date_range(
         start=start_ts,
         end=end_ts,
         freq="h",
         tz="UTC",
     )
 
+
+def _normalize_single_asset(
+    df: pd.DataFrame,
+    asset: str,
+    execution_date: date,
+    hour_key_format: str = "int",
+    end_date: Optional[date] = None,
+    seed_bar: Optional[Dict] = None,
+) -> pd.DataFrame:
+    # Ensure timestamp index
+    df = df.set_index("timestamp").sort_index(kind="stable")
+
+    # Build full hourly index for the date range (UTC)
+    full_index = _hourly_index(execution_date, end_date)
+
     # Resample to hourly (last known within the hour)
-    hourly = df.resample("h").agg({
-        "open_price": "first",
-        "high_price": "max",
-        "low_price": "min",
-        "close_price": "last",
-        "volume": "sum",
-    })
-
-    # Reindex to full 24-hour grid
+    hourly = df.resample("h").agg(OHLCV_AGG)
+
+    # Reindex to full 24 x N-hour grid
     hourly = hourly.reindex(full_index)
 
     # Track gaps BEFORE filling
     data_gap_flag = hourly["close_price"].isna()
 
+    # Seed a leading gap from the last known bar
+    seed_close = _seed_close(seed_bar, full_index[0])
+    if not np.isnan(seed_close):
+        first = hourly.index[0]
+        hourly.loc[first, PRICE_COLUMNS] = (
+            hourly.loc[first, PRICE_COLUMNS].fillna(seed_close)
+        )
+
     # Fill missing prices using forward-fill
-    price_cols = [
-        "open_price",
-        "high_price",
-        "low_price",
-        "close_price",
-    ]
-    hourly[price_cols] = hourly[price_cols].ffill()
+    hourly[PRICE_COLUMNS] = hourly[PRICE_COLUMNS].ffill()
 
     # Fill missing volume with 0
     hourly["volume"] = hourly["volume"].fillna(0)
 
     # Final validation (no NaN allowed)
-    if hourly[price_cols].isna().any().any():
+    if hourly[PRICE_COLUMNS].isna().any().any():
         raise DataValidationError(
             f"Unfillable price gap detected for asset={asset} "
-            f"on execution_date={execution_date}"
+            f"on {date_label(execution_date, end_date)}"
         )
 
     # Add metadata columns
     hourly = hourly.reset_index().rename(columns={"index": "timestamp"})
-    hourly["hour_key"] = hourly["timestamp"].dt.strftime("%Y%m%d%H")
+    hourly["hour_key"] = format_hour_key(
+        hour_key_from_timestamps(hourly["timestamp"]), hour_key_format
+    )
     hourly["data_gap_flag"] = data_gap_flag.values
     hourly["asset"] = asset
 
     # Enforce final ordering
-    hourly = hourly[
-        [
-            "asset",
-            "hour_key",
-            "timestamp",
-            "open_price",
-            "high_price",
-            "low_price",
-            "close_price",
-            "volume",
-            "data_gap_flag",
-        ]
-    ]
+    hourly = hourly[OUTPUT_COLUMNS]
 
     return hourly
@@ -0,0 +1,144 @@
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+# Shards per worker; >1 evens out assets of different sizes
+SHARDS_PER_WORKER = 2
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool reused across calls, one per worker count."""
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _pools[workers]
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _pools.clear()
+
+
+def frame_to_ipc(df: pd.DataFrame) -> pa.Buffer:
+    """Serialize a frame as an Arrow IPC stream (columnar, no pickling)."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def frame_from_ipc(buffer: pa.Buffer) -> pd.DataFrame:
+    with pa.ipc.open_stream(buffer) as reader:
+        return reader.read_all().to_pandas()
+
+
+def frames_to_ipc(frames: Dict[str, pd.DataFrame]) -> Tuple:
+    """
+    Encode a shard of frames for transport. Frames sharing one schema are
+    stacked into a single Arrow table (one IPC stream per shard); mixed
+    schemas fall back to one stream per frame.
+    """
+    dfs = list(frames.values())
+    first = dfs[0]
+    homogeneous = all(
+        list(df.columns) == list(first.columns) and df.dtypes.equals(first.dtypes)
+        for df in dfs[1:]
+    )
+    if not homogeneous:
+        return ("frames", {asset: frame_to_ipc(df) for asset, df in frames.items()})
+
+    return (
+        "stacked",
+        frame_to_ipc(pd.concat(dfs, ignore_index=True)),
+        list(frames),
+        [len(df) for df in dfs],
+    )
+
+
+def frames_from_ipc(payload: Tuple) -> Dict[str, pd.DataFrame]:
+    if payload[0] == "frames":
+        return {asset: frame_from_ipc(buf) for asset, buf in payload[1].items()}
+
+    _, buffer, assets, lengths = payload
+    stacked = frame_from_ipc(buffer)
+
+    frames = {}
+    offset = 0
+    for asset, length in zip(assets, lengths):
+        frames[asset] = stacked.iloc[offset:offset + length].reset_index(drop=True)
+        offset += length
+    return frames
+
+
+def map_frame_shards(
+    func: Callable[..., Any],
+    frames: Dict[str, pd.DataFrame],
+    workers: int,
+    shard_kwargs: Optional[Callable[[List[str]], Dict]] = None,
+    **kwargs,
+) -> List[Any]:
+    """
+    Split frames into contiguous asset shards and run
+    func(shard_frames, **kwargs) for each shard on a process pool.
+
+    Frames travel both ways as Arrow IPC buffers. Results come back in
+    shard (i.e. asset) order; a dict of frames is rebuilt on return, any
+    other result is returned as is. The first shard error is re-raised.
+
+    shard_kwargs(assets) adds per-shard keyword arguments (e.g. only the
+    seed bars of the shard's assets).
+    """
+    assets = list(frames)
+    n_shards = min(len(assets), workers * SHARDS_PER_WORKER)
+    bounds = [len(assets) * i // n_shards for i in range(n_shards + 1)]
+    pool = get_process_pool(workers)
+
+    futures = []
+    for start, end in zip(bounds, bounds[1:]):
+        shard = assets[start:end]
+        extra = shard_kwargs(shard) if shard_kwargs else {}
+        futures.append(pool.submit(
+            _run_shard,
+            func,
+            frames_to_ipc({asset: frames[asset] for asset in shard}),
+            {**kwargs, **extra},
+        ))
+
+    return [_decode(future.result()) for future in futures]
+
+
+def _run_shard(
+    func: Callable[..., Any],
+    payload: Tuple,
+    kwargs: Dict,
+) -> Any:
+    result = func(frames_from_ipc(payload), **kwargs)
+    if _is_frame_dict(result):
+        return _EncodedFrames(frames_to_ipc(result))
+    return result
+
+
+class _EncodedFrames:
+    """Marks a shard result that was a dict of frames."""
+
+    def __init__(self, payload: Tuple):
+        self.payload = payload
+
+
+def _decode(result: Any) -> Any:
+    if isinstance(result, _EncodedFrames):
+        return frames_from_ipc(result.payload)
+    return result
+
+
+def _is_frame_dict(result: Any) -> bool:
+    return isinstance(result, dict) and bool(result) and all(
+        isinstance(v, pd.DataFrame) for v in result.values()
+    )
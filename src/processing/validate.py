@@ -1,7 +1,17 @@
-from typing import Dict, List
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 from datetime import date
 
+import pandas as pd
+
 from common.errors import DataValidationError
+from common.time_utils import date_label
+from processing.contract import RuleViolation, load_contract
+from processing.parallel import map_frame_shards
+
+
+HOURLY_CONTRACT = "hourly_market_data"
+
 
 def validate_raw_data(
         raw_data: Dict[str, object],
@@ -31,61 +41,90 @@ def validate_raw_data(
 def validate_hourly_data(
         hourly_data: Dict[str,object],
         execution_date: date,
+        end_date: Optional[date] = None,
+        workers: Optional[int] = None,
 ) -> None:
-    if not hourly_data:
-        raise DataValidationError(
-            f"Hourly data is empty for execution_date={execution_date}"
-        )
+    """
+    Validate hourly frames covering execution_date through end_date
+    (inclusive, defaults to execution_date): 24 x N hours per asset.
+
+    Raises DataValidationError describing every violation found.
+    """
+    report = check_hourly_data(
+        hourly_data, execution_date, end_date, workers=workers
+    )
+    report.raise_if_failed()
+
+
+@dataclass
+class ValidationReport:
+    scope: str
+    violations: List[RuleViolation] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    @property
+    def failed_assets(self) -> List[str]:
+        return list(dict.fromkeys(v.asset for v in self.violations))
 
-    for asset, df in hourly_data.items():
-        if df.empty:
+    def for_asset(self, asset: str) -> List[RuleViolation]:
+        return [v for v in self.violations if v.asset == asset]
+
+    def raise_if_failed(self) -> None:
+        if self.violations:
             raise DataValidationError(
-                f"Hourly data empty for asset={asset} "
-                f"on execution_date={execution_date}"
+                "; ".join(v.message for v in self.violations)
             )
 
-        _validate_no_duplicate_hour(df, asset, execution_date)
-        _validate_no_missing_hour(df, asset, execution_date)
-        _validate_price_and_volume(df, asset, execution_date)
 
-def _validate_no_duplicate_hour(df, asset: str, execution_date: date) -> None:
-    duplicated = df["hour_key"].duplicated().any()
-    if duplicated:
-        raise DataValidationError(
-            f"Duplicate hour_key detected for asset={asset} "
-            f"on execution_date={execution_date}"
-        )
+def check_hourly_data(
+        hourly_data: Dict[str, pd.DataFrame],
+        execution_date: date,
+        end_date: Optional[date] = None,
+        sample_size: int = 5,
+        workers: Optional[int] = None,
+) -> ValidationReport:
+    """
+    Check every rule of the hourly contract (config/contracts.yaml) over
+    all assets in one vectorized pass.
 
+    Unlike validate_hourly_data this never stops at the first problem:
+    the report lists each (asset, rule) violation with its row count and
+    a few sample hour_keys, so callers can quarantine only bad assets.
 
-def _validate_no_missing_hour(df, asset: str, execution_date: date) -> None:
-    expected_hours = 24
-    actual_hours = df["hour_key"].nunique()
+    workers > 1 checks asset shards on a process pool (opt-in).
+    """
+    scope = date_label(execution_date, end_date)
 
-    if actual_hours != expected_hours:
+    if not hourly_data:
         raise DataValidationError(
-            f"Missing hour detected for asset={asset}. "
-            f"Expected {expected_hours} hours, got {actual_hours} "
-            f"on execution_date={execution_date}"
+            f"Hourly data is empty for {scope}"
         )
 
+    if workers and workers > 1 and len(hourly_data) > 1:
+        reports = map_frame_shards(
+            check_hourly_data, hourly_data, workers,
+            execution_date=execution_date,
+            end_date=end_date,
+            sample_size=sample_size,
+        )
+        return ValidationReport(
+            scope=scope,
+            violations=[v for r in reports for v in r.violations],
+        )
 
-def _validate_price_and_volume(df, asset: str, execution_date: date) -> None:
-    price_columns = [
-        "open_price",
-        "high_price",
-        "low_price",
-        "close_price",
-    ]
+    n_days = ((end_date or execution_date) - execution_date).days + 1
 
-    for col in price_columns:
-        if (df[col] <= 0).any():
-            raise DataValidationError(
-                f"Invalid price detected in column={col} "
-                f"for asset={asset} on execution_date={execution_date}"
-            )
+    contract = load_contract(HOURLY_CONTRACT)
 
-    if (df["volume"] < 0).any():
-        raise DataValidationError(
-            f"Negative volume detected for asset={asset} "
-            f"on execution_date={execution_date}"
-        )
\ No newline at end of file
+    return ValidationReport(
+        scope=scope,
+        violations=contract.evaluate(
+            frames=hourly_data,
+            scope=scope,
+            expected_hours=24 * n_days,
+            sample_size=sample_size,
+        ),
+    )
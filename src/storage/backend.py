@@ -0,0 +1,78 @@
+import threading
+from typing import Dict, Optional
+
+import fsspec
+
+from common.config import (
+    get_azure_storage_account,
+    get_environment,
+    get_storage_backend,
+    get_storage_base_path,
+)
+from common.errors import SystemError
+from common.logging import log_storage_backend
+
+
+BACKENDS = ("local", "memory", "azure")
+
+_filesystems: Dict[str, fsspec.AbstractFileSystem] = {}
+_lock = threading.Lock()
+
+
+def get_filesystem(backend: Optional[str] = None) -> fsspec.AbstractFileSystem:
+    """
+    Shared fsspec filesystem for the configured backend
+    (STORAGE_BACKEND or storage.backend in config/<env>.yaml).
+
+    - local:  local disk, parent directories created on write
+    - memory: process-wide in-memory store, for tests and benchmarks
+    - azure:  ADLS Gen2 via DefaultAzureCredential
+
+    One client per backend is reused by every repository. The configured
+    backend is logged when its client is first created, so every run
+    records where it writes.
+    """
+    configured = backend is None
+    backend = backend or get_storage_backend()
+
+    with _lock:
+        if backend not in _filesystems:
+            _filesystems[backend] = _create_filesystem(backend)
+            if configured:
+                log_storage_backend(
+                    backend, get_environment(), get_storage_base_path()
+                )
+        return _filesystems[backend]
+
+
+def reset_filesystems() -> None:
+    """Drop cached clients (and the in-memory store)."""
+    with _lock:
+        memory = _filesystems.pop("memory", None)
+        if memory is not None:
+            memory.store.clear()
+            memory.pseudo_dirs.clear()
+            memory.pseudo_dirs.append("")
+        _filesystems.clear()
+
+
+def _create_filesystem(backend: str) -> fsspec.AbstractFileSystem:
+    if backend == "local":
+        return fsspec.filesystem("file", auto_mkdir=True)
+
+    if backend == "memory":
+        return fsspec.filesystem("memory")
+
+    if backend == "azure":
+        # Imported lazily so local and memory runs need no Azure packages
+        from adlfs.spec import AzureBlobFileSystem
+        from azure.identity import DefaultAzureCredential
+
+        return AzureBlobFileSystem(
+            account_name=get_azure_storage_account(),
+            credential=DefaultAzureCredential(),
+        )
+
+    raise SystemError(
+        f"Unknown storage backend={backend}; expected one of {list(BACKENDS)}"
+    )
@@ -0,0 +1,370 @@
+import argparse
+import json
+import posixpath
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from common.config import (
+    get_compaction_grace_days,
+    get_compaction_retention_minutes,
+    get_storage_base_path,
+    get_upload_max_workers,
+)
+from common.errors import PartitionWriteError, SystemError
+from storage.backend import get_filesystem
+
+
+FACT_TABLE = "fact_market_hourly"
+MANIFEST_FILE = "_manifest.json"
+LOCK_FILE = "_manifest.lock"
+
+# One row group per asset-week, so timestamp statistics can skip weeks
+ROW_GROUP_ROWS = 24 * 7
+
+
+def load_manifest(table_dir: str, fs=None) -> Dict:
+    """
+    Compaction manifest of a table:
+    {"version": n, "files": [entry], "retired": [retired entry]}.
+
+    files has one entry per compacted (asset, month) file:
+    {"asset", "month", "path" (relative to table_dir), "dates", "rows"}.
+    retired lists the files a compaction replaced, {"path", "retired_at"}
+    plus the "ukey" of daily files; a later compaction deletes them once
+    COMPACTION_RETENTION_MINUTES have passed.
+    """
+    fs = fs or get_filesystem()
+
+    try:
+        with fs.open(f"{table_dir}/{MANIFEST_FILE}", "rb") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {"version": 0, "files": []}
+
+    manifest.setdefault("retired", [])
+    return manifest
+
+
+def compacted_partitions(manifest: Dict) -> Dict[Tuple[str, str], str]:
+    """{(asset, date): compacted file path relative to the table dir}."""
+    return {
+        (entry["asset"], day): entry["path"]
+        for entry in manifest["files"]
+        for day in entry["dates"]
+    }
+
+
+def compact_fact_partitions(
+    before: Optional[date] = None,
+    assets: Optional[Iterable[str]] = None,
+    base_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    retention_minutes: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Rewrite the daily fact_market_hourly partitions of every closed month
+    (ending before `before`, default today minus COMPACTION_GRACE_DAYS)
+    into one file per (asset, month) under asset=<symbol>/month=<YYYY-MM>/,
+    sorted by timestamp with ROW_GROUP_ROWS rows per row group.
+
+    Daily files that arrive for an already compacted month (e.g. a
+    backfill rewrote a day) are merged in on the next run and replace
+    that day's compacted rows; until then readers keep the compacted rows.
+
+    Readers never see a day twice: new files only become visible through
+    one swap of _manifest.json. The files they replace are only retired
+    by that swap and deleted by a later run, retention_minutes (default
+    COMPACTION_RETENTION_MINUTES) afterwards, so a reader still holding
+    the previous manifest can open every file it lists.
+
+    Returns {"months", "files_in", "files_out", "rows", "files_removed"}.
+
+    Raises:
+        PartitionWriteError with {(asset, month): error} for months that
+        could not be compacted; the other months are still swapped in.
+    """
+    base_path = base_path or get_storage_base_path()
+    table_dir = f"{base_path}/{FACT_TABLE}"
+    fs = get_filesystem()
+
+    if before is None:
+        before = datetime.utcnow().date() - timedelta(days=get_compaction_grace_days())
+    if retention_minutes is None:
+        retention_minutes = get_compaction_retention_minutes()
+    wanted = set(assets) if assets is not None else None
+
+    # List daily files before reading the manifest: a compaction finishing
+    # in between has already swapped in the files covering what we miss
+    daily_paths = fs.glob(f"{table_dir}/asset=*/date=*/data.parquet")
+
+    manifest = load_manifest(table_dir, fs)
+    existing = {(e["asset"], e["month"]): e for e in manifest["files"]}
+
+    # Daily files already compacted, kept until their retention ends
+    retired_daily = {
+        (r["path"], r["ukey"]) for r in manifest["retired"] if r.get("ukey")
+    }
+    retired_paths = {path for path, _ in retired_daily}
+
+    groups: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+    for path in daily_paths:
+        asset, day = _partition_of(path)
+        month = day[:7]
+        if (wanted is not None and asset not in wanted) or _month_end(month) >= before:
+            continue
+        relative = _relative(path)
+        if relative in retired_paths and (relative, fs.ukey(path)) in retired_daily:
+            continue
+        groups.setdefault((asset, month), []).append((day, path))
+
+    cutoff = datetime.utcnow() - timedelta(minutes=retention_minutes)
+    due = [
+        r for r in manifest["retired"]
+        if datetime.fromisoformat(r["retired_at"]) <= cutoff
+    ]
+
+    stats = {"months": 0, "files_in": 0, "files_out": 0, "rows": 0, "files_removed": 0}
+    if not groups and not due:
+        return stats
+
+    entries: Dict[Tuple[str, str], Dict] = {}
+    read_keys: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+    failures: Dict[Tuple[str, str], Exception] = {}
+
+    if groups:
+        max_workers = min(max_workers or get_upload_max_workers(), len(groups))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                key: executor.submit(
+                    _compact_month, fs, table_dir, key[0], key[1],
+                    sorted(daily), existing.get(key),
+                )
+                for key, daily in groups.items()
+            }
+            for key, future in futures.items():
+                try:
+                    entries[key], read_keys[key] = future.result()
+                except Exception as err:
+                    failures[key] = err
+
+    if entries or due:
+        retired_at = datetime.utcnow().isoformat()
+        retired = [r for r in manifest["retired"] if r not in due]
+        for key in sorted(entries):
+            retired.extend(
+                {"path": _relative(path), "ukey": ukey, "retired_at": retired_at}
+                for path, ukey in read_keys[key]
+            )
+            if key in existing:
+                retired.append(
+                    {"path": existing[key]["path"], "retired_at": retired_at}
+                )
+
+        merged = {**existing, **entries}
+        try:
+            stats["files_removed"] = _swap_manifest(
+                fs, table_dir, manifest,
+                files=[merged[key] for key in sorted(merged)],
+                retired=retired,
+                purge=due,
+            )
+        except Exception:
+            if entries:
+                fs.rm([f"{table_dir}/{e['path']}" for e in entries.values()])
+            raise
+
+        for key, entry in entries.items():
+            stats["months"] += 1
+            stats["files_in"] += len(groups[key])
+            stats["files_out"] += 1
+            stats["rows"] += entry["rows"]
+
+    if failures:
+        failed = list(failures)
+        raise PartitionWriteError(
+            f"Failed to compact partitions={failed}: {failures[failed[0]]}",
+            failures=failures,
+        )
+
+    return stats
+
+
+def _compact_month(
+    fs,
+    table_dir: str,
+    asset: str,
+    month: str,
+    daily: List[Tuple[str, str]],
+    previous: Optional[Dict],
+) -> Tuple[Dict, List[Tuple[str, str]]]:
+    """
+    Write one sorted file for (asset, month) from its daily files plus the
+    previously compacted rows of days without a newer daily file.
+
+    Returns (manifest entry, [(path, ukey)] of the daily files read).
+    """
+    tables = []
+    read_keys = []
+
+    for _, path in daily:
+        ukey = fs.ukey(path)
+        with fs.open(path, "rb") as f:
+            tables.append(_conform(pq.read_table(f)))
+        read_keys.append((path, ukey))
+
+    if previous:
+        with fs.open(f"{table_dir}/{previous['path']}", "rb") as f:
+            table = _conform(pq.read_table(f))
+        days = pc.strftime(table["timestamp"], format="%Y-%m-%d")
+        fresh = pa.array([day for day, _ in daily])
+        tables.append(table.filter(pc.invert(pc.is_in(days, value_set=fresh))))
+
+    table = pa.concat_tables(tables, promote_options="permissive")
+    table = table.sort_by("timestamp")
+
+    relative = f"asset={asset}/month={month}/part-{uuid.uuid4().hex[:12]}.parquet"
+    with fs.open(f"{table_dir}/{relative}", "wb") as f:
+        pq.write_table(table, f, row_group_size=ROW_GROUP_ROWS, write_statistics=True)
+
+    dates = pc.unique(pc.strftime(table["timestamp"], format="%Y-%m-%d"))
+
+    entry = {
+        "asset": asset,
+        "month": month,
+        "path": relative,
+        "dates": sorted(dates.to_pylist()),
+        "rows": table.num_rows,
+    }
+    return entry, read_keys
+
+
+def _swap_manifest(
+    fs,
+    table_dir: str,
+    manifest: Dict,
+    files: List[Dict],
+    retired: List[Dict],
+    purge: List[Dict],
+) -> int:
+    """
+    Replace _manifest.json in one rename while holding _manifest.lock.
+    Under the lock, the version check refuses to overwrite a manifest
+    another compaction swapped in since we read it, and the retired files
+    in purge are deleted before the manifest that drops them goes live.
+
+    Returns the number of retired files deleted.
+    """
+    with _manifest_lock(fs, table_dir):
+        current = load_manifest(table_dir, fs)
+        if current["version"] != manifest["version"]:
+            raise SystemError(
+                f"Manifest of {table_dir} changed during compaction "
+                f"(version {manifest['version']} -> {current['version']})"
+            )
+
+        removed = _purge_retired(fs, table_dir, purge)
+
+        new_manifest = {
+            "version": manifest["version"] + 1,
+            "updated_at": datetime.utcnow().isoformat(),
+            "files": files,
+            "retired": retired,
+        }
+
+        staging = f"{table_dir}/_manifest.{uuid.uuid4().hex[:12]}.tmp"
+        with fs.open(staging, "wb") as f:
+            f.write(json.dumps(new_manifest, indent=1).encode("utf-8"))
+        fs.mv(staging, f"{table_dir}/{MANIFEST_FILE}")
+
+    return removed
+
+
+@contextmanager
+def _manifest_lock(fs, table_dir: str) -> Iterator[None]:
+    """
+    Hold _manifest.lock, created with an exclusive open: of two
+    compactions swapping at once, the second fails instead of passing
+    the version check before the first has renamed its manifest.
+    """
+    lock = f"{table_dir}/{LOCK_FILE}"
+    try:
+        with fs.open(lock, "xb") as f:
+            f.write(json.dumps({
+                "acquired_at": datetime.utcnow().isoformat(),
+            }).encode("utf-8"))
+    except FileExistsError:
+        raise SystemError(
+            f"Manifest of {table_dir} is locked by another compaction "
+            f"(remove {lock} if none is running)"
+        )
+
+    try:
+        yield
+    finally:
+        fs.rm(lock)
+
+
+def _purge_retired(fs, table_dir: str, retired: List[Dict]) -> int:
+    removed = 0
+
+    for entry in retired:
+        path = f"{table_dir}/{entry['path']}"
+        try:
+            # Rewritten since it was compacted: keep it for the next run
+            if entry.get("ukey") and fs.ukey(path) != entry["ukey"]:
+                continue
+            fs.rm(path)
+        except FileNotFoundError:
+            continue
+        removed += 1
+
+        try:
+            fs.rmdir(posixpath.dirname(path))
+        except OSError:
+            pass
+
+    return removed
+
+
+def _conform(table: pa.Table) -> pa.Table:
+    """Older partitions stored hour_key as a string."""
+    index = table.schema.get_field_index("hour_key")
+    if index >= 0 and pa.types.is_string(table.schema.field(index).type):
+        table = table.set_column(
+            index, "hour_key", pc.cast(table["hour_key"], pa.int64())
+        )
+    return table
+
+
+def _relative(path: str) -> str:
+    """asset=<symbol>/<date or month dir>/<file> of a path in the table."""
+    return "/".join(path.rstrip("/").split("/")[-3:])
+
+
+def _partition_of(path: str) -> Tuple[str, str]:
+    parts = path.rstrip("/").split("/")
+    return parts[-3].split("=", 1)[1], parts[-2].split("=", 1)[1]
+
+
+def _month_end(month: str) -> date:
+    first = date.fromisoformat(f"{month}-01")
+    return (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--before",
+        type=date.fromisoformat,
+        help="compact months ending before this date (YYYY-MM-DD)",
+    )
+    args = parser.parse_args()
+
+    print(compact_fact_partitions(before=args.before))
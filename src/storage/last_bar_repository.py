@@ -0,0 +1,109 @@
+import os
+import sqlite3
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from common.config import get_last_bar_store_path
+from common.errors import SystemError
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS last_bar (
+    asset TEXT PRIMARY KEY,
+    timestamp_ns INTEGER NOT NULL,
+    close_price REAL NOT NULL,
+    pipeline_run_id TEXT
+)
+"""
+
+_UPSERT = """
+INSERT INTO last_bar (asset, timestamp_ns, close_price, pipeline_run_id)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(asset) DO UPDATE SET
+    timestamp_ns = excluded.timestamp_ns,
+    close_price = excluded.close_price,
+    pipeline_run_id = excluded.pipeline_run_id
+WHERE excluded.timestamp_ns > last_bar.timestamp_ns
+"""
+
+
+def load_last_bars(
+    assets: Optional[Iterable[str]] = None,
+    path: Optional[str] = None,
+) -> Dict[str, Dict]:
+    """
+    Read the latest known bar per asset (one query per run).
+
+    Returns:
+        {asset: {"timestamp": pd.Timestamp (UTC), "close_price": float}}
+    """
+    path = path or get_last_bar_store_path()
+    if not os.path.exists(path):
+        return {}
+
+    wanted = set(assets) if assets is not None else None
+
+    try:
+        con = _connect(path)
+        try:
+            rows = con.execute(
+                "SELECT asset, timestamp_ns, close_price FROM last_bar"
+            ).fetchall()
+        finally:
+            con.close()
+    except sqlite3.Error as err:
+        raise SystemError(f"Failed to read last bar store at {path}: {err}")
+
+    return {
+        asset: {
+            "timestamp": pd.Timestamp(timestamp_ns, unit="ns", tz="UTC"),
+            "close_price": close_price,
+        }
+        for asset, timestamp_ns, close_price in rows
+        if wanted is None or asset in wanted
+    }
+
+
+def update_last_bars(
+    hourly_data: Dict[str, pd.DataFrame],
+    pipeline_run_id: str,
+    path: Optional[str] = None,
+) -> None:
+    """
+    Record each asset's last hourly bar; older bars never replace newer
+    ones, so out-of-order backfills are safe.
+    """
+    path = path or get_last_bar_store_path()
+
+    rows = []
+    for asset, df in hourly_data.items():
+        if df.empty:
+            continue
+        last = df.iloc[-1]
+        rows.append((
+            asset,
+            pd.Timestamp(last["timestamp"]).value,
+            float(last["close_price"]),
+            pipeline_run_id,
+        ))
+
+    if not rows:
+        return
+
+    try:
+        con = _connect(path)
+        try:
+            with con:
+                con.executemany(_UPSERT, rows)
+        finally:
+            con.close()
+    except sqlite3.Error as err:
+        raise SystemError(f"Failed to update last bar store at {path}: {err}")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    con = sqlite3.connect(path, timeout=30)
+    con.execute(_SCHEMA)
+    return con
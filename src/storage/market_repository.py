@@ -1,52 +1,162 @@
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
-from common.errors import SystemError
-from common.config import get_storage_base_path
+from common.errors import PartitionWriteError, SystemError
+from common.config import get_storage_base_path, get_upload_max_workers
+from storage.backend import get_filesystem
+from storage.compaction import compacted_partitions, load_manifest
 
-from adlfs.spec import AzureBlobFileSystem
-from azure.identity import DefaultAzureCredential
+NS_PER_DAY = 86_400 * 10**9
 
-_fs = None
 
 def get_fs():
-    global _fs
-    if _fs is None:
-        _fs = AzureBlobFileSystem(
-            account_name="marketpipeline",
-            credential=DefaultAzureCredential(),
-        )
-    return _fs
+    """Filesystem of the configured storage backend (see storage.backend)."""
+    return get_filesystem()
 
 def write_fact_market_hourly(
     hourly_data: Dict[str, pd.DataFrame],
     pipeline_run_id: str,
-) -> None:
+    max_workers: Optional[int] = None,
+) -> int:
+    """
+    Write one partition per (asset, date). Frames may span any number of
+    days (e.g. a multi-month backfill); each is split by UTC date in one
+    pass and all partitions are uploaded up to max_workers
+    (UPLOAD_MAX_WORKERS) at once over the shared filesystem client.
+    Every partition is attempted; failures are raised together.
+
+    Returns the number of bytes written.
+
+    Raises:
+        PartitionWriteError with {(asset, date): error} for the failed
+        partitions; date is None if the asset's frame could not be split.
+    """
+    if not hourly_data:
+        return 0
+
     base_path = get_storage_base_path()
+    fs = get_fs()
+
+    bytes_written = 0
+    failures: Dict[Tuple[str, Optional[str]], Exception] = {}
+    partitions = []
 
     for asset, df in hourly_data.items():
         try:
-            _write_single_asset(df, asset, base_path)
-
-        except Exception as err:
-            raise SystemError(
-                f"Failed to write hourly data for asset={asset}: {err}"
+            partitions.extend(
+                (asset, date_value, table)
+                for date_value, table in _split_by_date(df, asset)
             )
+        except Exception as err:
+            failures[(asset, None)] = err
+
+    if partitions:
+        max_workers = min(max_workers or get_upload_max_workers(), len(partitions))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                (asset, date_value): executor.submit(
+                    _write_partition, table, asset, date_value, base_path, fs
+                )
+                for asset, date_value, table in partitions
+            }
+
+            for key, future in futures.items():
+                try:
+                    bytes_written += future.result()
+                except Exception as err:
+                    failures[key] = err
+
+    if failures:
+        failed = list(failures)
+        raise PartitionWriteError(
+            f"Failed to write hourly data for partitions={failed}: "
+            f"{failures[failed[0]]}",
+            failures=failures,
+        )
+
+    return bytes_written
+
+
+def list_existing_partitions(
+    base_path: Optional[str] = None,
+) -> Set[Tuple[str, str]]:
+    """
+    List (asset, date) partitions already present in fact_market_hourly,
+    as daily files or inside compacted monthly files.
+    """
+    base_path = base_path or get_storage_base_path()
+    fs = get_fs()
+
+    try:
+        paths = fs.glob(
+            f"{base_path}/fact_market_hourly/asset=*/date=*/data.parquet"
+        )
+    except FileNotFoundError:
+        paths = []
+
+    partitions = set()
+    for path in paths:
+        parts = path.rstrip("/").split("/")
+        asset = parts[-3].split("=", 1)[1]
+        date_value = parts[-2].split("=", 1)[1]
+        partitions.add((asset, date_value))
+
+    # Read after listing: daily files deleted by a compaction in between
+    # are already covered by the manifest it swapped in
+    manifest = load_manifest(f"{base_path}/fact_market_hourly", fs)
+    partitions.update(compacted_partitions(manifest))
+
+    return partitions
 
 
-def _write_single_asset(
+def _split_by_date(
     df: pd.DataFrame,
     asset: str,
-    base_path: str,
-) -> None:
+) -> List[Tuple[str, pa.Table]]:
+    """
+    Convert a frame to Arrow once and cut it into zero-copy per-date
+    slices, each carrying its `date` column.
+    """
     if df.empty:
         raise SystemError(f"Attempted to write empty dataframe for asset={asset}")
 
-    df = df.copy()
-    df["date"] = df["timestamp"].dt.date.astype(str)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    timestamps = pd.DatetimeIndex(df["timestamp"]).asi8
+
+    # Hourly frames are already ordered; only reorder when they are not
+    if (timestamps[1:] < timestamps[:-1]).any():
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        table = table.take(order)
+
+    days = timestamps // NS_PER_DAY
+
+    table = table.append_column(
+        "date", pc.strftime(table["timestamp"], format="%Y-%m-%d")
+    )
+
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    ends = np.r_[starts[1:], len(days)]
+
+    return [
+        (table["date"][start].as_py(), table.slice(start, end - start))
+        for start, end in zip(starts, ends)
+    ]
 
-    date_value = df["date"].iloc[0]
 
+def _write_partition(
+    table: pa.Table,
+    asset: str,
+    date_value: str,
+    base_path: str,
+    fs=None,
+) -> int:
     target_path = (
         f"{base_path}/fact_market_hourly/"
         f"asset={asset}/"
@@ -54,18 +164,8 @@ def _write_single_asset(
         f"data.parquet"
     )
 
-    # local run
-    # fs = AzureBlobFileSystem(
-    #     account_name=None,  # picked up from env
-    #     account_key=None,   # picked up from env
-    # )
-
-    # cloud run
-    fs = get_fs()
-
-    df.to_parquet(
-        target_path,
-        index=False,
-        engine="pyarrow",
-        filesystem=fs,
-    )
+    # Through fsspec's own file handle, so every backend behaves the same
+    # (e.g. the local backend creates the partition directory)
+    with (fs or get_fs()).open(target_path, "wb") as f:
+        pq.write_table(table, f)
+        return f.tell()
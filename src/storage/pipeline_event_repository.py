@@ -1,14 +1,117 @@
+import atexit
+import threading
+import uuid
 from datetime import datetime, date
-from typing import Dict
+from typing import Dict, List, Optional
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from common.config import get_storage_base_path
+from common.config import (
+    get_event_buffer_size,
+    get_event_flush_interval,
+    get_storage_base_path,
+)
+from storage.backend import get_filesystem
+
+
+EVENT_SCHEMA = pa.schema([
+    ("pipeline_run_id", pa.string()),
+    ("pipeline_name", pa.string()),
+    ("event_type", pa.string()),
+    ("step", pa.string()),
+    ("asset", pa.string()),
+    ("asset_type", pa.string()),
+    ("reason", pa.string()),
+    ("execution_date", pa.date32()),
+    ("event_time", pa.timestamp("us")),
+])
+
+
+class PipelineEventSink:
+    """
+    Buffers pipeline events in memory and writes them as Parquet files
+    under ops_pipeline_events/date=<execution_date>/, one uniquely named
+    file per (flush, date), so nothing is ever overwritten.
+
+    Flushes when the buffer reaches max_buffer events, when
+    flush_interval seconds have passed since the first buffered event
+    (background timer), and on flush()/close() at the end of a run.
+    """
+
+    def __init__(
+        self,
+        max_buffer: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.max_buffer = max_buffer or get_event_buffer_size()
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else get_event_flush_interval()
+        )
+        self._buffer: List[Dict] = []
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+    def write(self, event: Dict) -> None:
+        record = {
+            **event,
+            "event_time": datetime.utcnow(),
+        }
+
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.max_buffer:
+                self.flush()
+            elif self._timer is None and self.flush_interval > 0:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            events, self._buffer = self._buffer, []
+            if not events:
+                return
+
+            by_date: Dict[date, List[Dict]] = {}
+            for event in events:
+                by_date.setdefault(event["execution_date"], []).append(event)
+
+            try:
+                for execution_date, records in by_date.items():
+                    _write_event_file(execution_date, records)
+            except Exception:
+                # Keep the events for the next flush
+                self._buffer = events + self._buffer
+                raise
+
+    def close(self) -> None:
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+
+_default_sink: Optional[PipelineEventSink] = None
+_default_lock = threading.Lock()
+
+
+def get_event_sink() -> PipelineEventSink:
+    global _default_sink
+    with _default_lock:
+        if _default_sink is None:
+            _default_sink = PipelineEventSink()
+        return _default_sink
 
 
 def write_pipeline_event(event: Dict) -> None:
     """
-    Persist a single pipeline event to the data lake (append-only).
+    Buffer a single pipeline event for the data lake (append-only).
 
     Expected event keys:
     - pipeline_run_id
@@ -19,30 +122,37 @@ def write_pipeline_event(event: Dict) -> None:
     - asset (optional)
     - asset_type (optional)
     - reason (optional)
+
+    Call flush_pipeline_events() at the end of a run.
     """
+    get_event_sink().write(event)
+
 
-    # Enrich event with system metadata
-    event_record = {
-        **event,
-        "event_time": datetime.utcnow(),
-    }
+def flush_pipeline_events() -> None:
+    """Write out every buffered event."""
+    if _default_sink is not None:
+        _default_sink.flush()
 
-    df = pd.DataFrame([event_record])
+
+atexit.register(flush_pipeline_events)
+
+
+def _write_event_file(execution_date: date, records: List[Dict]) -> str:
+    table = pa.Table.from_pylist(records, schema=EVENT_SCHEMA)
+
+    run_ids = {r.get("pipeline_run_id") for r in records}
+    run_tag = run_ids.pop() if len(run_ids) == 1 else "multi"
 
     base_path = get_storage_base_path()
 
     # Partition by execution_date (same pattern as fact tables)
-    execution_date: date = event["execution_date"]
-
     path = (
         f"{base_path}/ops_pipeline_events/"
-        f"date={execution_date}/events.parquet"
+        f"date={execution_date}/"
+        f"events-{run_tag}-{uuid.uuid4().hex[:12]}.parquet"
     )
 
-    # Append-safe write (idempotency not required for ops events)
-    df.to_parquet(
-        path,
-        engine="pyarrow",
-        compression="snappy",
-        index=False,
-    )
+    with get_filesystem().open(path, "wb") as f:
+        pq.write_table(table, f, compression="snappy")
+
+    return path
@@ -0,0 +1,165 @@
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from common.config import get_storage_base_path
+from common.errors import SystemError
+from storage.backend import get_filesystem
+
+
+TABLE = "ops_pipeline_runs"
+
+RUN_SCHEMA = pa.schema([
+    ("pipeline_run_id", pa.string()),
+    ("pipeline_name", pa.string()),
+    ("run_type", pa.string()),
+    ("execution_date", pa.date32()),
+    ("status", pa.string()),
+    ("start_time", pa.timestamp("us")),
+    ("end_time", pa.timestamp("us")),
+    ("duration_seconds", pa.float64()),
+    ("asset_count", pa.int64()),
+    ("quarantined_count", pa.int64()),
+    ("rows_written", pa.int64()),
+    ("bytes_written", pa.int64()),
+    ("peak_rss_bytes", pa.int64()),
+    ("stage_seconds", pa.map_(pa.string(), pa.float64())),
+])
+
+
+def write_pipeline_run(record: Dict) -> str:
+    """
+    Persist one finished run to ops_pipeline_runs/date=<execution_date>/,
+    one file per run id (re-recording a run replaces its file).
+    """
+    base_path = get_storage_base_path()
+    path = (
+        f"{base_path}/{TABLE}/"
+        f"date={record['execution_date']}/"
+        f"run-{record['pipeline_run_id']}.parquet"
+    )
+
+    row = dict(record)
+    row["stage_seconds"] = list((row.get("stage_seconds") or {}).items())
+    table = pa.Table.from_pylist([row], schema=RUN_SCHEMA)
+
+    try:
+        with get_filesystem().open(path, "wb") as f:
+            pq.write_table(table, f)
+    except Exception as err:
+        raise SystemError(
+            f"Failed to record pipeline run={record['pipeline_run_id']}: {err}"
+        )
+
+    return path
+
+
+def load_pipeline_runs(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    pipeline_name: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Runs with execution_date in [start_date, end_date]; only matching
+    date partitions are read.
+    """
+    fs = get_filesystem()
+    pattern = f"{get_storage_base_path()}/{TABLE}/date=*/*.parquet"
+
+    try:
+        paths = fs.glob(pattern)
+    except FileNotFoundError:
+        paths = []
+
+    tables = []
+    for path in sorted(paths):
+        partition = date.fromisoformat(path.rstrip("/").split("/")[-2].split("=", 1)[1])
+        if start_date and partition < start_date:
+            continue
+        if end_date and partition > end_date:
+            continue
+        with fs.open(path, "rb") as f:
+            tables.append(pq.read_table(f, schema=RUN_SCHEMA))
+
+    if not tables:
+        return RUN_SCHEMA.empty_table().to_pandas()
+
+    runs = pa.concat_tables(tables).to_pandas()
+    runs["stage_seconds"] = runs["stage_seconds"].map(dict)
+
+    if pipeline_name:
+        runs = runs[runs["pipeline_name"] == pipeline_name]
+
+    return runs.sort_values("start_time", kind="stable").reset_index(drop=True)
+
+
+def run_duration_stats(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    pipeline_name: Optional[str] = None,
+    freq: str = "D",
+    group_by: Sequence[str] = ("pipeline_name", "run_type"),
+    statuses: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Run duration trend: count, p50, p95 and max duration_seconds per
+    period (freq over start_time, e.g. 'D' or 'W') and group_by columns.
+    """
+    runs = _filter_status(
+        load_pipeline_runs(start_date, end_date, pipeline_name), statuses
+    )
+    if runs.empty:
+        return _empty_stats(["period", *group_by])
+
+    runs["period"] = runs["start_time"].dt.to_period(freq).dt.start_time
+
+    return _percentiles(runs, ["period", *group_by], "duration_seconds")
+
+
+def stage_duration_stats(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    pipeline_name: Optional[str] = None,
+    statuses: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """count, p50, p95 and max seconds per (pipeline_name, stage)."""
+    runs = _filter_status(
+        load_pipeline_runs(start_date, end_date, pipeline_name), statuses
+    )
+    stages = pd.DataFrame(
+        [
+            {"pipeline_name": run.pipeline_name, "stage": stage, "seconds": seconds}
+            for run in runs.itertuples()
+            for stage, seconds in run.stage_seconds.items()
+        ],
+        columns=["pipeline_name", "stage", "seconds"],
+    )
+    if stages.empty:
+        return _empty_stats(["pipeline_name", "stage"])
+
+    return _percentiles(stages, ["pipeline_name", "stage"], "seconds")
+
+
+def _filter_status(runs: pd.DataFrame, statuses: Optional[Sequence[str]]) -> pd.DataFrame:
+    if statuses:
+        runs = runs[runs["status"].isin(list(statuses))]
+    return runs.copy()
+
+
+def _percentiles(df: pd.DataFrame, keys: List[str], column: str) -> pd.DataFrame:
+    grouped = df.groupby(keys, sort=True)[column]
+    return pd.DataFrame({
+        "runs": grouped.count(),
+        "p50_seconds": grouped.quantile(0.50),
+        "p95_seconds": grouped.quantile(0.95),
+        "max_seconds": grouped.max(),
+    }).reset_index()
+
+
+def _empty_stats(keys: Sequence[str]) -> pd.DataFrame:
+    return pd.DataFrame(
+        columns=[*keys, "runs", "p50_seconds", "p95_seconds", "max_seconds"]
+    )
@@ -0,0 +1,270 @@
+import pandas as pd
+from datetime import date
+
+import pipeline.market_pipeline as market_pipeline
+from common.errors import PartitionWriteError, SourceError
+from ingestion.concurrent_extract import extract_assets_concurrently
+from pipeline.market_pipeline import run_market_pipeline
+from storage.backend import reset_filesystems
+from storage.last_bar_repository import load_last_bars
+from storage.run_registry_repository import load_pipeline_runs
+
+
+EXECUTION_DATE = date(2025, 2, 3)  # Monday
+
+
+def make_raw_df(close=105.0):
+    timestamps = pd.date_range(
+        start=pd.Timestamp(EXECUTION_DATE, tz="UTC"),
+        periods=24,
+        freq="h",
+    )
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "open": [100.0] * 24,
+        "high": [110.0] * 24,
+        "low": [90.0] * 24,
+        "close": [close] * 24,
+        "volume": [1000.0] * 24,
+    })
+
+
+def patch_pipeline_io(monkeypatch, tmp_path, raw_data):
+    written = {}
+    events = []
+    statuses = []
+
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    monkeypatch.setenv("STORAGE_BASE_PATH", "/lake")
+    reset_filesystems()
+    monkeypatch.setenv("LAST_BAR_STORE_PATH", str(tmp_path / "last_bar.sqlite"))
+    monkeypatch.setattr(market_pipeline, "load_active_assets", lambda: [
+        {"symbol": symbol, "type": "crypto"} for symbol in raw_data
+    ])
+    monkeypatch.setattr(
+        market_pipeline,
+        "extract_assets_concurrently",
+        lambda assets, **kwargs: {a["symbol"]: raw_data[a["symbol"]] for a in assets},
+    )
+    monkeypatch.setattr(
+        market_pipeline,
+        "write_fact_market_hourly",
+        lambda hourly_data, pipeline_run_id: written.update(hourly_data),
+    )
+    monkeypatch.setattr(market_pipeline, "write_pipeline_event", events.append)
+    monkeypatch.setattr(
+        market_pipeline,
+        "complete_pipeline_run",
+        lambda pipeline_run_id, status: statuses.append(status),
+    )
+
+    return written, events, statuses
+
+
+def test_pipeline_writes_all_assets(monkeypatch, tmp_path):
+    written, events, statuses = patch_pipeline_io(monkeypatch, tmp_path, {
+        "BTC-USD": make_raw_df(),
+        "ETH-USD": make_raw_df(),
+    })
+
+    run_market_pipeline(run_type="scheduled", execution_date=EXECUTION_DATE)
+
+    assert sorted(written) == ["BTC-USD", "ETH-USD"]
+    assert all(len(df) == 24 for df in written.values())
+    assert events == []
+    assert statuses == ["SUCCESS"]
+
+
+def test_pipeline_quarantines_only_bad_assets(monkeypatch, tmp_path):
+    written, events, statuses = patch_pipeline_io(monkeypatch, tmp_path, {
+        "BTC-USD": make_raw_df(),
+        "ETH-USD": make_raw_df(close=-1.0),
+        "SOL-USD": make_raw_df().iloc[5:],  # unfillable leading gap
+    })
+
+    run_market_pipeline(run_type="scheduled", execution_date=EXECUTION_DATE)
+
+    assert list(written) == ["BTC-USD"]
+    assert sorted((e["asset"], e["event_type"]) for e in events) == [
+        ("ETH-USD", "ASSET_QUARANTINED"),
+        ("SOL-USD", "ASSET_QUARANTINED"),
+    ]
+    assert statuses == ["PARTIAL_SUCCESS"]
+
+
+def test_pipeline_quarantines_failed_extracts_and_cleans(monkeypatch, tmp_path):
+    raw_data = {
+        "BTC-USD": make_raw_df(),
+        "ETH-USD": make_raw_df().drop(columns=["close"]),
+        "SOL-USD": None,  # source keeps failing
+    }
+    written, events, statuses = patch_pipeline_io(monkeypatch, tmp_path, raw_data)
+
+    def fake_extract(symbol, **kwargs):
+        if raw_data[symbol] is None:
+            raise SourceError(f"No data for {symbol}")
+        return raw_data[symbol]
+
+    monkeypatch.setattr(
+        market_pipeline,
+        "extract_assets_concurrently",
+        lambda **kwargs: extract_assets_concurrently(
+            **kwargs, extract_func=fake_extract, delay_seconds=0
+        ),
+    )
+
+    run_market_pipeline(run_type="scheduled", execution_date=EXECUTION_DATE)
+
+    assert list(written) == ["BTC-USD"]
+    assert sorted((e["asset"], e["step"], e["reason"]) for e in events) == [
+        ("ETH-USD", "VALIDATION", "clean"),
+        ("SOL-USD", "EXTRACT", "source_error"),
+    ]
+    assert statuses == ["PARTIAL_SUCCESS"]
+
+
+def test_pipeline_keeps_last_bars_of_written_assets_on_write_failure(
+    monkeypatch, tmp_path
+):
+    patch_pipeline_io(monkeypatch, tmp_path, {
+        "BTC-USD": make_raw_df(),
+        "ETH-USD": make_raw_df(),
+    })
+
+    def failing_write(hourly_data, pipeline_run_id):
+        raise PartitionWriteError(
+            "upload failed",
+            failures={("ETH-USD", str(EXECUTION_DATE)): OSError("timeout")},
+        )
+
+    monkeypatch.setattr(market_pipeline, "write_fact_market_hourly", failing_write)
+
+    run_market_pipeline(run_type="scheduled", execution_date=EXECUTION_DATE)
+
+    assert list(load_last_bars()) == ["BTC-USD"]
+
+
+def test_streaming_pipeline_quarantines_only_bad_assets(monkeypatch, tmp_path):
+    raw_data = {
+        "BTC-USD": make_raw_df(),
+        "ETH-USD": make_raw_df(close=-1.0),
+        "SOL-USD": None,  # source keeps failing
+        "XRP-USD": make_raw_df(),
+    }
+    written, events, statuses = patch_pipeline_io(monkeypatch, tmp_path, raw_data)
+
+    def fake_extract(symbol, **kwargs):
+        if raw_data[symbol] is None:
+            raise SourceError(f"No data for {symbol}")
+        return raw_data[symbol]
+
+    stream_extract = market_pipeline.stream_extract
+    monkeypatch.setattr(
+        market_pipeline,
+        "stream_extract",
+        lambda **kwargs: stream_extract(
+            **kwargs, extract_func=fake_extract, delay_seconds=0
+        ),
+    )
+
+    run_market_pipeline(
+        run_type="scheduled",
+        execution_date=EXECUTION_DATE,
+        execution_mode="streaming",
+    )
+
+    assert sorted(written) == ["BTC-USD", "XRP-USD"]
+    assert sorted((e["asset"], e["step"]) for e in events) == [
+        ("ETH-USD", "VALIDATION"),
+        ("SOL-USD", "EXTRACT"),
+    ]
+    assert statuses == ["PARTIAL_SUCCESS"]
+
+
+def test_staged_pipeline_quarantines_only_bad_assets(monkeypatch, tmp_path):
+    raw_data = {
+        "BTC-USD": make_raw_df(),
+        "ETH-USD": make_raw_df(close=-1.0),
+        "SOL-USD": make_raw_df().iloc[5:],  # unfillable leading gap
+        "XRP-USD": make_raw_df(),
+    }
+    written, events, statuses = patch_pipeline_io(monkeypatch, tmp_path, raw_data)
+    monkeypatch.setenv("CPU_MAX_WORKERS", "2")
+    monkeypatch.setattr(
+        market_pipeline,
+        "extract_market_data",
+        lambda symbol, **kwargs: raw_data[symbol],
+    )
+
+    run_market_pipeline(
+        run_type="scheduled",
+        execution_date=EXECUTION_DATE,
+        execution_mode="staged",
+    )
+
+    assert sorted(written) == ["BTC-USD", "XRP-USD"]
+    assert sorted((e["asset"], e["reason"]) for e in events) == [
+        ("ETH-USD", "non_positive_price,ohlc_ordering"),
+        ("SOL-USD", "normalize"),
+    ]
+    assert statuses == ["PARTIAL_SUCCESS"]
+
+
+def test_pipeline_exports_stage_metrics(monkeypatch, tmp_path):
+    patch_pipeline_io(monkeypatch, tmp_path, {"BTC-USD": make_raw_df()})
+    monkeypatch.setenv("METRICS_TEXTFILE_DIR", str(tmp_path / "metrics"))
+
+    run_market_pipeline(run_type="scheduled", execution_date=EXECUTION_DATE)
+
+    text = (tmp_path / "metrics" / "market_pipeline.prom").read_text()
+    for stage in ("extract", "clean", "normalize", "validate", "write"):
+        assert f'stage="{stage}"' in text
+    assert 'market_pipeline_stage_rows_in{pipeline="market_pipeline",stage="write"} 24' in text
+
+
+def test_pipeline_records_run_in_registry(monkeypatch, tmp_path):
+    patch_pipeline_io(monkeypatch, tmp_path, {
+        "BTC-USD": make_raw_df(),
+        "ETH-USD": make_raw_df(close=-1.0),
+    })
+
+    run_market_pipeline(run_type="scheduled", execution_date=EXECUTION_DATE)
+
+    runs = load_pipeline_runs(EXECUTION_DATE, EXECUTION_DATE)
+    assert len(runs) == 1
+    run = runs.iloc[0]
+    assert run["run_type"] == "scheduled"
+    assert run["asset_count"] == 2
+    assert run["quarantined_count"] == 1
+    assert run["duration_seconds"] >= 0
+    assert {"extract", "clean", "write"} <= set(run["stage_seconds"])
+
+
+def test_pipeline_finalizes_run_when_event_flush_fails(monkeypatch, tmp_path):
+    patch_pipeline_io(monkeypatch, tmp_path, {"BTC-USD": make_raw_df()})
+
+    def failing_flush():
+        raise OSError("events upload failed")
+
+    monkeypatch.setattr(market_pipeline, "flush_pipeline_events", failing_flush)
+
+    run_market_pipeline(run_type="scheduled", execution_date=EXECUTION_DATE)
+
+    assert len(load_pipeline_runs(EXECUTION_DATE, EXECUTION_DATE)) == 1
+
+
+def test_pipeline_fails_as_data_error_when_every_clean_fails(monkeypatch, tmp_path):
+    written, events, statuses = patch_pipeline_io(monkeypatch, tmp_path, {
+        "BTC-USD": make_raw_df().drop(columns=["close"]),
+    })
+    errors = []
+    monkeypatch.setattr(
+        market_pipeline, "log_error", lambda **kwargs: errors.append(kwargs)
+    )
+
+    run_market_pipeline(run_type="scheduled", execution_date=EXECUTION_DATE)
+
+    assert written == {}
+    assert statuses == ["FAILED"]
+    assert [e["error_type"] for e in errors] == ["DATA_ERROR", "DATA_ERROR"]
+    assert "All assets quarantined" in str(errors[-1]["error"])
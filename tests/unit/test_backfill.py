@@ -0,0 +1,279 @@
+import os
+import threading
+import pandas as pd
+from datetime import date, timedelta
+
+import backfill.historical_backfill as backfill
+from backfill.checkpoint import (
+    BackfillCheckpoint,
+    STATUS_EMPTY,
+    STATUS_FAILED,
+    STATUS_SUCCESS,
+)
+from backfill.historical_backfill import date_chunks, run_historical_backfill
+from common.errors import PartitionWriteError
+from storage.backend import reset_filesystems
+
+
+# Each extraction also covers the days that seed its first hours
+LOOKBACK = timedelta(days=backfill.SEED_LOOKBACK_DAYS)
+
+
+def make_raw_day(asset, execution_date):
+    timestamps = pd.date_range(
+        start=pd.Timestamp(execution_date, tz="UTC"),
+        periods=24,
+        freq="h",
+    )
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "open": [100.0] * 24,
+        "high": [110.0] * 24,
+        "low": [90.0] * 24,
+        "close": [105.0] * 24,
+        "volume": [1000.0] * 24,
+        "asset": asset,
+    })
+
+
+def test_date_chunks_cover_range_inclusive():
+    chunks = date_chunks(date(2025, 1, 1), date(2025, 1, 10), chunk_days=4)
+
+    assert chunks == [
+        (date(2025, 1, 1), date(2025, 1, 4)),
+        (date(2025, 1, 5), date(2025, 1, 8)),
+        (date(2025, 1, 9), date(2025, 1, 10)),
+    ]
+
+
+def patch_backfill_io(monkeypatch, tmp_path, existing=()):
+    extract_calls = []
+    written = []
+    lock = threading.Lock()
+
+    def fake_extract(assets, start_date, end_date, pipeline_run_id):
+        extract_calls.append((start_date, end_date))
+        return {
+            d: {a["symbol"]: make_raw_day(a["symbol"], d) for a in assets}
+            for d in backfill.daterange(start_date, end_date)
+        }
+
+    def fake_write(hourly_data, pipeline_run_id):
+        with lock:
+            for asset, df in hourly_data.items():
+                for day, rows in df.groupby(df["timestamp"].dt.date):
+                    written.append((asset, day, len(rows)))
+
+    monkeypatch.setattr(backfill, "load_active_assets", lambda: [
+        {"symbol": "BTC-USD", "type": "crypto"},
+        {"symbol": "ETH-USD", "type": "crypto"},
+    ])
+    monkeypatch.setattr(backfill, "extract_market_data_batch", fake_extract)
+    monkeypatch.setattr(backfill, "write_fact_market_hourly", fake_write)
+    monkeypatch.setattr(backfill, "list_existing_partitions", lambda: set(existing))
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    monkeypatch.setenv("STORAGE_BASE_PATH", "/lake")
+    reset_filesystems()
+    monkeypatch.setenv("LAST_BAR_STORE_PATH", str(tmp_path / "last_bar.sqlite"))
+
+    return extract_calls, written
+
+
+def test_range_backfill_writes_every_asset_date(monkeypatch, tmp_path):
+    extract_calls, written = patch_backfill_io(monkeypatch, tmp_path)
+
+    run_historical_backfill(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 5),
+        chunk_days=2,
+        max_concurrency=2,
+        checkpoint_path=str(tmp_path / "manifest.jsonl"),
+    )
+
+    assert sorted(extract_calls) == [
+        (start - LOOKBACK, end)
+        for start, end in date_chunks(
+            date(2025, 1, 1), date(2025, 1, 5), chunk_days=2
+        )
+    ]
+    assert len(written) == 10
+    assert all(rows == 24 for _, _, rows in written)
+    assert {d for _, d, _ in written} == set(
+        backfill.daterange(date(2025, 1, 1), date(2025, 1, 5))
+    )
+
+
+def test_range_backfill_resumes_from_checkpoint_and_lake(monkeypatch, tmp_path):
+    checkpoint_path = str(tmp_path / "manifest.jsonl")
+    checkpoint = BackfillCheckpoint(checkpoint_path)
+    for d in backfill.daterange(date(2025, 1, 1), date(2025, 1, 2)):
+        for asset in ("BTC-USD", "ETH-USD"):
+            checkpoint.record(asset, d, STATUS_SUCCESS, "old-run", row_count=24)
+
+    extract_calls, written = patch_backfill_io(
+        monkeypatch, tmp_path, existing={("BTC-USD", "2025-01-03")}
+    )
+
+    run_historical_backfill(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 4),
+        chunk_days=2,
+        max_concurrency=2,
+        checkpoint_path=checkpoint_path,
+    )
+
+    assert extract_calls == [(date(2025, 1, 3) - LOOKBACK, date(2025, 1, 4))]
+    assert sorted((asset, d) for asset, d, _ in written) == [
+        ("BTC-USD", date(2025, 1, 4)),
+        ("ETH-USD", date(2025, 1, 3)),
+        ("ETH-USD", date(2025, 1, 4)),
+    ]
+
+    records = checkpoint.load()
+    latest = records[("ETH-USD", date(2025, 1, 3))]
+    assert latest["status"] == STATUS_SUCCESS
+    assert latest["row_count"] == 24
+    assert latest["content_hash"]
+    assert len(checkpoint.completed_partitions()) == 7
+
+
+def test_range_backfill_processes_assets_in_batches(monkeypatch, tmp_path):
+    extract_calls, written = patch_backfill_io(monkeypatch, tmp_path)
+
+    run_historical_backfill(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 2),
+        chunk_days=2,
+        asset_batch_size=1,
+        checkpoint_path=str(tmp_path / "manifest.jsonl"),
+    )
+
+    # one extraction per asset batch, each over the whole chunk
+    assert extract_calls == [(date(2025, 1, 1) - LOOKBACK, date(2025, 1, 2))] * 2
+    assert len(written) == 4
+
+
+def test_range_backfill_checkpoints_partial_write_failures(monkeypatch, tmp_path):
+    patch_backfill_io(monkeypatch, tmp_path)
+
+    def failing_write(hourly_data, pipeline_run_id):
+        raise PartitionWriteError(
+            "upload failed",
+            failures={("ETH-USD", "2025-01-02"): OSError("timeout")},
+        )
+
+    monkeypatch.setattr(backfill, "write_fact_market_hourly", failing_write)
+    checkpoint_path = str(tmp_path / "manifest.jsonl")
+
+    run_historical_backfill(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 2),
+        checkpoint_path=checkpoint_path,
+    )
+
+    records = BackfillCheckpoint(checkpoint_path).load()
+    assert records[("ETH-USD", date(2025, 1, 2))]["status"] == STATUS_FAILED
+    assert {
+        key for key, record in records.items() if record["status"] == STATUS_SUCCESS
+    } == {
+        ("BTC-USD", date(2025, 1, 1)),
+        ("BTC-USD", date(2025, 1, 2)),
+        ("ETH-USD", date(2025, 1, 1)),
+    }
+
+
+def test_checkpoint_only_treats_success_as_final(tmp_path):
+    checkpoint = BackfillCheckpoint(str(tmp_path / "manifest.jsonl"))
+    checkpoint.record("BTC-USD", date(2025, 1, 1), STATUS_SUCCESS, "run-1")
+    checkpoint.record("AAPL", date(2025, 1, 1), STATUS_EMPTY, "run-1")
+    checkpoint.record("ETH-USD", date(2025, 1, 1), STATUS_FAILED, "run-1")
+
+    assert checkpoint.completed_partitions() == {("BTC-USD", date(2025, 1, 1))}
+
+
+def test_checkpoint_batches_fsync(monkeypatch, tmp_path):
+    synced = []
+    monkeypatch.setattr(os, "fsync", synced.append)
+    checkpoint = BackfillCheckpoint(str(tmp_path / "manifest.jsonl"), sync_every=3)
+
+    for day in range(1, 8):
+        checkpoint.record("BTC-USD", date(2025, 1, day), STATUS_SUCCESS, "run-1")
+    assert len(synced) == 2
+
+    checkpoint.sync()
+    checkpoint.sync()
+    assert len(synced) == 3
+    assert len(checkpoint.load()) == 7
+
+
+def patch_stock_extract(monkeypatch, listed=date.min):
+    """BTC-USD trades around the clock, AAPL 14:00-20:00 UTC on weekdays."""
+    monkeypatch.setattr(backfill, "load_active_assets", lambda: [
+        {"symbol": "BTC-USD", "type": "crypto"},
+        {"symbol": "AAPL", "type": "stock"},
+    ])
+
+    def fake_extract(assets, start_date, end_date, pipeline_run_id):
+        raw = {}
+        for d in backfill.daterange(start_date, end_date):
+            raw[d] = {"BTC-USD": make_raw_day("BTC-USD", d)}
+            if d.weekday() < 5 and d >= listed:
+                raw[d]["AAPL"] = make_raw_day("AAPL", d).iloc[14:21]
+        return raw
+
+    monkeypatch.setattr(backfill, "extract_market_data_batch", fake_extract)
+
+
+def load_statuses(checkpoint_path):
+    return {
+        key: record["status"]
+        for key, record in BackfillCheckpoint(checkpoint_path).load().items()
+    }
+
+
+def test_range_backfill_gives_each_asset_its_own_grid(monkeypatch, tmp_path):
+    patch_backfill_io(monkeypatch, tmp_path)
+    # AAPL lists on Monday: no earlier bar, nothing stored
+    patch_stock_extract(monkeypatch, listed=date(2025, 1, 6))
+    checkpoint_path = str(tmp_path / "manifest.jsonl")
+
+    # Starts on a Saturday
+    run_historical_backfill(
+        start_date=date(2025, 1, 4),
+        end_date=date(2025, 1, 7),
+        checkpoint_path=checkpoint_path,
+    )
+
+    status = load_statuses(checkpoint_path)
+    assert all(
+        status[("BTC-USD", d)] == STATUS_SUCCESS
+        for d in backfill.daterange(date(2025, 1, 4), date(2025, 1, 7))
+    )
+    # Only the day whose early hours have nothing to fill from fails
+    assert status[("AAPL", date(2025, 1, 6))] == STATUS_FAILED
+    assert status[("AAPL", date(2025, 1, 7))] == STATUS_SUCCESS
+
+
+def test_range_backfill_seeds_each_chunk_from_lookback(monkeypatch, tmp_path):
+    patch_backfill_io(monkeypatch, tmp_path)
+    patch_stock_extract(monkeypatch)
+    checkpoint_path = str(tmp_path / "manifest.jsonl")
+
+    # Chunks run concurrently with no last bar stored: every chunk's
+    # first stock day is seeded from the bars before it
+    run_historical_backfill(
+        start_date=date(2025, 1, 6),
+        end_date=date(2025, 1, 17),
+        chunk_days=2,
+        max_concurrency=3,
+        checkpoint_path=checkpoint_path,
+    )
+
+    status = load_statuses(checkpoint_path)
+    assert {
+        key: value for key, value in status.items() if key[0] == "AAPL"
+    } == {
+        ("AAPL", d): STATUS_SUCCESS
+        for d in backfill.daterange(date(2025, 1, 6), date(2025, 1, 17))
+        if d.weekday() < 5
+    }
@@ -0,0 +1,72 @@
+from datetime import date, datetime
+
+import duckdb
+import pytest
+
+from build_dimensions import build_dim_asset, build_dim_datetime
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    yield con
+    con.close()
+
+
+def asset_keys(con):
+    return {
+        symbol: (key, active)
+        for key, symbol, active in con.execute(
+            "SELECT asset_key, asset_symbol, is_active FROM dim_asset"
+        ).fetchall()
+    }
+
+
+def test_dim_asset_defaults_to_the_shared_registry(con):
+    build_dim_asset(con)
+
+    keys = asset_keys(con)
+    assert keys["BTC-USD"] == (1, True)
+    assert "AAPL" in keys and "NVDA" in keys
+
+
+def test_dim_asset_keys_are_stable_across_rebuilds(con):
+    build_dim_asset(con, [
+        {"symbol": "BTC-USD", "type": "crypto"},
+        {"symbol": "ETH-USD", "type": "crypto"},
+    ])
+    build_dim_asset(con, [
+        {"symbol": "AAPL", "type": "stock"},
+        {"symbol": "ETH-USD", "type": "crypto"},
+        {"symbol": "MSFT", "type": "stock", "active": False},
+    ])
+
+    assert asset_keys(con) == {
+        "BTC-USD": (1, False),
+        "ETH-USD": (2, True),
+        "AAPL": (3, True),
+        "MSFT": (4, False),
+    }
+
+
+def test_dim_datetime_extends_incrementally(con):
+    assert build_dim_datetime(con, until=date(2025, 1, 1)) == 24
+    assert build_dim_datetime(con, until=date(2025, 1, 1)) == 0
+    assert build_dim_datetime(con, until=datetime(2025, 1, 2, 5)) == 6
+
+    first, last, count = con.execute(
+        "SELECT min(datetime_key), max(datetime_key), count(*) FROM dim_datetime"
+    ).fetchone()
+    assert (first, last, count) == (2025010100, 2025010205, 30)
+
+
+def test_dim_datetime_covers_latest_lake_partition(con, tmp_path):
+    (tmp_path / "fact_market_hourly" / "asset=BTC-USD" / "date=2099-01-01").mkdir(
+        parents=True
+    )
+
+    build_dim_datetime(con, lake_root=str(tmp_path))
+
+    assert con.execute(
+        "SELECT max(datetime_key) FROM dim_datetime"
+    ).fetchone()[0] == 2099010123
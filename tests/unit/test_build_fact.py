@@ -0,0 +1,174 @@
+import os
+from datetime import date
+
+import duckdb
+import pandas as pd
+import pytest
+
+from build_dimensions import build_dim_asset, build_dim_datetime
+from build_fact import MANIFEST_TABLE, build_fact
+from storage.backend import reset_filesystems
+from storage.compaction import compact_fact_partitions
+
+
+def write_partition(root, asset, day, close=105.0):
+    timestamps = pd.date_range(start=pd.Timestamp(day, tz="UTC"), periods=24, freq="h")
+    directory = root / "fact_market_hourly" / f"asset={asset}" / f"date={day}"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "data.parquet"
+
+    pd.DataFrame({
+        "asset": asset,
+        "hour_key": timestamps.strftime("%Y%m%d%H").astype("int64"),
+        "timestamp": timestamps,
+        "open_price": 100.0,
+        "high_price": 110.0,
+        "low_price": 90.0,
+        "close_price": close,
+        "volume": 1000.0,
+        "data_gap_flag": False,
+    }).to_parquet(path)
+    return path
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    build_dim_datetime(con)
+    build_dim_asset(con)
+    yield con
+    con.close()
+
+
+def fact_closes(con):
+    return dict(con.execute("""
+        SELECT a.asset_symbol || ' ' || CAST(f.datetime_key // 100 AS VARCHAR),
+               max(f.close_price)
+        FROM fact_market_hourly f JOIN dim_asset a USING (asset_key)
+        GROUP BY 1
+    """).fetchall())
+
+
+def test_incremental_build_reloads_only_changed_partitions(con, tmp_path):
+    lake_root = str(tmp_path)
+    write_partition(tmp_path, "BTC-USD", "2025-01-01")
+    write_partition(tmp_path, "ETH-USD", "2025-01-01")
+
+    # First build creates the table: everything is new
+    assert build_fact(con, lake_root) is None
+    assert len(build_fact(con, lake_root)) == 0
+
+    changed = write_partition(tmp_path, "BTC-USD", "2025-01-01", close=200.0)
+    os.utime(changed, (1, 1))
+    write_partition(tmp_path, "BTC-USD", "2025-01-02")
+
+    assert len(build_fact(con, lake_root)) == 2
+    assert fact_closes(con) == {
+        "BTC-USD 20250101": 200.0,
+        "BTC-USD 20250102": 105.0,
+        "ETH-USD 20250101": 105.0,
+    }
+    assert con.execute("SELECT count(*) FROM fact_market_hourly").fetchone()[0] == 72
+
+
+def test_incremental_build_drops_removed_partitions(con, tmp_path):
+    lake_root = str(tmp_path)
+    write_partition(tmp_path, "BTC-USD", "2025-01-01")
+    removed = write_partition(tmp_path, "BTC-USD", "2025-01-02")
+    build_fact(con, lake_root)
+
+    removed.unlink()
+
+    assert len(build_fact(con, lake_root)) == 1
+    assert list(fact_closes(con)) == ["BTC-USD 20250101"]
+    assert con.execute(f"SELECT count(*) FROM {MANIFEST_TABLE}").fetchone()[0] == 1
+
+
+def test_partitions_of_assets_missing_from_dim_asset_load_once_added(tmp_path):
+    lake_root = str(tmp_path)
+    con = duckdb.connect()
+    build_dim_asset(con, registry=[{"symbol": "BTC-USD", "type": "crypto"}])
+    for day in ("2025-01-01", "2025-01-02"):
+        write_partition(tmp_path, "BTC-USD", day)
+        write_partition(tmp_path, "ETH-USD", day)
+
+    build_fact(con, lake_root)
+    assert con.execute(
+        f"SELECT DISTINCT asset FROM {MANIFEST_TABLE}"
+    ).fetchall() == [("BTC-USD",)]
+
+    build_dim_asset(con, registry=[
+        {"symbol": "BTC-USD", "type": "crypto"},
+        {"symbol": "ETH-USD", "type": "crypto"},
+    ])
+
+    assert build_fact(con, lake_root) == {
+        ("ETH-USD", "2025-01-01"),
+        ("ETH-USD", "2025-01-02"),
+    }
+    assert con.execute("SELECT count(*) FROM fact_market_hourly").fetchone()[0] == 96
+    con.close()
+
+
+def test_full_build_matches_incremental(con, tmp_path):
+    lake_root = str(tmp_path)
+    write_partition(tmp_path, "BTC-USD", "2025-01-01")
+    build_fact(con, lake_root)
+    write_partition(tmp_path, "SOL-USD", "2025-01-03")
+    build_fact(con, lake_root)
+    incremental = fact_closes(con)
+
+    assert build_fact(con, lake_root, full=True) is None
+    assert fact_closes(con) == incremental
+
+
+def test_scoped_full_build_only_touches_partitions_in_scope(con, tmp_path):
+    lake_root = str(tmp_path)
+    write_partition(tmp_path, "BTC-USD", "2025-01-01")
+    write_partition(tmp_path, "BTC-USD", "2025-01-02")
+    write_partition(tmp_path, "ETH-USD", "2025-01-02")
+    build_fact(con, lake_root)
+
+    # Out-of-scope change is not picked up by a scoped run
+    os.utime(write_partition(tmp_path, "BTC-USD", "2025-01-01", close=1.0), (1, 1))
+    reloaded = len(build_fact(
+        con, lake_root, full=True,
+        start_date="2025-01-02", end_date="2025-01-02", assets=["BTC-USD"],
+    ))
+
+    assert reloaded == 1
+    assert fact_closes(con)["BTC-USD 20250101"] == 105.0
+    assert con.execute("SELECT count(*) FROM fact_market_hourly").fetchone()[0] == 72
+
+    assert len(build_fact(con, lake_root)) == 1
+    assert fact_closes(con)["BTC-USD 20250101"] == 1.0
+
+
+def test_build_extends_dim_datetime_to_latest_partition(tmp_path):
+    con = duckdb.connect()
+    build_dim_datetime(con, until=pd.Timestamp("2025-01-01").date())
+    build_dim_asset(con)
+    write_partition(tmp_path, "BTC-USD", "2025-01-02")
+
+    build_fact(con, str(tmp_path))
+    assert con.execute("SELECT count(*) FROM fact_market_hourly").fetchone()[0] == 24
+
+
+def test_incremental_build_after_compaction_keeps_one_row_per_hour(
+    con, tmp_path, monkeypatch
+):
+    lake_root = str(tmp_path)
+    for day in ("2025-01-01", "2025-01-02"):
+        write_partition(tmp_path, "BTC-USD", day)
+    write_partition(tmp_path, "BTC-USD", "2025-02-01")
+    build_fact(con, lake_root)
+
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_BASE_PATH", lake_root)
+    reset_filesystems()
+    compact_fact_partitions(before=date(2025, 2, 10))
+
+    assert len(build_fact(con, lake_root)) == 2
+    assert con.execute("SELECT count(*) FROM fact_market_hourly").fetchone()[0] == 72
+    assert len(build_fact(con, lake_root)) == 0
+    assert len(fact_closes(con)) == 3
@@ -0,0 +1,130 @@
+import os
+
+import duckdb
+import pandas as pd
+import pytest
+
+from build_dimensions import build_dim_asset, build_dim_datetime
+from build_fact import build_fact
+from build_rollups import build_rollups
+
+
+def write_partition(root, asset, day, close=105.0, volume=1000.0, gap_hours=0):
+    timestamps = pd.date_range(start=pd.Timestamp(day, tz="UTC"), periods=24, freq="h")
+    directory = root / "fact_market_hourly" / f"asset={asset}" / f"date={day}"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "data.parquet"
+
+    pd.DataFrame({
+        "asset": asset,
+        "hour_key": timestamps.strftime("%Y%m%d%H").astype("int64"),
+        "timestamp": timestamps,
+        "open_price": [100.0 + i for i in range(24)],
+        "high_price": 130.0,
+        "low_price": 90.0,
+        "close_price": close,
+        "volume": volume,
+        "data_gap_flag": [i < gap_hours for i in range(24)],
+    }).to_parquet(path)
+    os.utime(path, (os.stat(path).st_mtime + 1,) * 2)
+    return path
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    build_dim_datetime(con, until=pd.Timestamp("2025-01-31").date())
+    build_dim_asset(con)
+    yield con
+    con.close()
+
+
+def rollup(con, table, key):
+    columns = "open_price, high_price, low_price, close_price, volume, vwap, gap_hours, hours"
+    return {
+        row[0]: row[1:]
+        for row in con.execute(f"""
+            SELECT a.asset_symbol || ' ' || CAST(t.{key} AS VARCHAR), {columns}
+            FROM {table} t JOIN dim_asset a USING (asset_key)
+        """).fetchall()
+    }
+
+
+def test_daily_rollup_aggregates_ohlcv_vwap_and_gaps(con, tmp_path):
+    write_partition(tmp_path, "BTC-USD", "2025-01-06", close=120.0, gap_hours=3)
+    build_rollups(con, build_fact(con, str(tmp_path)))
+
+    daily = rollup(con, "agg_market_daily", "trade_date")
+
+    assert daily == {
+        "BTC-USD 2025-01-06": (
+            100.0, 130.0, 90.0, 120.0, 24000.0,
+            pytest.approx((130.0 + 90.0 + 120.0) / 3), 3, 24,
+        ),
+    }
+
+
+def test_weekly_rollup_weights_vwap_by_volume(con, tmp_path):
+    write_partition(tmp_path, "BTC-USD", "2025-01-06", close=120.0, volume=1.0)
+    write_partition(tmp_path, "BTC-USD", "2025-01-07", close=150.0, volume=3.0)
+    write_partition(tmp_path, "BTC-USD", "2025-01-13", close=99.0)
+    build_rollups(con, build_fact(con, str(tmp_path)))
+
+    weekly = rollup(con, "agg_market_weekly", "week_start")
+
+    first_week = weekly["BTC-USD 2025-01-06"]
+    assert first_week[:5] == (100.0, 130.0, 90.0, 150.0, 96.0)
+    assert first_week[5] == pytest.approx((340 / 3 * 24 + 370 / 3 * 72) / 96)
+    assert first_week[7] == 48
+    assert "BTC-USD 2025-01-13" in weekly
+
+
+def test_incremental_rollup_matches_full_rebuild(con, tmp_path):
+    lake_root = str(tmp_path)
+    for day in ("2025-01-06", "2025-01-07", "2025-01-08"):
+        write_partition(tmp_path, "BTC-USD", day)
+        write_partition(tmp_path, "ETH-USD", day)
+    build_rollups(con, build_fact(con, lake_root))
+
+    write_partition(tmp_path, "BTC-USD", "2025-01-07", close=1.0, gap_hours=5)
+    (tmp_path / "fact_market_hourly" / "asset=ETH-USD" / "date=2025-01-08" / "data.parquet").unlink()
+    write_partition(tmp_path, "SOL-USD", "2025-01-14")
+
+    partitions = build_fact(con, lake_root)
+    assert len(partitions) == 3
+    assert build_rollups(con, partitions) == 2
+
+    incremental = (
+        rollup(con, "agg_market_daily", "trade_date"),
+        rollup(con, "agg_market_weekly", "week_start"),
+    )
+    build_rollups(con)
+    rebuilt = (
+        rollup(con, "agg_market_daily", "trade_date"),
+        rollup(con, "agg_market_weekly", "week_start"),
+    )
+
+    assert incremental == rebuilt
+    assert "ETH-USD 2025-01-08" not in incremental[0]
+    assert incremental[0]["BTC-USD 2025-01-07"][3] == 1.0
+    assert incremental[0]["BTC-USD 2025-01-07"][6] == 5
+
+
+def test_full_fact_rebuild_drops_rollups_of_removed_partitions(con, tmp_path):
+    lake_root = str(tmp_path)
+    for day in ("2025-01-06", "2025-01-07"):
+        write_partition(tmp_path, "BTC-USD", day)
+        write_partition(tmp_path, "ETH-USD", day)
+    build_rollups(con, build_fact(con, lake_root))
+
+    for path in (tmp_path / "fact_market_hourly" / "asset=ETH-USD").rglob("*.parquet"):
+        path.unlink()
+    build_rollups(con, build_fact(con, lake_root, full=True))
+
+    assert set(rollup(con, "agg_market_daily", "trade_date")) == {
+        "BTC-USD 2025-01-06",
+        "BTC-USD 2025-01-07",
+    }
+    assert set(rollup(con, "agg_market_weekly", "week_start")) == {
+        "BTC-USD 2025-01-06",
+    }
@@ -0,0 +1,80 @@
+import logging
+
+import pandas as pd
+import pytest
+
+from processing.clean import clean_market_data
+from common.errors import DataValidationError
+
+
+def make_raw_df():
+    return pd.DataFrame({
+        "Timestamp": pd.to_datetime([
+            "2025-02-01 02:00",
+            "2025-02-01 00:00",
+            "2025-02-01 01:00",
+            "2025-02-01 00:00",
+        ]),
+        "Open": [3.0, 1.0, 2.0, 1.5],
+        "High": [3.5, 1.5, 2.5, 1.5],
+        "Low": [2.5, 0.5, 1.5, 1.0],
+        "Close": [3.2, 1.2, 2.2, 1.3],
+        "Adj Close": [3.2, 1.2, 2.2, 1.3],
+        "Volume": [30, 10, 20, 15],
+        "asset": "BTC-USD",
+        "pipeline_run_id": "run-1",
+    })
+
+
+def test_clean_market_data_standardizes_and_sorts():
+    raw = make_raw_df()
+    before = raw.copy()
+
+    df = clean_market_data({"BTC-USD": raw})["BTC-USD"]
+
+    assert list(df.columns) == [
+        "timestamp", "open_price", "high_price", "low_price",
+        "close_price", "volume", "asset", "pipeline_run_id",
+    ]
+    assert str(df["timestamp"].dtype) == "datetime64[ns, UTC]"
+    assert (df.dtypes[["open_price", "volume"]] == "float64").all()
+    assert df["timestamp"].is_monotonic_increasing
+    assert list(df.index) == [0, 1, 2]
+    # first row wins for a duplicated timestamp
+    assert df["open_price"].tolist() == [1.0, 2.0, 3.0]
+    # the raw frame is left untouched
+    pd.testing.assert_frame_equal(raw, before)
+
+
+def test_clean_market_data_price_dtype():
+    df = clean_market_data(
+        {"BTC-USD": make_raw_df()},
+        price_dtype="float32",
+    )["BTC-USD"]
+
+    assert (df.dtypes[["open_price", "close_price"]] == "float32").all()
+    assert df["volume"].dtype == "float64"
+
+
+def test_clean_market_data_bad_values():
+    raw = make_raw_df()
+    raw["Close"] = ["a", "b", "c", "d"]
+
+    with pytest.raises(DataValidationError):
+        clean_market_data({"BTC-USD": raw})
+
+
+def test_clean_market_data_missing_column():
+    with pytest.raises(DataValidationError):
+        clean_market_data({"BTC-USD": make_raw_df().drop(columns="Volume")})
+
+
+def test_clean_market_data_profile(caplog):
+    with caplog.at_level(logging.INFO):
+        clean_market_data({"BTC-USD": make_raw_df()}, profile=True)
+
+    stages = [
+        r.msg["stage"] for r in caplog.records
+        if isinstance(r.msg, dict) and r.msg.get("event") == "STAGE_PROFILE"
+    ]
+    assert stages == ["project", "cast", "dedupe", "sort"]
@@ -0,0 +1,173 @@
+from datetime import date
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import storage.compaction as compaction
+from common.errors import PartitionWriteError, SystemError
+from storage.backend import get_filesystem, reset_filesystems
+from storage.compaction import compact_fact_partitions, load_manifest
+from storage.market_repository import list_existing_partitions, write_fact_market_hourly
+
+TABLE_DIR = "/lake/fact_market_hourly"
+
+
+def make_hourly_df(asset, start, days, close=105.0):
+    timestamps = pd.date_range(
+        start=pd.Timestamp(start, tz="UTC"), periods=24 * days, freq="h"
+    )
+    return pd.DataFrame({
+        "asset": asset,
+        "hour_key": timestamps.strftime("%Y%m%d%H").astype("int64"),
+        "timestamp": timestamps,
+        "close_price": close,
+        "volume": 1000.0,
+        "data_gap_flag": False,
+    })
+
+
+@pytest.fixture
+def memory_fs(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    monkeypatch.setenv("STORAGE_BASE_PATH", "/lake")
+    reset_filesystems()
+    yield get_filesystem()
+    reset_filesystems()
+
+
+def read_compacted(fs, entry):
+    with fs.open(f"{TABLE_DIR}/{entry['path']}", "rb") as f:
+        return pq.read_table(f)
+
+
+def test_compaction_rewrites_closed_months_into_monthly_files(memory_fs):
+    write_fact_market_hourly({
+        "BTC-USD": make_hourly_df("BTC-USD", "2025-01-30", days=3),
+        "ETH-USD": make_hourly_df("ETH-USD", "2025-01-31", days=1),
+    }, "run-1")
+    before = list_existing_partitions()
+
+    stats = compact_fact_partitions(before=date(2025, 2, 10))
+
+    assert stats == {
+        "months": 2, "files_in": 3, "files_out": 2, "rows": 72, "files_removed": 0,
+    }
+    manifest = load_manifest(TABLE_DIR)
+    assert manifest["version"] == 1
+    assert [(e["asset"], e["month"], e["dates"]) for e in manifest["files"]] == [
+        ("BTC-USD", "2025-01", ["2025-01-30", "2025-01-31"]),
+        ("ETH-USD", "2025-01", ["2025-01-31"]),
+    ]
+
+    table = read_compacted(memory_fs, manifest["files"][0])
+    assert table.num_rows == 48
+    assert table["timestamp"].to_pandas().is_monotonic_increasing
+    assert pq.ParquetFile(
+        memory_fs.open(f"{TABLE_DIR}/{manifest['files'][0]['path']}", "rb")
+    ).metadata.row_group(0).column(0).statistics is not None
+
+    # January daily files are retired, not deleted: readers holding the
+    # previous manifest may still open them
+    assert len(manifest["retired"]) == 3
+    assert len(memory_fs.glob(f"{TABLE_DIR}/asset=*/date=*/data.parquet")) == 4
+    assert list_existing_partitions() == before
+
+    # ... and are neither compacted again nor deleted before retention ends
+    assert compact_fact_partitions(before=date(2025, 2, 10))["months"] == 0
+    assert load_manifest(TABLE_DIR)["version"] == 1
+
+    stats = compact_fact_partitions(before=date(2025, 2, 10), retention_minutes=0)
+
+    # February is still open; January daily files are gone
+    assert stats["files_removed"] == 3
+    assert stats["months"] == 0
+    assert memory_fs.glob(f"{TABLE_DIR}/asset=*/date=*/data.parquet") == [
+        f"{TABLE_DIR}/asset=BTC-USD/date=2025-02-01/data.parquet"
+    ]
+    assert load_manifest(TABLE_DIR)["retired"] == []
+    assert list_existing_partitions() == before
+
+
+def test_late_daily_file_replaces_its_day_on_next_compaction(memory_fs):
+    write_fact_market_hourly(
+        {"BTC-USD": make_hourly_df("BTC-USD", "2025-01-01", days=3)}, "run-1"
+    )
+    compact_fact_partitions(before=date(2025, 3, 1))
+    first = load_manifest(TABLE_DIR)["files"][0]
+
+    write_fact_market_hourly(
+        {"BTC-USD": make_hourly_df("BTC-USD", "2025-01-02", days=1, close=1.0)},
+        "run-2",
+    )
+    stats = compact_fact_partitions(before=date(2025, 3, 1))
+
+    entry = load_manifest(TABLE_DIR)["files"][0]
+    table = read_compacted(memory_fs, entry).to_pandas()
+    assert stats["files_in"] == 1
+    assert len(table) == 72
+    assert set(table.loc[table["hour_key"] // 100 == 20250102, "close_price"]) == {1.0}
+    # The replaced monthly file outlives the swap until its retention ends
+    assert memory_fs.exists(f"{TABLE_DIR}/{first['path']}")
+
+    compact_fact_partitions(before=date(2025, 3, 1), retention_minutes=0)
+
+    assert not memory_fs.exists(f"{TABLE_DIR}/{first['path']}")
+    assert memory_fs.exists(f"{TABLE_DIR}/{entry['path']}")
+    assert memory_fs.glob(f"{TABLE_DIR}/asset=*/date=*/data.parquet") == []
+
+
+def test_compaction_refuses_to_overwrite_a_newer_manifest(memory_fs, monkeypatch):
+    write_fact_market_hourly(
+        {"BTC-USD": make_hourly_df("BTC-USD", "2025-01-01", days=1)}, "run-1"
+    )
+    manifests = iter([
+        {"version": 0, "files": [], "retired": []},
+        {"version": 1, "files": [], "retired": []},
+    ])
+    monkeypatch.setattr(compaction, "load_manifest", lambda *args: next(manifests))
+
+    with pytest.raises(SystemError):
+        compact_fact_partitions(before=date(2025, 3, 1))
+
+    # Daily file kept, new monthly file cleaned up, lock released
+    assert memory_fs.exists(f"{TABLE_DIR}/asset=BTC-USD/date=2025-01-01/data.parquet")
+    assert memory_fs.glob(f"{TABLE_DIR}/asset=*/month=*/*.parquet") == []
+    assert not memory_fs.exists(f"{TABLE_DIR}/{compaction.LOCK_FILE}")
+
+
+def test_compaction_does_not_swap_while_another_holds_the_lock(memory_fs):
+    write_fact_market_hourly(
+        {"BTC-USD": make_hourly_df("BTC-USD", "2025-01-01", days=1)}, "run-1"
+    )
+    memory_fs.pipe(f"{TABLE_DIR}/{compaction.LOCK_FILE}", b"{}")
+
+    with pytest.raises(SystemError, match="locked"):
+        compact_fact_partitions(before=date(2025, 3, 1))
+
+    assert load_manifest(TABLE_DIR)["version"] == 0
+    assert memory_fs.glob(f"{TABLE_DIR}/asset=*/month=*/*.parquet") == []
+    # The other compaction's lock is left alone
+    assert memory_fs.exists(f"{TABLE_DIR}/{compaction.LOCK_FILE}")
+
+
+def test_compaction_swaps_in_months_that_succeeded(memory_fs, monkeypatch):
+    write_fact_market_hourly({
+        "BTC-USD": make_hourly_df("BTC-USD", "2025-01-01", days=1),
+        "ETH-USD": make_hourly_df("ETH-USD", "2025-01-01", days=1),
+    }, "run-1")
+    compact_month = compaction._compact_month
+
+    def flaky(fs, table_dir, asset, *args):
+        if asset == "ETH-USD":
+            raise OSError("upload failed")
+        return compact_month(fs, table_dir, asset, *args)
+
+    monkeypatch.setattr(compaction, "_compact_month", flaky)
+
+    with pytest.raises(PartitionWriteError) as excinfo:
+        compact_fact_partitions(before=date(2025, 3, 1))
+
+    assert list(excinfo.value.failures) == [("ETH-USD", "2025-01")]
+    assert [e["asset"] for e in load_manifest(TABLE_DIR)["files"]] == ["BTC-USD"]
+    assert memory_fs.exists(f"{TABLE_DIR}/asset=ETH-USD/date=2025-01-01/data.parquet")
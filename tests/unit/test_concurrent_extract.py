@@ -0,0 +1,144 @@
+import threading
+import time
+import pandas as pd
+import pytest
+from datetime import date
+
+from ingestion.concurrent_extract import extract_assets_concurrently
+from common.errors import SourceError
+from common.retry import RetryBudget
+
+
+ASSETS = [
+    {"symbol": "BTC-USD", "type": "crypto"},
+    {"symbol": "ETH-USD", "type": "crypto"},
+    {"symbol": "SOL-USD", "type": "crypto"},
+    {"symbol": "AAPL", "type": "stock"},
+]
+
+
+def make_fake_extract(fail_times=None, delays=None):
+    fail_times = dict(fail_times or {})
+    delays = delays or {}
+    calls = []
+    lock = threading.Lock()
+
+    def fake_extract(symbol, asset_type, execution_date, pipeline_run_id):
+        with lock:
+            calls.append(symbol)
+            remaining = fail_times.get(symbol, 0)
+            if remaining:
+                fail_times[symbol] = remaining - 1
+        time.sleep(delays.get(symbol, 0))
+        if remaining:
+            raise SourceError(f"boom {symbol}")
+        return pd.DataFrame({"asset": [symbol]})
+
+    return fake_extract, calls
+
+
+def test_extract_concurrently_preserves_asset_order():
+    fake_extract, _ = make_fake_extract(delays={"BTC-USD": 0.05})
+
+    result = extract_assets_concurrently(
+        assets=ASSETS,
+        execution_date=date(2025, 2, 1),
+        pipeline_run_id="run-1",
+        max_workers=4,
+        extract_func=fake_extract,
+    )
+
+    assert list(result) == [a["symbol"] for a in ASSETS]
+    assert result["BTC-USD"]["asset"].iloc[0] == "BTC-USD"
+
+
+def test_extract_concurrently_retries_failed_asset():
+    fake_extract, calls = make_fake_extract(fail_times={"ETH-USD": 2})
+
+    result = extract_assets_concurrently(
+        assets=ASSETS,
+        execution_date=date(2025, 2, 1),
+        pipeline_run_id="run-1",
+        retries=3,
+        delay_seconds=0,
+        extract_func=fake_extract,
+    )
+
+    assert len(result) == len(ASSETS)
+    assert calls.count("ETH-USD") == 3
+
+
+def test_extract_concurrently_raises_after_retries_exhausted():
+    fake_extract, _ = make_fake_extract(fail_times={"SOL-USD": 10})
+
+    with pytest.raises(SourceError, match="SOL-USD"):
+        extract_assets_concurrently(
+            assets=ASSETS,
+            execution_date=date(2025, 2, 1),
+            pipeline_run_id="run-1",
+            retries=2,
+            delay_seconds=0,
+            extract_func=fake_extract,
+        )
+
+
+def test_extract_concurrently_reports_failed_assets_to_handler():
+    fake_extract, _ = make_fake_extract(fail_times={"SOL-USD": 10})
+    failed = []
+
+    result = extract_assets_concurrently(
+        assets=ASSETS,
+        execution_date=date(2025, 2, 1),
+        pipeline_run_id="run-1",
+        retries=2,
+        delay_seconds=0,
+        extract_func=fake_extract,
+        on_failure=lambda symbol, err: failed.append(symbol),
+    )
+
+    assert failed == ["SOL-USD"]
+    assert list(result) == ["BTC-USD", "ETH-USD", "AAPL"]
+
+
+def test_extract_concurrently_respects_shared_budget():
+    fake_extract, calls = make_fake_extract(
+        fail_times={"BTC-USD": 1, "ETH-USD": 1}
+    )
+
+    with pytest.raises(SourceError):
+        extract_assets_concurrently(
+            assets=ASSETS,
+            execution_date=date(2025, 2, 1),
+            pipeline_run_id="run-1",
+            retries=3,
+            delay_seconds=0,
+            budget=RetryBudget(max_retries=1),
+            extract_func=fake_extract,
+        )
+
+    assert len(calls) == len(ASSETS) + 1
+
+
+def test_extract_concurrently_limits_calls_per_source():
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_extract(symbol, asset_type, execution_date, pipeline_run_id):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.01)
+        with lock:
+            active["now"] -= 1
+        return pd.DataFrame({"asset": [symbol]})
+
+    extract_assets_concurrently(
+        assets=ASSETS * 3,
+        execution_date=date(2025, 2, 1),
+        pipeline_run_id="run-1",
+        max_workers=8,
+        max_per_source=2,
+        extract_func=fake_extract,
+    )
+
+    assert active["peak"] <= 2
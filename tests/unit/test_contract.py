@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from processing.contract import DataContract, load_contract
+from common.errors import SystemError
+
+
+def make_hourly_df(hours=24):
+    return pd.DataFrame({
+        "hour_key": range(2025020100, 2025020100 + hours),
+        "timestamp": pd.date_range("2025-02-01", periods=hours, freq="h", tz="UTC"),
+        "open_price": [100.0] * hours,
+        "high_price": [110.0] * hours,
+        "low_price": [90.0] * hours,
+        "close_price": [105.0] * hours,
+        "volume": [1000.0] * hours,
+        "data_gap_flag": [False] * hours,
+    })
+
+
+def evaluate(frames):
+    return load_contract("hourly_market_data").evaluate(
+        frames=frames,
+        scope="execution_date=2025-02-01",
+        expected_hours=24,
+    )
+
+
+def test_contract_passes_valid_frames():
+    assert evaluate({"BTC-USD": make_hourly_df(), "ETH-USD": make_hourly_df()}) == []
+
+
+def test_contract_ohlc_ordering():
+    df = make_hourly_df()
+    df.loc[2, "close_price"] = 120.0  # above high
+    df.loc[7, "open_price"] = 80.0    # below low
+
+    violations = evaluate({"BTC-USD": make_hourly_df(), "ETH-USD": df})
+
+    assert [(v.asset, v.rule, v.row_count) for v in violations] == [
+        ("ETH-USD", "ohlc_ordering", 2),
+    ]
+    assert violations[0].sample_keys == [2025020102, 2025020107]
+
+
+def test_contract_monotonic_timestamp_per_asset():
+    df = make_hourly_df()
+    df.loc[[4, 5], "timestamp"] = df.loc[[5, 4], "timestamp"].to_numpy()
+
+    violations = evaluate({"BTC-USD": make_hourly_df(), "ETH-USD": df})
+
+    assert [(v.asset, v.rule) for v in violations] == [
+        ("ETH-USD", "non_monotonic_timestamp"),
+    ]
+
+
+def test_contract_max_gap_ratio():
+    df = make_hourly_df()
+    df["data_gap_flag"] = True
+
+    violations = evaluate({"BTC-USD": df})
+
+    assert [(v.rule, v.row_count) for v in violations] == [
+        ("gap_ratio_exceeded", 24),
+    ]
+
+
+def test_contract_dtype_and_required_columns():
+    wrong_dtype = make_hourly_df()
+    wrong_dtype["close_price"] = wrong_dtype["close_price"].astype(str)
+
+    violations = evaluate({
+        "BTC-USD": wrong_dtype,
+        "ETH-USD": make_hourly_df().drop(columns=["volume"]),
+    })
+
+    assert [(v.asset, v.rule) for v in violations][:2] == [
+        ("BTC-USD", "dtype"),
+        ("ETH-USD", "missing_column"),
+    ]
+
+
+def test_contract_rejects_unknown_check_type():
+    with pytest.raises(SystemError):
+        DataContract("broken", {"checks": [{"name": "x", "type": "nope"}]})
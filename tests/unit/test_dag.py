@@ -0,0 +1,80 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from common.errors import SystemError
+from pipeline.dag import Stage, StageExecutor
+
+
+def test_stage_executor_runs_dag_and_isolates_failures():
+    failures = []
+
+    def fetch(key):
+        if key == "bad":
+            raise ValueError("boom")
+        return key.upper()
+
+    stages = [
+        Stage("fetch", fetch, pool="io"),
+        Stage("length", lambda key, fetch: len(fetch), inputs=("fetch",)),
+        Stage(
+            "combine",
+            lambda key, fetch, length: f"{fetch}:{length}",
+            inputs=("fetch", "length"),
+            pool="io",
+        ),
+        # returning None drops the key without an error
+        Stage("keep", lambda key, combine: combine if key != "skip" else None,
+              inputs=("combine",)),
+    ]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        outputs = StageExecutor(stages, {"io": pool}).run(
+            ["a", "bb", "bad", "skip"],
+            on_failure=lambda key, stage, err: failures.append((key, stage)),
+        )
+
+    assert outputs == {"a": {"keep": "A:1"}, "bb": {"keep": "BB:2"}}
+    assert failures == [("bad", "fetch")]
+
+
+def test_stage_executor_overlaps_stages_within_limits():
+    active = {"download": 0, "upload": 0}
+    overlap = []
+    peak = []
+    lock = threading.Lock()
+
+    def work(stage):
+        def run(key, **_):
+            with lock:
+                active[stage] += 1
+                overlap.append(active["download"] and active["upload"])
+                peak.append(active["download"])
+            time.sleep(0.01)
+            with lock:
+                active[stage] -= 1
+            return key
+        return run
+
+    stages = [
+        Stage("download", work("download"), pool="io", max_in_flight=2),
+        Stage("upload", work("upload"), inputs=("download",), pool="upload"),
+    ]
+
+    with ThreadPoolExecutor(max_workers=8) as io, \
+            ThreadPoolExecutor(max_workers=8) as upload:
+        outputs = StageExecutor(stages, {"io": io, "upload": upload}).run(
+            [str(i) for i in range(10)],
+            on_failure=lambda *args: None,
+        )
+
+    assert len(outputs) == 10
+    assert max(peak) <= 2
+    assert any(overlap)
+
+
+def test_stage_executor_rejects_undeclared_inputs():
+    with pytest.raises(SystemError):
+        StageExecutor([Stage("b", print, inputs=("a",))], {})
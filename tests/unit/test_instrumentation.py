@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from common.instrumentation import RunInstrumentation, count_rows
+
+
+def test_stage_metrics_and_summary():
+    instr = RunInstrumentation("market_pipeline", "run-1")
+
+    for asset, rows in (("BTC-USD", 24), ("ETH-USD", 48)):
+        with instr.stage("normalize", asset, rows_in=rows) as metrics:
+            sum(range(10_000))
+            metrics.rows_out = 24
+
+    with pytest.raises(ValueError):
+        with instr.stage("write", "BTC-USD") as metrics:
+            metrics.bytes_written = 100
+            raise ValueError("upload failed")
+
+    summary = instr.summary()
+    normalize = summary["stages"]["normalize"]
+
+    assert summary["run_id"] == "run-1"
+    assert list(summary["stages"]) == ["normalize", "write"]
+    assert normalize["calls"] == 2
+    assert normalize["assets"] == 2
+    assert normalize["rows_in"] == 72
+    assert normalize["rows_out"] == 48
+    assert normalize["wall_seconds"] > 0
+    assert 0 < normalize["span_seconds"] >= normalize["max_asset_wall_seconds"]
+    assert normalize["slowest_asset"] in ("BTC-USD", "ETH-USD")
+    assert summary["stages"]["write"]["failed"] == 1
+    assert summary["stages"]["write"]["bytes_written"] == 100
+    assert summary["peak_rss_bytes"] > 0
+
+
+def test_span_counts_concurrent_calls_once():
+    instr = RunInstrumentation("market_pipeline", "run-1")
+
+    def upload(asset):
+        with instr.stage("write", asset):
+            time.sleep(0.05)
+
+    threads = [
+        threading.Thread(target=upload, args=(asset,))
+        for asset in ("BTC-USD", "ETH-USD", "SOL-USD", "XRP-USD")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    write = instr.summary()["stages"]["write"]
+    assert write["wall_seconds"] >= 0.2
+    assert 0.05 <= write["span_seconds"] < write["wall_seconds"]
+
+
+def test_prometheus_textfile_export(tmp_path):
+    instr = RunInstrumentation("market_pipeline", "run-1")
+    with instr.stage("extract") as metrics:
+        metrics.rows_out = 240
+
+    path = instr.write_prometheus_textfile(str(tmp_path))
+
+    assert os.path.basename(path) == "market_pipeline.prom"
+    text = open(path).read()
+    assert "# TYPE market_pipeline_stage_rows_out gauge" in text
+    assert 'market_pipeline_stage_rows_out{pipeline="market_pipeline",stage="extract"} 240' in text
+    assert os.listdir(tmp_path) == ["market_pipeline.prom"]
+
+
+def test_count_rows():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+
+    assert count_rows(df) == 3
+    assert count_rows({"A": df, "B": df.iloc[:1], "C": None}) == 4
+    assert count_rows(None) == 0
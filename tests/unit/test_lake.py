@@ -0,0 +1,96 @@
+import json
+from datetime import date
+
+import duckdb
+import pandas as pd
+
+from lake import fact_files, fact_scan, latest_fact_date
+
+
+def write_file(root, relative, asset="x", day="2025-01-01"):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    hour_key = int(day.replace("-", "")) * 100
+    pd.DataFrame({
+        "asset": [asset],
+        "hour_key": [hour_key],
+        "close_price": [1.0],
+    }).to_parquet(path)
+    return path
+
+
+def make_lake(root):
+    for asset in ("BTC-USD", "ETH-USD"):
+        for day in ("2025-01-01", "2025-01-02", "2025-01-03"):
+            write_file(
+                root, f"fact_market_hourly/asset={asset}/date={day}/data.parquet",
+                asset, day,
+            )
+    write_file(root, "ops_pipeline_events/date=2025-01-02/events-1.parquet")
+
+
+def compact(root, asset, month, days):
+    relative = f"asset={asset}/month={month}/part-1.parquet"
+    path = root / "fact_market_hourly" / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.concat([
+        pd.read_parquet(root / f"fact_market_hourly/asset={asset}/date={day}/data.parquet")
+        for day in days
+    ]).to_parquet(path)
+    (root / "fact_market_hourly" / "_manifest.json").write_text(json.dumps({
+        "version": 1,
+        "files": [{
+            "asset": asset, "month": month, "path": relative,
+            "dates": days, "rows": len(days),
+        }],
+    }))
+    return str(path)
+
+
+def test_fact_files_prunes_on_partition_names(tmp_path):
+    make_lake(tmp_path)
+
+    files = fact_files(
+        str(tmp_path), start_date=date(2025, 1, 2), end_date="2025-01-03",
+        assets=["ETH-USD"],
+    )
+
+    assert sorted(meta[:2] for meta in files.values()) == [
+        ("ETH-USD", "2025-01-02"),
+        ("ETH-USD", "2025-01-03"),
+    ]
+
+
+def test_fact_files_ignores_other_tables(tmp_path):
+    make_lake(tmp_path)
+
+    files = fact_files(str(tmp_path))
+
+    assert len(files) == 6
+    assert not any("ops_pipeline_events" in path for path, _ in files)
+
+
+def test_fact_files_prefers_compacted_files_listed_in_manifest(tmp_path):
+    make_lake(tmp_path)
+    days = ["2025-01-01", "2025-01-02", "2025-01-03"]
+    compacted = compact(tmp_path, "BTC-USD", "2025-01", days)
+
+    files = fact_files(str(tmp_path), start_date="2025-01-02", assets=["BTC-USD"])
+
+    # Daily files still on disk are shadowed by the compacted one
+    assert sorted(files) == [(compacted, "2025-01-02"), (compacted, "2025-01-03")]
+    assert latest_fact_date(str(tmp_path)) == date(2025, 1, 3)
+
+
+def test_fact_scan_filters_on_partition_columns(tmp_path):
+    make_lake(tmp_path)
+    compact(tmp_path, "BTC-USD", "2025-01", ["2025-01-01", "2025-01-02", "2025-01-03"])
+    source, params = fact_scan(
+        str(tmp_path), start_date="2025-01-03", assets=["BTC-USD"]
+    )
+
+    rows = duckdb.connect().execute(
+        f"SELECT asset, CAST(date AS VARCHAR) FROM {source}", params
+    ).fetchall()
+
+    assert rows == [("BTC-USD", "2025-01-03")]
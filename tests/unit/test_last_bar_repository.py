@@ -0,0 +1,42 @@
+import pandas as pd
+
+from storage.last_bar_repository import load_last_bars, update_last_bars
+
+
+def make_hourly_df(start, close):
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start=start, periods=24, freq="h", tz="UTC"),
+        "close_price": [close] * 24,
+    })
+
+
+def test_last_bar_store_round_trip(tmp_path):
+    path = str(tmp_path / "last_bar.sqlite")
+
+    assert load_last_bars(path=path) == {}
+
+    update_last_bars(
+        hourly_data={
+            "BTC-USD": make_hourly_df("2025-02-01", 105.0),
+            "ETH-USD": make_hourly_df("2025-02-01", 3.0),
+        },
+        pipeline_run_id="run-1",
+        path=path,
+    )
+
+    bars = load_last_bars(assets=["BTC-USD"], path=path)
+
+    assert list(bars) == ["BTC-USD"]
+    assert bars["BTC-USD"]["close_price"] == 105.0
+    assert bars["BTC-USD"]["timestamp"] == pd.Timestamp("2025-02-01 23:00", tz="UTC")
+
+
+def test_last_bar_store_keeps_newest_bar(tmp_path):
+    path = str(tmp_path / "last_bar.sqlite")
+
+    update_last_bars({"BTC-USD": make_hourly_df("2025-02-02", 110.0)}, "run-2", path=path)
+    update_last_bars({"BTC-USD": make_hourly_df("2025-02-01", 105.0)}, "run-1", path=path)
+
+    bars = load_last_bars(path=path)
+
+    assert bars["BTC-USD"]["close_price"] == 110.0
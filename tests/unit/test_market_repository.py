@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from common.errors import PartitionWriteError
+from storage.backend import get_filesystem, reset_filesystems
+from storage.market_repository import write_fact_market_hourly
+
+
+def make_hourly_df(asset, periods=24):
+    timestamps = pd.date_range(
+        start=pd.Timestamp("2025-02-01", tz="UTC"), periods=periods, freq="h"
+    )
+    return pd.DataFrame({
+        "asset": asset,
+        "hour_key": timestamps.strftime("%Y%m%d%H").astype("int64"),
+        "timestamp": timestamps,
+        "close_price": [105.0] * periods,
+        "volume": [1000.0] * periods,
+        "data_gap_flag": False,
+    })
+
+
+@pytest.fixture
+def memory_fs(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    monkeypatch.setenv("STORAGE_BASE_PATH", "/lake")
+    reset_filesystems()
+    yield get_filesystem()
+    reset_filesystems()
+
+
+def test_write_fact_market_hourly_writes_partitions(memory_fs):
+    hourly_data = {a: make_hourly_df(a) for a in ("BTC-USD", "ETH-USD", "SOL-USD")}
+
+    write_fact_market_hourly(hourly_data, "run-1", max_workers=2)
+
+    for asset, df in hourly_data.items():
+        path = f"/lake/fact_market_hourly/asset={asset}/date=2025-02-01/data.parquet"
+        with memory_fs.open(path, "rb") as f:
+            written = pd.read_parquet(f)
+
+        expected = df.assign(date="2025-02-01")
+        pd.testing.assert_frame_equal(written, expected, check_dtype=False)
+        assert str(written["timestamp"].dtype).endswith("UTC]")
+
+
+def test_write_fact_market_hourly_collects_failures(memory_fs):
+    hourly_data = {
+        "BTC-USD": make_hourly_df("BTC-USD"),
+        "ETH-USD": make_hourly_df("ETH-USD").iloc[0:0],
+        "SOL-USD": make_hourly_df("SOL-USD"),
+    }
+
+    with pytest.raises(PartitionWriteError) as excinfo:
+        write_fact_market_hourly(hourly_data, "run-1")
+
+    assert list(excinfo.value.failures) == [("ETH-USD", None)]
+    # the other partitions were still written
+    assert len(memory_fs.glob("/lake/fact_market_hourly/asset=*/date=*/data.parquet")) == 2
+
+
+def test_write_fact_market_hourly_splits_frames_by_date(memory_fs):
+    # ~2 months, shuffled: every row must land in its own date partition
+    df = make_hourly_df("BTC-USD", periods=24 * 59).sample(frac=1, random_state=0)
+
+    write_fact_market_hourly({"BTC-USD": df}, "run-1")
+
+    paths = sorted(memory_fs.glob(
+        "/lake/fact_market_hourly/asset=BTC-USD/date=*/data.parquet"
+    ))
+    assert len(paths) == 59
+    assert "date=2025-03-31" in paths[-1]
+
+    with memory_fs.open(paths[30], "rb") as f:
+        day = pd.read_parquet(f)
+    assert len(day) == 24
+    assert day["timestamp"].is_monotonic_increasing
+    assert (day["date"] == day["timestamp"].dt.strftime("%Y-%m-%d")).all()
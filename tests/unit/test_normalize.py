@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import pytest
 from datetime import date, datetime, timezone
@@ -98,3 +99,176 @@ def test_normalize_hourly_unfillable_gap_fails():
             cleaned_data=cleaned_data,
             execution_date=date(2025, 2, 1),
         )
+
+def make_cleaned_df_irregular(seed):
+    rng = np.random.default_rng(seed)
+    minutes = np.sort(rng.integers(0, 26 * 60, size=40))
+    minutes[0] = 0
+    timestamps = pd.Timestamp("2025-02-01", tz="UTC") + pd.to_timedelta(
+        minutes, unit="min"
+    )
+    prices = rng.uniform(90, 110, size=(40, 4))
+
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "open_price": prices[:, 0],
+        "high_price": prices[:, 1],
+        "low_price": prices[:, 2],
+        "close_price": prices[:, 3],
+        "volume": rng.integers(0, 1000, size=40),
+    })
+
+@pytest.mark.parametrize("hour_key_format", ["int", "str"])
+def test_normalize_hourly_vectorized_matches_per_asset(hour_key_format):
+    cleaned_data = {
+        "BTC-USD": make_cleaned_df_full_hours(),
+        "ETH-USD": make_cleaned_df_missing_hours(),
+        "SOL-USD": make_cleaned_df_irregular(seed=1),
+        "XRP-USD": make_cleaned_df_irregular(seed=2),
+    }
+
+    expected = normalize_to_hourly(
+        cleaned_data=cleaned_data,
+        execution_date=date(2025, 2, 1),
+        hour_key_format=hour_key_format,
+    )
+    result = normalize_to_hourly(
+        cleaned_data=cleaned_data,
+        execution_date=date(2025, 2, 1),
+        engine="vectorized",
+        hour_key_format=hour_key_format,
+    )
+
+    assert list(result) == list(expected)
+    for asset in expected:
+        pd.testing.assert_frame_equal(result[asset], expected[asset])
+
+def test_normalize_hourly_vectorized_matches_per_asset_on_shuffled_bars():
+    cleaned_data = {
+        asset: make_cleaned_df_irregular(seed=seed)
+        .sample(frac=1, random_state=seed)
+        .reset_index(drop=True)
+        for seed, asset in enumerate(["BTC-USD", "ETH-USD", "SOL-USD"], start=1)
+    }
+
+    expected = normalize_to_hourly(
+        cleaned_data=cleaned_data,
+        execution_date=date(2025, 2, 1),
+    )
+    result = normalize_to_hourly(
+        cleaned_data=cleaned_data,
+        execution_date=date(2025, 2, 1),
+        engine="vectorized",
+    )
+
+    for asset in expected:
+        pd.testing.assert_frame_equal(result[asset], expected[asset])
+
+@pytest.mark.parametrize("engine", ["per_asset", "vectorized"])
+def test_normalize_hourly_without_assets_returns_nothing(engine):
+    assert normalize_to_hourly(
+        cleaned_data={},
+        execution_date=date(2025, 2, 1),
+        engine=engine,
+    ) == {}
+
+def test_normalize_hourly_vectorized_unfillable_gap_fails():
+    df = make_cleaned_df_missing_hours()
+    df["timestamp"] = df["timestamp"] + pd.Timedelta(hours=4)
+
+    cleaned_data = {
+        "BTC-USD": make_cleaned_df_full_hours(),
+        "ETH-USD": df,
+    }
+
+    with pytest.raises(DataValidationError, match="ETH-USD"):
+        normalize_to_hourly(
+            cleaned_data=cleaned_data,
+            execution_date=date(2025, 2, 1),
+            engine="vectorized",
+        )
+
+def test_normalize_hourly_hour_key_is_int_by_default():
+    result = normalize_to_hourly(
+        cleaned_data={"BTC-USD": make_cleaned_df_full_hours()},
+        execution_date=date(2025, 2, 1),
+    )
+
+    hourly_df = result["BTC-USD"]
+
+    assert hourly_df["hour_key"].dtype == np.int64
+    assert hourly_df["hour_key"].iloc[0] == 2025020100
+    assert hourly_df["hour_key"].iloc[23] == 2025020123
+
+def test_normalize_hourly_hour_key_str_matches_strftime():
+    result = normalize_to_hourly(
+        cleaned_data={"BTC-USD": make_cleaned_df_full_hours()},
+        execution_date=date(2025, 2, 1),
+        hour_key_format="str",
+    )
+
+    hourly_df = result["BTC-USD"]
+
+    assert (
+        hourly_df["hour_key"] == hourly_df["timestamp"].dt.strftime("%Y%m%d%H")
+    ).all()
+
+@pytest.mark.parametrize("engine", ["per_asset", "vectorized"])
+def test_normalize_hourly_date_range_fills_across_days(engine):
+    df = make_cleaned_df_full_hours()  # 2025-02-01 only
+
+    result = normalize_to_hourly(
+        cleaned_data={"BTC-USD": df},
+        execution_date=date(2025, 2, 1),
+        end_date=date(2025, 2, 3),
+        engine=engine,
+    )
+
+    hourly_df = result["BTC-USD"]
+
+    assert len(hourly_df) == 72
+    assert hourly_df["hour_key"].is_unique
+    assert not hourly_df.isnull().any().any()
+    assert not hourly_df["data_gap_flag"].iloc[:24].any()
+    assert hourly_df["data_gap_flag"].iloc[24:].all()
+    assert (hourly_df["close_price"].iloc[24:] == 105.0).all()
+
+@pytest.mark.parametrize("engine", ["per_asset", "vectorized"])
+def test_normalize_hourly_seeds_leading_gap_from_last_bar(engine):
+    df = make_cleaned_df_full_hours().iloc[3:]
+    seed_bars = {
+        "BTC-USD": {
+            "timestamp": pd.Timestamp("2025-01-31 23:00", tz="UTC"),
+            "close_price": 99.0,
+        }
+    }
+
+    result = normalize_to_hourly(
+        cleaned_data={"BTC-USD": df},
+        execution_date=date(2025, 2, 1),
+        engine=engine,
+        seed_bars=seed_bars,
+    )
+
+    hourly_df = result["BTC-USD"]
+
+    assert (hourly_df.loc[:2, "close_price"] == 99.0).all()
+    assert (hourly_df.loc[:2, "open_price"] == 99.0).all()
+    assert hourly_df.loc[:2, "data_gap_flag"].all()
+    assert not hourly_df.loc[3:, "data_gap_flag"].any()
+
+def test_normalize_hourly_ignores_seed_not_before_grid():
+    df = make_cleaned_df_full_hours().iloc[3:]
+    seed_bars = {
+        "BTC-USD": {
+            "timestamp": pd.Timestamp("2025-02-05 23:00", tz="UTC"),
+            "close_price": 99.0,
+        }
+    }
+
+    with pytest.raises(DataValidationError):
+        normalize_to_hourly(
+            cleaned_data={"BTC-USD": df},
+            execution_date=date(2025, 2, 1),
+            seed_bars=seed_bars,
+        )
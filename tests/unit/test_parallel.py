@@ -0,0 +1,103 @@
+import pandas as pd
+import pytest
+from datetime import date
+
+from processing.clean import clean_market_data
+from processing.normalisasi import normalize_to_hourly
+from processing.parallel import (
+    frame_from_ipc,
+    frame_to_ipc,
+    frames_from_ipc,
+    frames_to_ipc,
+)
+from processing.validate import check_hourly_data
+from common.errors import DataValidationError
+
+
+EXECUTION_DATE = date(2025, 2, 1)
+
+
+def make_raw_df(asset, close=105.0, hours=24):
+    timestamps = pd.date_range(
+        start=pd.Timestamp(EXECUTION_DATE, tz="UTC"),
+        periods=hours,
+        freq="h",
+    )
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "open": [100.0] * hours,
+        "high": [110.0] * hours,
+        "low": [90.0] * hours,
+        "close": [close] * hours,
+        "volume": [1000] * hours,
+        "asset": asset,
+        "execution_date": EXECUTION_DATE,
+    })
+
+
+def make_raw_data():
+    return {
+        f"ASSET-{i}": make_raw_df(f"ASSET-{i}", close=100.0 + i)
+        for i in range(5)
+    }
+
+
+def test_arrow_ipc_round_trip_keeps_dtypes():
+    df = make_raw_df("BTC-USD")
+    df["data_gap_flag"] = False
+
+    pd.testing.assert_frame_equal(frame_from_ipc(frame_to_ipc(df)), df)
+
+
+def test_shard_ipc_round_trip_stacked_and_mixed():
+    same = {"A": make_raw_df("A"), "B": make_raw_df("B", hours=5)}
+    mixed = dict(same, C=make_raw_df("C").astype({"volume": "float64"}))
+
+    for frames, encoding in ((same, "stacked"), (mixed, "frames")):
+        payload = frames_to_ipc(frames)
+        decoded = frames_from_ipc(payload)
+
+        assert payload[0] == encoding
+        assert list(decoded) == list(frames)
+        for asset, df in frames.items():
+            pd.testing.assert_frame_equal(decoded[asset], df)
+
+
+def test_parallel_stages_match_serial():
+    raw_data = make_raw_data()
+
+    cleaned = clean_market_data(raw_data)
+    cleaned_parallel = clean_market_data(raw_data, workers=2)
+    assert list(cleaned_parallel) == list(cleaned)
+
+    hourly = normalize_to_hourly(cleaned, EXECUTION_DATE, engine="vectorized")
+    hourly_parallel = normalize_to_hourly(
+        cleaned_parallel, EXECUTION_DATE, engine="vectorized", workers=2
+    )
+    assert list(hourly_parallel) == list(hourly)
+
+    for asset in raw_data:
+        pd.testing.assert_frame_equal(cleaned_parallel[asset], cleaned[asset])
+        pd.testing.assert_frame_equal(hourly_parallel[asset], hourly[asset])
+
+
+def test_parallel_check_reports_in_asset_order():
+    hourly = normalize_to_hourly(
+        clean_market_data(make_raw_data()), EXECUTION_DATE
+    )
+    hourly["ASSET-1"] = hourly["ASSET-1"].iloc[1:]
+    hourly["ASSET-4"]["close_price"] = -1.0
+
+    serial = check_hourly_data(hourly, EXECUTION_DATE)
+    parallel = check_hourly_data(hourly, EXECUTION_DATE, workers=2)
+
+    assert parallel.failed_assets == ["ASSET-1", "ASSET-4"]
+    assert parallel.violations == serial.violations
+
+
+def test_parallel_normalize_raises_shard_error():
+    cleaned = clean_market_data(make_raw_data())
+    cleaned["ASSET-3"] = cleaned["ASSET-3"].iloc[5:].reset_index(drop=True)
+
+    with pytest.raises(DataValidationError, match="ASSET-3"):
+        normalize_to_hourly(cleaned, EXECUTION_DATE, workers=2)
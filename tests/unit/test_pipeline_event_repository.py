@@ -0,0 +1,83 @@
+import time
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from storage.backend import get_filesystem, reset_filesystems
+from storage.pipeline_event_repository import PipelineEventSink
+
+
+EVENTS_GLOB = "/lake/ops_pipeline_events/date=*/*.parquet"
+
+
+@pytest.fixture
+def memory_fs(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    monkeypatch.setenv("STORAGE_BASE_PATH", "/lake")
+    reset_filesystems()
+    yield get_filesystem()
+    reset_filesystems()
+
+
+def make_event(asset, execution_date=date(2025, 2, 1), run_id="run-1"):
+    return {
+        "pipeline_run_id": run_id,
+        "pipeline_name": "market_pipeline",
+        "event_type": "ASSET_SKIPPED",
+        "step": "EXTRACT",
+        "asset": asset,
+        "reason": "NON_TRADING_DAY",
+        "execution_date": execution_date,
+    }
+
+
+def read_events(fs):
+    frames = []
+    for path in sorted(fs.glob(EVENTS_GLOB)):
+        with fs.open(path, "rb") as f:
+            frames.append(pd.read_parquet(f))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def test_sink_buffers_until_flush_and_never_overwrites(memory_fs):
+    sink = PipelineEventSink(max_buffer=100, flush_interval=0)
+
+    for asset in ("AAPL", "MSFT", "NVDA"):
+        sink.write(make_event(asset))
+    assert memory_fs.glob(EVENTS_GLOB) == []
+
+    sink.flush()
+    sink.write(make_event("AMZN", run_id="run-2"))
+    sink.write(make_event("GOOGL", execution_date=date(2025, 2, 2), run_id="run-2"))
+    sink.close()
+
+    paths = memory_fs.glob(EVENTS_GLOB)
+    assert len(paths) == 3
+    assert sum("events-run-1-" in p for p in paths) == 1
+
+    events = read_events(memory_fs)
+    assert sorted(events["asset"]) == ["AAPL", "AMZN", "GOOGL", "MSFT", "NVDA"]
+    assert events["asset_type"].isna().all()
+
+
+def test_sink_flushes_when_buffer_is_full(memory_fs):
+    sink = PipelineEventSink(max_buffer=2, flush_interval=0)
+
+    for asset in ("AAPL", "MSFT", "NVDA"):
+        sink.write(make_event(asset))
+
+    assert len(memory_fs.glob(EVENTS_GLOB)) == 1
+    assert len(sink) == 1
+
+
+def test_sink_flushes_on_timer(memory_fs):
+    sink = PipelineEventSink(max_buffer=100, flush_interval=0.05)
+    sink.write(make_event("AAPL"))
+
+    deadline = time.monotonic() + 2
+    while not memory_fs.glob(EVENTS_GLOB) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(memory_fs.glob(EVENTS_GLOB)) == 1
+    assert len(sink) == 0
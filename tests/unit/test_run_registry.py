@@ -0,0 +1,109 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from common import pipeline_run
+from storage.backend import reset_filesystems
+from storage.run_registry_repository import (
+    load_pipeline_runs,
+    run_duration_stats,
+    stage_duration_stats,
+    write_pipeline_run,
+)
+
+
+@pytest.fixture(autouse=True)
+def memory_lake(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    monkeypatch.setenv("STORAGE_BASE_PATH", "/lake")
+    reset_filesystems()
+    yield
+    reset_filesystems()
+
+
+def make_run(run_id, execution_date, seconds, run_type="scheduled", stages=None):
+    start = datetime.combine(execution_date, datetime.min.time()) + timedelta(hours=1)
+    return {
+        "pipeline_run_id": run_id,
+        "pipeline_name": "market_hourly_pipeline",
+        "run_type": run_type,
+        "execution_date": execution_date,
+        "status": "SUCCESS",
+        "start_time": start,
+        "end_time": start + timedelta(seconds=seconds),
+        "duration_seconds": float(seconds),
+        "asset_count": 2,
+        "quarantined_count": 0,
+        "rows_written": 48,
+        "bytes_written": 1024,
+        "peak_rss_bytes": None,
+        "stage_seconds": stages or {"extract": seconds / 2, "write": seconds / 4},
+    }
+
+
+def test_load_pipeline_runs_prunes_by_execution_date():
+    for day, seconds in [(1, 10), (2, 20), (3, 30)]:
+        write_pipeline_run(make_run(f"run-{day}", date(2025, 2, day), seconds))
+
+    runs = load_pipeline_runs(date(2025, 2, 2), date(2025, 2, 3))
+
+    assert runs["pipeline_run_id"].tolist() == ["run-2", "run-3"]
+    assert runs.iloc[0]["stage_seconds"] == {"extract": 10.0, "write": 5.0}
+
+
+def test_run_duration_stats_groups_by_period_and_run_type():
+    write_pipeline_run(make_run("a", date(2025, 2, 1), 10))
+    write_pipeline_run(make_run("b", date(2025, 2, 1), 30))
+    write_pipeline_run(make_run("c", date(2025, 2, 1), 99, run_type="backfill"))
+    write_pipeline_run(make_run("d", date(2025, 2, 2), 50))
+
+    stats = run_duration_stats(freq="D")
+    scheduled = stats[stats["run_type"] == "scheduled"]
+
+    assert scheduled["runs"].tolist() == [2, 1]
+    assert scheduled["p50_seconds"].tolist() == [20.0, 50.0]
+    assert scheduled["max_seconds"].tolist() == [30.0, 50.0]
+    assert stats[stats["run_type"] == "backfill"]["runs"].tolist() == [1]
+
+
+def test_stage_duration_stats_reports_percentiles_per_stage():
+    for i, seconds in enumerate([4, 8, 12]):
+        write_pipeline_run(make_run(f"run-{i}", date(2025, 2, 1), seconds))
+
+    stats = stage_duration_stats().set_index("stage")
+
+    assert stats.loc["extract", "runs"] == 3
+    assert stats.loc["extract", "p50_seconds"] == 4.0
+    assert stats.loc["write", "max_seconds"] == 3.0
+
+
+def test_stats_on_empty_registry_are_empty():
+    assert run_duration_stats().empty
+    assert stage_duration_stats().empty
+
+
+def test_finalize_pipeline_run_records_status_and_duration():
+    pipeline_run.start_pipeline_run("run-x", "market_hourly_pipeline", "manual", date(2025, 2, 1))
+    pipeline_run.complete_pipeline_run("run-x", "PARTIAL_SUCCESS")
+
+    record = pipeline_run.finalize_pipeline_run(
+        "run-x",
+        summary={"peak_rss_bytes": 10, "stages": {
+            "write": {
+                "wall_seconds": 1.5,
+                "span_seconds": 0.5,
+                "rows_out": 24,
+                "bytes_written": 100,
+            },
+        }},
+        asset_count=3,
+        quarantined_count=1,
+    )
+
+    assert record["status"] == "PARTIAL_SUCCESS"
+    runs = load_pipeline_runs()
+    assert runs["pipeline_run_id"].tolist() == ["run-x"]
+    assert runs.iloc[0]["rows_written"] == 24
+    assert runs.iloc[0]["stage_seconds"] == {"write": 0.5}
+    # A run is recorded once
+    assert pipeline_run.finalize_pipeline_run("run-x") is None
@@ -0,0 +1,74 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from common.config import get_storage_backend, get_storage_base_path
+from common.errors import SystemError
+from storage.backend import get_filesystem, reset_filesystems
+from storage.pipeline_event_repository import (
+    flush_pipeline_events,
+    write_pipeline_event,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_backends(monkeypatch):
+    monkeypatch.delenv("STORAGE_BACKEND", raising=False)
+    monkeypatch.delenv("STORAGE_BASE_PATH", raising=False)
+    reset_filesystems()
+    yield
+    reset_filesystems()
+
+
+def test_backend_selected_from_environment_config(monkeypatch, tmp_path):
+    (tmp_path / "ci.yaml").write_text(
+        "storage:\n  backend: memory\n  base_path: /ci-lake\n"
+    )
+    monkeypatch.setenv("CONFIG_DIR", str(tmp_path))
+    monkeypatch.setenv("PIPELINE_ENV", "ci")
+
+    assert get_storage_backend() == "memory"
+    assert get_storage_base_path() == "/ci-lake"
+
+    # environment variables win over the file
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    assert get_storage_backend() == "local"
+
+
+def test_filesystem_is_shared_per_backend():
+    assert get_filesystem("memory") is get_filesystem("memory")
+    assert get_filesystem("local") is not get_filesystem("memory")
+
+
+def test_unknown_backend():
+    with pytest.raises(SystemError):
+        get_filesystem("ftp")
+
+
+def test_pipeline_event_written_through_backend(monkeypatch, tmp_path):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_BASE_PATH", str(tmp_path / "lake"))
+
+    write_pipeline_event({
+        "pipeline_run_id": "run-1",
+        "pipeline_name": "market_pipeline",
+        "event_type": "ASSET_SKIPPED",
+        "step": "EXTRACT",
+        "execution_date": date(2025, 2, 1),
+    })
+    flush_pipeline_events()
+
+    events = pd.read_parquet(tmp_path / "lake/ops_pipeline_events/date=2025-02-01")
+    assert events["event_type"].tolist() == ["ASSET_SKIPPED"]
+
+
+def test_backend_must_be_configured_outside_local(monkeypatch, tmp_path):
+    monkeypatch.setenv("CONFIG_DIR", str(tmp_path))
+    monkeypatch.setenv("PIPELINE_ENV", "staging")
+
+    with pytest.raises(SystemError, match="PIPELINE_ENV=staging"):
+        get_storage_backend()
+
+    monkeypatch.setenv("PIPELINE_ENV", "local")
+    assert get_storage_backend() == "local"
@@ -5,6 +5,7 @@ from datetime import date
 from processing.validate import (
     validate_raw_data,
     validate_hourly_data,
+    check_hourly_data,
 )
 from common.errors import DataValidationError
 
@@ -109,3 +110,54 @@ def test_validate_hourly_data_negative_volume():
             hourly_data=hourly_data,
             execution_date=date(2025, 2, 1),
         )
+
+def test_validate_hourly_data_date_range():
+    df = pd.concat([make_valid_hourly_df()] * 2, ignore_index=True)
+    df["hour_key"] = range(48)
+
+    validate_hourly_data(
+        hourly_data={"BTC-USD": df},
+        execution_date=date(2025, 2, 1),
+        end_date=date(2025, 2, 2),
+    )
+
+    with pytest.raises(DataValidationError, match="Expected 72 hours"):
+        validate_hourly_data(
+            hourly_data={"BTC-USD": df},
+            execution_date=date(2025, 2, 1),
+            end_date=date(2025, 2, 3),
+        )
+
+def test_check_hourly_data_reports_every_violation():
+    bad_price = make_valid_hourly_df()
+    bad_price.loc[[0, 5], "low_price"] = 0
+    bad_price.loc[3, "volume"] = -1
+
+    hourly_data = {
+        "BTC-USD": make_valid_hourly_df(),
+        "ETH-USD": bad_price,
+        "SOL-USD": make_valid_hourly_df().iloc[:-2],
+    }
+
+    report = check_hourly_data(
+        hourly_data=hourly_data,
+        execution_date=date(2025, 2, 1),
+    )
+
+    assert not report.ok
+    assert report.failed_assets == ["ETH-USD", "SOL-USD"]
+    assert [(v.asset, v.rule, v.row_count) for v in report.violations] == [
+        ("ETH-USD", "non_positive_price", 2),
+        ("ETH-USD", "negative_volume", 1),
+        ("SOL-USD", "missing_hour", 2),
+    ]
+    assert report.violations[0].sample_keys == ["2025020100", "2025020105"]
+
+def test_check_hourly_data_clean_report():
+    report = check_hourly_data(
+        hourly_data={"BTC-USD": make_valid_hourly_df()},
+        execution_date=date(2025, 2, 1),
+    )
+
+    assert report.ok
+    report.raise_if_failed()
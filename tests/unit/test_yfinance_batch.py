@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import date
+
+from ingestion.yfinance import extract_market_data_batch
+from common.errors import SourceError
+
+
+ASSETS = [
+    {"symbol": "BTC-USD", "type": "crypto"},
+    {"symbol": "AAPL", "type": "stock"},
+]
+
+
+def make_multi_index_frame():
+    timestamps = pd.date_range(
+        start="2025-02-01 00:00:00",
+        periods=48,
+        freq="h",
+        tz="UTC",
+        name="Datetime",
+    )
+    fields = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+    columns = pd.MultiIndex.from_product(
+        [["BTC-USD", "AAPL"], fields],
+        names=["Ticker", "Price"],
+    )
+    wide = pd.DataFrame(100.0, index=timestamps, columns=columns)
+
+    # AAPL only trades during part of the second day
+    aapl_closed = (timestamps.date != date(2025, 2, 2)) | (timestamps.hour < 14)
+    wide.loc[aapl_closed, "AAPL"] = np.nan
+
+    return wide
+
+
+def make_fake_download(frame):
+    calls = []
+
+    def fake_download(symbols, start_dt, end_dt):
+        calls.append(list(symbols))
+        return frame[[s for s in symbols if s in frame.columns.levels[0]]]
+
+    return fake_download, calls
+
+
+def test_batch_extract_splits_by_asset_and_date():
+    fake_download, calls = make_fake_download(make_multi_index_frame())
+
+    result = extract_market_data_batch(
+        assets=ASSETS,
+        start_date=date(2025, 2, 1),
+        end_date=date(2025, 2, 2),
+        pipeline_run_id="run-1",
+        download_func=fake_download,
+    )
+
+    assert len(calls) == 1
+    assert sorted(result) == [date(2025, 2, 1), date(2025, 2, 2)]
+    assert list(result[date(2025, 2, 1)]) == ["BTC-USD"]
+    assert sorted(result[date(2025, 2, 2)]) == ["AAPL", "BTC-USD"]
+
+    btc = result[date(2025, 2, 1)]["BTC-USD"]
+    assert len(btc) == 24
+    assert {"timestamp", "open", "high", "low", "close", "volume"} <= set(btc.columns)
+    assert (btc["asset"] == "BTC-USD").all()
+    assert (btc["asset_type"] == "crypto").all()
+    assert (btc["execution_date"] == date(2025, 2, 1)).all()
+    assert (btc["pipeline_run_id"] == "run-1").all()
+
+    aapl = result[date(2025, 2, 2)]["AAPL"]
+    assert len(aapl) == 10
+    assert aapl["timestamp"].is_monotonic_increasing
+
+
+def test_batch_extract_chunks_symbols():
+    fake_download, calls = make_fake_download(make_multi_index_frame())
+
+    extract_market_data_batch(
+        assets=ASSETS,
+        start_date=date(2025, 2, 1),
+        end_date=date(2025, 2, 2),
+        pipeline_run_id="run-1",
+        batch_size=1,
+        download_func=fake_download,
+    )
+
+    assert calls == [["BTC-USD"], ["AAPL"]]
+
+
+def test_batch_extract_empty_response_fails():
+    def empty_download(symbols, start_dt, end_dt):
+        return pd.DataFrame()
+
+    with pytest.raises(SourceError):
+        extract_market_data_batch(
+            assets=ASSETS,
+            start_date=date(2025, 2, 1),
+            end_date=date(2025, 2, 1),
+            pipeline_run_id="run-1",
+            download_func=empty_download,
+        )
+
+
+def test_batch_extract_without_assets_returns_nothing():
+    download, calls = make_fake_download(make_multi_index_frame())
+
+    result = extract_market_data_batch(
+        [], date(2025, 2, 1), date(2025, 2, 2), "run-1", download_func=download
+    )
+
+    assert result == {}
+    assert calls == []